@@ -8,7 +8,7 @@ echo ============================================
 echo.
 
 :: Install / upgrade PyInstaller
-echo [1/3] Installing build dependencies...
+echo [1/4] Installing build dependencies...
 venv\Scripts\python.exe -m pip install --quiet --upgrade pyinstaller
 if errorlevel 1 (
     echo ERROR: Failed to install build dependencies.
@@ -18,14 +18,24 @@ if errorlevel 1 (
 echo.
 
 :: Clean previous build artefacts
-echo [2/3] Cleaning previous build...
+echo [2/4] Cleaning previous build...
 if exist "MetadataImageSearch.exe" del /f /q "MetadataImageSearch.exe"
 if exist "src\dist\MetadataImageSearch.exe" del /f /q "src\dist\MetadataImageSearch.exe"
 if exist "src\build" rmdir /s /q "src\build"
 echo.
 
+:: Precompile language files into the single bundle loaded at startup
+echo [3/4] Building localization bundle...
+venv\Scripts\python.exe src\localization\localization_build_bundle.py
+if errorlevel 1 (
+    echo ERROR: Failed to build localization bundle.
+    pause
+    exit /b 1
+)
+echo.
+
 :: Build from inside src\ so PyInstaller resolves relative paths correctly
-echo [3/3] Building executable...
+echo [4/4] Building executable...
 pushd src
 ..\venv\Scripts\python.exe -m PyInstaller ^
     --onefile ^
@@ -0,0 +1,58 @@
+"""Measure cold import time of the CLI, worker and GUI entry points.
+
+Each import runs in a fresh interpreter so nothing is cached between samples.
+Run from the src/ folder:
+
+    python benchmarks/bench_import_time.py [--runs N]
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+
+SRC_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+TARGETS = [
+    ("worker spawn (core.scan_worker)", "import core.scan_worker"),
+    ("CLI run (metadata_search)", "import metadata_search"),
+    ("GUI (gui.search_gui)", "import gui.search_gui"),
+    ("all-in-one (metadata_search + GUI)", "import metadata_search, gui.search_gui"),
+]
+
+SNIPPET = (
+    "import time; t = time.perf_counter(); {stmt}; "
+    "print(time.perf_counter() - t)"
+)
+
+
+def measure(stmt, runs):
+    samples = []
+    for _ in range(runs):
+        out = subprocess.run(
+            [sys.executable, "-c", SNIPPET.format(stmt=stmt)],
+            cwd=SRC_DIR, capture_output=True, text=True, check=True,
+        )
+        samples.append(float(out.stdout.strip().splitlines()[-1]))
+    return statistics.median(samples), min(samples)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Cold import time benchmark")
+    parser.add_argument("--runs", type=int, default=7)
+    args = parser.parse_args()
+
+    results = []
+    for label, stmt in TARGETS:
+        median, best = measure(stmt, args.runs)
+        results.append((label, median, best))
+
+    baseline = results[-1][1]
+    print(f"{'target':<40}{'median ms':>12}{'best ms':>10}{'saved':>9}")
+    for label, median, best in results:
+        saved = (1 - median / baseline) * 100 if baseline else 0.0
+        print(f"{label:<40}{median * 1000:>12.1f}{best * 1000:>10.1f}{saved:>8.0f}%")
+
+
+if __name__ == "__main__":
+    main()
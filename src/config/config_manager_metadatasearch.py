@@ -29,7 +29,11 @@ class ConfigManagerMetadataSearch:
                 'recursive': 'True',
                 'case_sensitive': 'False',
                 'search_positive': 'True',
-                'search_negative': 'False'
+                'search_negative': 'False',
+                'worker_count': '0',
+                'use_index': 'False',
+                'live_search': 'False',
+                'duplicate_radius': '4'
             }
             self.config['Output'] = {
                 'match_folder_structure': 'True',
@@ -0,0 +1,131 @@
+import re
+from functools import lru_cache
+
+from core.facets import normalize_category
+
+
+# ---------------------------------------------------------------------------
+# A1111 attention syntax
+#
+# ``(tag)`` multiplies the weight of its text by 1.1, ``[tag]`` divides it by
+# 1.1, ``(tag:1.3)`` sets an explicit factor, and brackets nest. Extra network
+# tags such as ``<lora:name:0.8>`` become the tag ``<lora:name>`` with their
+# multiplier as weight. ``weighted_tags`` turns a prompt into bare,
+# normalized tags with the weight they were written with, so queries like
+# ``masterpiece:>1.1`` can compare weights instead of matching brackets.
+# ---------------------------------------------------------------------------
+
+_ATTENTION_RE = re.compile(r"""
+\\\(|\\\)|\\\[|\\\]|\\\\|\\|
+<[^<>:]+:[^<>:]+(?::\s*[+-]?[.\d]+)?\s*>|
+\(|\[|:\s*([+-]?[.\d]+)\s*\)|\)|\]|
+[^\\()\[\]:<]+|:|<
+""", re.X)
+_EXTRA_NETWORK_RE = re.compile(r'<([^<>:]+):([^<>:]+?)(?::\s*([+-]?[.\d]+))?\s*>')
+_BREAK_RE = re.compile(r'\bBREAK\b')
+_WEIGHT_TERM_RE = re.compile(r'^(.*[^\s:])\s*:\s*(>=|<=|!=|=|>|<)\s*([+-]?(?:\d+\.?\d*|\.\d+))\s*$')
+
+ROUND_FACTOR = 1.1
+
+
+def parse_attention(prompt):
+    """Prompt -> [(text, weight)] runs, the way A1111 weighs them."""
+    runs = []
+    round_brackets = []
+    square_brackets = []
+
+    def multiply(start, factor):
+        for run in runs[start:]:
+            run[1] *= factor
+
+    for match in _ATTENTION_RE.finditer(prompt):
+        text, weight = match.group(0), match.group(1)
+        if text.startswith('\\'):
+            runs.append([text[1:], 1.0])
+        elif text.startswith('<') and len(text) > 1:
+            network = _EXTRA_NETWORK_RE.fullmatch(text)
+            if network:
+                multiplier = _float(network.group(3), 1.0)
+                runs.append([',', 1.0])
+                runs.append([f"<{network.group(1)}:{network.group(2).strip()}>", multiplier])
+                runs.append([',', 1.0])
+            else:
+                runs.append([text, 1.0])
+        elif text == '(':
+            round_brackets.append(len(runs))
+        elif text == '[':
+            square_brackets.append(len(runs))
+        elif weight is not None and round_brackets:
+            multiply(round_brackets.pop(), _float(weight, ROUND_FACTOR))
+        elif text == ')' and round_brackets:
+            multiply(round_brackets.pop(), ROUND_FACTOR)
+        elif text == ']' and square_brackets:
+            multiply(square_brackets.pop(), 1 / ROUND_FACTOR)
+        else:
+            runs.append([text, 1.0])
+
+    # Unclosed brackets still apply to everything after them
+    for start in round_brackets:
+        multiply(start, ROUND_FACTOR)
+    for start in square_brackets:
+        multiply(start, 1 / ROUND_FACTOR)
+
+    merged = []
+    for text, weight in runs:
+        weight = round(weight, 4)
+        if merged and merged[-1][1] == weight:
+            merged[-1] = (merged[-1][0] + text, weight)
+        else:
+            merged.append((text, weight))
+    return merged
+
+
+def _float(text, default):
+    try:
+        return float(text)
+    except (TypeError, ValueError):
+        return default
+
+
+@lru_cache(maxsize=4096)
+def weighted_tags(prompt):
+    """Prompt -> ((tag, weight), ...) with tags split on commas and BREAK.
+
+    A comma-separated tag written with several weights, like ``best (quality:1.3)``,
+    yields one tag per weight: ``best`` at 1.0 and ``quality`` at 1.3.
+    """
+    tags = []
+    for text, weight in parse_attention(prompt):
+        for part in _BREAK_RE.sub(',', text).split(','):
+            tag = normalize_category(part)
+            if tag:
+                tags.append((tag, weight))
+    return tuple(tags)
+
+
+@lru_cache(maxsize=512)
+def weight_term(term):
+    """``masterpiece:>1.1`` -> ('masterpiece', '>', 1.1); None for ordinary terms."""
+    match = _WEIGHT_TERM_RE.match(term)
+    if not match:
+        return None
+    return normalize_category(match.group(1)), match.group(2), float(match.group(3))
+
+
+def weight_satisfies(weight, op, value):
+    if op == '>':
+        return weight > value
+    if op == '>=':
+        return weight >= value
+    if op == '<':
+        return weight < value
+    if op == '<=':
+        return weight <= value
+    if op == '=':
+        return abs(weight - value) < 1e-6
+    return abs(weight - value) >= 1e-6
+
+
+def prompt_has_weight(prompt, tag, op, value):
+    """Whether ``prompt`` weighs ``tag`` in a way the comparison accepts."""
+    return any(t == tag and weight_satisfies(weight, op, value) for t, weight in weighted_tags(prompt))
@@ -0,0 +1,130 @@
+import json
+
+from core.searcher import MetadataSearcher, SearchResultStream, process_file_matches
+
+# Query file keys -> MetadataSearcher arguments
+QUERY_KEYS = {
+    'term': 'search_term',
+    'ignore': 'ignore_term',
+    'filter': 'custom_filter',
+    'where': 'where',
+    'copy_to': 'copy_path',
+    'move_to': 'move_path',
+    'case_sensitive': 'case_sensitive',
+    'positive': 'search_positive',
+    'negative': 'search_negative',
+}
+
+
+def load_batch_queries(path):
+    """Read a query file: a JSON object mapping query names to their settings.
+
+    ``{"red hair": {"term": "red hair", "ignore": "sketch", "copy_to": "out/red"}}``
+    Keys are those of QUERY_KEYS; every query needs a ``term`` or a ``where``.
+    Raises ValueError for a file that does not describe any valid query.
+    """
+    try:
+        with open(path, 'r', encoding='utf-8-sig') as f:
+            data = json.load(f)
+    except (OSError, json.JSONDecodeError) as e:
+        raise ValueError(f"Cannot read query file {path}: {e}")
+    if not isinstance(data, dict) or not data:
+        raise ValueError(f"Query file {path} must map query names to their settings")
+    queries = []
+    for name, settings in data.items():
+        if not isinstance(settings, dict):
+            raise ValueError(f"Query '{name}' must be an object")
+        unknown = sorted(set(settings) - set(QUERY_KEYS))
+        if unknown:
+            raise ValueError(f"Query '{name}' has unknown keys: {', '.join(unknown)}")
+        if not settings.get('term') and not settings.get('where'):
+            raise ValueError(f"Query '{name}' needs a term or a where filter")
+        queries.append((name, {QUERY_KEYS[key]: value for key, value in settings.items()}))
+    return queries
+
+
+class BatchSearcher:
+    """Runs several named queries over a single pass through a folder.
+
+    Every query gets its own MetadataSearcher, which keeps its own terms,
+    filters and copy/move destination. The scan reads and parses each PNG
+    once, evaluates all queries on it and hands each match to the searcher
+    whose query it satisfies; with ``use_index`` the catalog is opened once
+    and every query is answered from it.
+    """
+
+    def __init__(self, queries, recursive=False, log_path=None, lang=None, worker_pool=None,
+                 use_index=False, match_folder_structure=True, create_or_subfolders=False):
+        self.lang = lang
+        self.use_index = use_index
+        self.coordinator = MetadataSearcher(None, recursive=recursive, log_path=log_path, lang=lang,
+                                            worker_pool=worker_pool, use_index=use_index)
+        self.searchers = []
+        for name, settings in queries:
+            settings = dict(settings)
+            searcher = MetadataSearcher(settings.pop('search_term', None), recursive=recursive, log_path=log_path,
+                                        lang=lang, worker_pool=worker_pool, use_index=use_index, **settings)
+            searcher.match_folder_structure = match_folder_structure
+            searcher.create_or_subfolders = create_or_subfolders
+            self.searchers.append((name, searcher))
+
+    @property
+    def result_stream(self):
+        return self.coordinator.result_stream
+
+    def set_progress_callback(self, callback):
+        self.coordinator.set_progress_callback(callback)
+
+    def search_images(self, folder_path):
+        coordinator = self.coordinator
+        coordinator.search_root = folder_path
+        if coordinator.result_stream.closed:
+            coordinator.result_stream = SearchResultStream()
+        try:
+            self._search_images(folder_path)
+        finally:
+            coordinator.result_stream.close()
+
+    def _search_images(self, folder_path):
+        coordinator = self.coordinator
+        coordinator.log(self.lang.get_string("messages.batch_queries").format(len(self.searchers), folder_path))
+        searchers = [searcher for _, searcher in self.searchers]
+        for searcher in searchers:
+            searcher.search_root = folder_path
+            searcher._reset_results()
+
+        if self.use_index:
+            total_files, counts = self._search_catalog(folder_path, searchers)
+        else:
+            coordinator.log(self.lang.get_string("progress.counting"))
+            total_files = coordinator.count_files(folder_path)
+            coordinator.log(self.lang.get_string("progress.found_files").format(total_files))
+            png_files = coordinator.get_all_png_files(folder_path)
+            counts = coordinator._scan_files(png_files, total_files, searchers)
+
+        for (name, searcher), matching_files in zip(self.searchers, counts):
+            searcher.log("\n" + self.lang.get_string("messages.batch_query").format(name))
+            searcher._log_results(total_files, matching_files)
+
+    def _search_catalog(self, folder_path, searchers):
+        from core.index_search import evaluate_query
+
+        coordinator = self.coordinator
+        catalog = coordinator._open_catalog(folder_path)
+        matches = {}
+        for searcher in searchers:
+            results = evaluate_query(catalog, searcher.search_term, searcher.ignore_term, searcher.search_positive,
+                                     searcher.search_negative, searcher.case_sensitive, searcher.custom_filter,
+                                     searcher.where)
+            for doc_id, match in results:
+                matches.setdefault(doc_id, []).append((searcher, match))
+        # File by file, so a query moving a file never runs before the others copied it
+        pending_stream = []
+        for doc_id in sorted(matches):
+            pending_stream.extend(process_file_matches(catalog.paths[doc_id], matches[doc_id],
+                                                       catalog.record(doc_id), catalog.stat(doc_id)))
+            if len(pending_stream) >= coordinator.stream_batch_size:
+                coordinator.result_stream.publish(pending_stream)
+                pending_stream = []
+        coordinator.result_stream.publish(pending_stream)
+        return len(catalog), [len(searcher.found_paths) for searcher in searchers]
@@ -0,0 +1,16 @@
+import os
+import sys
+
+
+def get_cache_dir():
+    if getattr(sys, 'frozen', False):
+        # Running as PyInstaller exe — keep the cache next to the exe
+        return os.path.join(os.path.dirname(sys.executable), 'metadata_cache')
+    # File lives at src/core/; go up to src/ then to root/
+    src_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    return os.path.join(os.path.dirname(src_dir), 'metadata_cache')
+
+
+def planner_stats_path():
+    """File holding the query planner's term statistics between runs."""
+    return os.path.join(get_cache_dir(), 'planner_stats.json')
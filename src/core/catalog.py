@@ -0,0 +1,408 @@
+import os
+import json
+import time
+import shutil
+import hashlib
+import threading
+
+import numpy as np
+
+from core.cache_paths import get_cache_dir
+from core.columns import Column, StringPool
+from core.facet_columns import FacetColumns
+from core.field_index import FieldIndex
+from core.image_hash import BKTree, hash_image
+from core.lora_index import LoraIndex
+from core.metadata_store import MetadataStore, CATEGORY, INTEGER, INT_OTHER
+from core.minhash import MinHashIndex, cluster_labels
+from core.scan_worker import LORA_TERMS, fold_text, read_image_metadata
+from core.tag_index import PROMPT_FIELDS, TagIndex
+from core.trigram_index import TrigramIndex, requirement_met, integer_could_meet
+
+CATALOG_VERSION = 11
+
+# hash_state values
+HASH_PENDING, HASH_DONE, HASH_UNREADABLE = 0, 1, 2
+
+
+def list_png_files(folder_path, recursive):
+    """Map every PNG under ``folder_path`` to its (size, mtime_ns) stat key."""
+    files = {}
+    pending = [folder_path]
+    while pending:
+        current = pending.pop()
+        try:
+            entries = list(os.scandir(current))
+        except OSError:
+            continue
+        for entry in entries:
+            try:
+                if entry.is_dir(follow_symlinks=True):
+                    if recursive:
+                        pending.append(entry.path)
+                elif entry.name.lower().endswith('.png'):
+                    stat = entry.stat()
+                    files[entry.path] = (stat.st_size, stat.st_mtime_ns)
+            except OSError:
+                continue
+    return files
+
+
+class MetadataCatalog:
+    """Parsed metadata for every PNG under a folder, kept in columns and cached on disk.
+
+    Documents are append-only: a changed file gets a new doc id and its old one
+    is tombstoned, so refreshing never rewrites existing index postings. The
+    catalog is compacted once tombstones make up a quarter of it.
+
+    The cache is a directory of .npy files that are memory-mapped on open.
+    Every save writes a new generation and then switches the ``current``
+    pointer, so a reader never sees a half-written catalog and files still
+    mapped by another process are left alone.
+    """
+
+    def __init__(self, folder_path, recursive):
+        self.folder_path = os.path.abspath(folder_path)
+        self.recursive = recursive
+        self.lock = threading.RLock()
+        self._reset()
+
+    def _reset(self):
+        self.paths = StringPool()
+        self.sizes = Column('q')
+        self.mtimes = Column('q')
+        self.alive = Column('B')
+        self.has_metadata = Column('B')
+        self.ascii_prompts = Column('B')
+        self.image_hashes = Column('Q')
+        self.hash_state = Column('B')
+        self.store = MetadataStore()
+        self.tag_index = TagIndex()
+        self.trigram_index = TrigramIndex()
+        self.facets = FacetColumns()
+        self.field_index = FieldIndex()
+        self.lora_index = LoraIndex()
+        self.minhash = MinHashIndex()
+        self._doc_ids = {}
+        self.dirty = True
+
+    @property
+    def doc_ids(self):
+        """Path -> live doc id, built on first use after loading."""
+        if self._doc_ids is None:
+            alive = self.alive.values()
+            self._doc_ids = {path: doc_id for doc_id, path in enumerate(self.paths) if alive[doc_id]}
+        return self._doc_ids
+
+    def __len__(self):
+        return int(np.count_nonzero(self.alive.values()))
+
+    @property
+    def size(self):
+        """Number of doc ids handed out, including tombstones."""
+        return len(self.paths)
+
+    @property
+    def cache_path(self):
+        key = f"{os.path.normcase(self.folder_path)}|{int(bool(self.recursive))}"
+        digest = hashlib.sha1(key.encode('utf-8')).hexdigest()[:16]
+        return os.path.join(get_cache_dir(), f"catalog-{digest}")
+
+    @classmethod
+    def open(cls, folder_path, recursive):
+        """Map the cached catalog for a folder, or start an empty one."""
+        catalog = cls(folder_path, recursive)
+        try:
+            with open(os.path.join(catalog.cache_path, 'current'), 'r', encoding='utf-8') as f:
+                directory = os.path.join(catalog.cache_path, f.read().strip())
+            with open(os.path.join(directory, 'manifest.json'), 'r', encoding='utf-8') as f:
+                manifest = json.load(f)
+            if manifest.get('version') == CATALOG_VERSION:
+                catalog._load(directory, manifest)
+        except (OSError, ValueError, KeyError, TypeError):
+            catalog._reset()
+        return catalog
+
+    def _load(self, directory, manifest):
+        self.paths = StringPool.load(directory, 'paths')
+        self.sizes = Column.load(directory, 'sizes', 'q')
+        self.mtimes = Column.load(directory, 'mtimes', 'q')
+        self.alive = Column.load(directory, 'alive', 'B')
+        self.has_metadata = Column.load(directory, 'has_metadata', 'B')
+        self.ascii_prompts = Column.load(directory, 'ascii_prompts', 'B')
+        self.image_hashes = Column.load(directory, 'image_hashes', 'Q')
+        self.hash_state = Column.load(directory, 'hash_state', 'B')
+        self.store = MetadataStore.load(directory, manifest['store'])
+        self.tag_index = TagIndex.load(directory)
+        self.trigram_index = TrigramIndex.load(directory)
+        self.facets = FacetColumns.load(directory)
+        self.field_index = FieldIndex.load(directory)
+        self.lora_index = LoraIndex.load(directory)
+        self.minhash = MinHashIndex.load(directory)
+        self._doc_ids = None
+        self.dirty = False
+
+    def save(self):
+        if not self.dirty:
+            return
+        with self.lock:
+            generation = f"g{time.time_ns()}"
+            directory = os.path.join(self.cache_path, generation)
+            os.makedirs(directory, exist_ok=True)
+            self.paths.save(directory, 'paths')
+            for name in ('sizes', 'mtimes', 'alive', 'has_metadata', 'ascii_prompts', 'image_hashes', 'hash_state'):
+                getattr(self, name).save(directory, name)
+            self.store.save(directory)
+            self.tag_index.save(directory)
+            self.trigram_index.save(directory)
+            self.facets.save(directory)
+            self.field_index.save(directory)
+            self.lora_index.save(directory)
+            self.minhash.save(directory)
+            with open(os.path.join(directory, 'manifest.json'), 'w', encoding='utf-8') as f:
+                json.dump({'version': CATALOG_VERSION, 'folder': self.folder_path,
+                           'recursive': bool(self.recursive), 'store': self.store.state()}, f)
+
+            pointer = os.path.join(self.cache_path, 'current')
+            with open(pointer + '.tmp', 'w', encoding='utf-8') as f:
+                f.write(generation)
+            os.replace(pointer + '.tmp', pointer)
+            self.dirty = False
+
+        for name in os.listdir(self.cache_path):
+            if name.startswith('g') and name != generation:
+                # Still mapped elsewhere on Windows; it goes on a later save
+                shutil.rmtree(os.path.join(self.cache_path, name), ignore_errors=True)
+
+    def refresh(self, executor=None, progress_callback=None):
+        """Bring the catalog in line with the folder; only new or changed files are parsed.
+
+        Returns (new, changed, removed) file counts.
+        """
+        files = list_png_files(self.folder_path, self.recursive)
+        with self.lock:
+            doc_ids = self.doc_ids
+            removed = [path for path in doc_ids if path not in files]
+            changed = [path for path, stat in files.items()
+                       if path in doc_ids and self.stat(doc_ids[path]) != stat]
+            new = [path for path in files if path not in doc_ids]
+            for path in removed + changed:
+                self._remove(path)
+
+        to_parse = sorted(changed + new)
+        if to_parse:
+            results = (executor.map(read_image_metadata, to_parse, chunksize=32)
+                       if executor is not None else map(read_image_metadata, to_parse))
+            for done, (path, metadata) in enumerate(results, 1):
+                with self.lock:
+                    self._add(path, files[path], metadata)
+                if progress_callback:
+                    progress_callback("indexing", done, len(to_parse))
+
+        with self.lock:
+            if self.size and (self.size - len(self.doc_ids)) * 4 > self.size:
+                self.compact()
+        return len(new), len(changed), len(removed)
+
+    def update_image_hashes(self, executor=None, progress_callback=None):
+        """Perceptual-hash every live image that has no hash yet; returns how many were hashed.
+
+        A changed file gets a new doc id, so only new and changed files are
+        decoded; everything else keeps the hash stored with the catalog.
+        """
+        with self.lock:
+            pending = np.flatnonzero(self.alive.values().astype(bool)
+                                     & (self.hash_state.values() == HASH_PENDING))
+            paths = {self.paths[doc_id]: int(doc_id) for doc_id in pending}
+        if not paths:
+            return 0
+        results = (executor.map(hash_image, list(paths), chunksize=16)
+                   if executor is not None else map(hash_image, paths))
+        for done, (path, image_hash) in enumerate(results, 1):
+            with self.lock:
+                doc_id = paths[path]
+                if image_hash is None:
+                    self.hash_state.set(doc_id, HASH_UNREADABLE)
+                else:
+                    self.image_hashes.set(doc_id, image_hash)
+                    self.hash_state.set(doc_id, HASH_DONE)
+                self.dirty = True
+            if progress_callback:
+                progress_callback("hashing", done, len(paths))
+        return len(paths)
+
+    def duplicate_images(self, radius):
+        """Groups of live docs whose perceptual hashes are within ``radius`` bits.
+
+        Returns [doc_ids] for every group of two or more, largest first. Images
+        are linked when their hashes are close, and a group is everything
+        connected by such links.
+        """
+        with self.lock:
+            docs = np.flatnonzero(self.alive.values().astype(bool) & (self.hash_state.values() == HASH_DONE))
+            hashes, inverse = np.unique(self.image_hashes.values()[docs], return_inverse=True)
+        hashes = [int(h) for h in hashes]
+        labels = list(range(len(hashes)))
+
+        def find(i):
+            while labels[i] != i:
+                labels[i] = labels[labels[i]]
+                i = labels[i]
+            return i
+
+        if radius > 0:
+            tree = BKTree(hashes)
+            position = {h: i for i, h in enumerate(hashes)}
+            for i, image_hash in enumerate(hashes):
+                for other in tree.query(image_hash, radius):
+                    a, b = find(i), find(position[other])
+                    if a != b:
+                        labels[max(a, b)] = min(a, b)
+        roots = np.array([find(i) for i in range(len(hashes))], dtype=np.int64)
+
+        doc_labels = roots[inverse.ravel()] if len(docs) else np.zeros(0, dtype=np.int64)
+        order = np.lexsort((docs, doc_labels))
+        doc_labels = doc_labels[order]
+        boundaries = np.flatnonzero(doc_labels[1:] != doc_labels[:-1]) + 1
+        groups = [group for group in np.split(docs[order], boundaries) if len(group) > 1]
+        groups.sort(key=lambda group: (-len(group), group[0]))
+        return groups
+
+    def stat(self, doc_id):
+        return self.sizes[doc_id], self.mtimes[doc_id]
+
+    def record(self, doc_id):
+        """The metadata dict of one document, as parse_exif_data returned it."""
+        return self.store.record(doc_id)
+
+    def _add(self, path, stat, metadata):
+        doc_id = self.paths.append(path)
+        self.sizes.append(stat[0])
+        self.mtimes.append(stat[1])
+        self.alive.append(1)
+        self.has_metadata.append(1 if metadata else 0)
+        self.ascii_prompts.append(1 if all(metadata.get(field, '').isascii() for field in PROMPT_FIELDS) else 0)
+        self.image_hashes.append(0)
+        self.hash_state.append(HASH_PENDING)
+        known_prompts = len(self.store.prompts)
+        self.store.add(metadata)
+        for prompt_id in range(known_prompts, len(self.store.prompts)):
+            folded = self.store.folded[prompt_id]
+            self.tag_index.add_prompt(prompt_id, self.store.prompts[prompt_id], folded)
+            self.trigram_index.add_prompt(prompt_id, folded)
+            self.minhash.add_prompt(prompt_id, self.store.prompts[prompt_id])
+        self.doc_ids[path] = doc_id
+        self.facets.add(metadata)
+        self.field_index.add(doc_id, metadata)
+        self.lora_index.add(doc_id, metadata)
+        self.dirty = True
+        return doc_id
+
+    def _remove(self, path):
+        doc_id = self.doc_ids.pop(path)
+        self.alive.set(doc_id, 0)
+        self.has_metadata.set(doc_id, 0)
+        self.dirty = True
+
+    def compact(self):
+        """Renumber live documents and rebuild the indexes without tombstones."""
+        with self.lock:
+            live = sorted(self.doc_ids.values())
+            entries = [(self.paths[d], self.stat(d), self.record(d), self.image_hashes[d], self.hash_state[d])
+                       for d in live]
+            self._reset()
+            for path, stat, metadata, image_hash, state in entries:
+                doc_id = self._add(path, stat, metadata)
+                self.image_hashes.set(doc_id, image_hash)
+                self.hash_state.set(doc_id, state)
+
+    @property
+    def prompt_count(self):
+        return len(self.store.prompts)
+
+    def prompt_docs(self, prompt_mask, fields=PROMPT_FIELDS):
+        """Docs whose prompt in any of ``fields`` is selected by ``prompt_mask``."""
+        mask = np.zeros(self.size, dtype=bool)
+        for field in fields:
+            entry = self.store.fields.get(field)
+            if entry is None or not len(prompt_mask):
+                continue
+            ids = entry[1].values()
+            mask |= (ids >= 0) & prompt_mask[np.maximum(ids, 0)]
+        return mask
+
+    def other_docs(self, requirement, casefolded):
+        """Docs whose non-prompt fields could meet a literal requirement; None if unknown.
+
+        ``casefolded`` requirements come from fold_text terms and are checked
+        against folded values. Others (regexes, case-sensitive terms) are only
+        ruled out for ASCII values, where folding cannot change what matches.
+        Categorical fields are checked once per distinct value. Integer fields
+        only hold digits, so they are ruled out unless the literals are numeric.
+        """
+        if requirement is None:
+            return None
+        mask = np.zeros(self.size, dtype=bool)
+        for key, (kind, column) in self.store.fields.items():
+            if kind == CATEGORY:
+                values = self.store.categories[key]
+                if not len(values):
+                    continue
+                if casefolded:
+                    met = (requirement_met(requirement, fold_text(v)) for v in values)
+                else:
+                    met = (not v.isascii() or requirement_met(requirement, fold_text(v)) for v in values)
+                met = np.fromiter(met, dtype=bool, count=len(values))
+                codes = column.values()
+                mask |= (codes >= 0) & met[np.maximum(codes, 0)]
+            elif kind == INTEGER:
+                if integer_could_meet(requirement):
+                    return None
+                mask |= column.values() == INT_OTHER
+        return mask
+
+    def field_docs(self, prefix, value):
+        """Docs matching a parsed ``prefix:value`` field term."""
+        index = self.lora_index if prefix in LORA_TERMS else self.field_index
+        return index.docs(prefix, value, self.size)
+
+    def lora_usage(self):
+        """[(LoRA name, image count)] over the live catalog, most used first."""
+        with self.lock:
+            return self.lora_index.usage(self.alive.values().astype(bool))
+
+    def near_duplicates(self, threshold):
+        """Clusters of live docs whose Positive prompts are near-duplicates.
+
+        Returns [(doc_ids, prompt_count)] for every cluster, largest first;
+        docs without a Positive prompt are left out.
+        """
+        with self.lock:
+            entry = self.store.fields.get('Positive')
+            if entry is None:
+                return []
+            doc_prompts = entry[1].values()
+            docs = np.flatnonzero(self.alive.values().astype(bool) & (doc_prompts >= 0))
+            if not len(docs):
+                return []
+            prompts, inverse = np.unique(doc_prompts[docs], return_inverse=True)
+            labels = cluster_labels(self.minhash.matrix()[prompts], threshold)
+        prompt_counts = np.bincount(labels, minlength=len(prompts))
+        doc_labels = labels[inverse.ravel()]
+        order = np.lexsort((docs, doc_labels))
+        doc_labels = doc_labels[order]
+        boundaries = np.flatnonzero(doc_labels[1:] != doc_labels[:-1]) + 1
+        clusters = [(group, int(prompt_counts[doc_labels[start]]))
+                    for group, start in zip(np.split(docs[order], boundaries), np.r_[0, boundaries])]
+        clusters.sort(key=lambda cluster: (-len(cluster[0]), cluster[0][0]))
+        return clusters
+
+    def searchable_mask(self):
+        """Live documents that have any parsed metadata."""
+        with self.lock:
+            return self.has_metadata.values().astype(bool)
+
+    def ascii_mask(self):
+        """Documents whose prompts are plain ASCII, where tag lookups are exact."""
+        with self.lock:
+            return self.ascii_prompts.values().astype(bool)
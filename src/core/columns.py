@@ -0,0 +1,245 @@
+import os
+from array import array
+
+import numpy as np
+
+
+# ---------------------------------------------------------------------------
+# Storage primitives for the metadata catalog
+#
+# Each structure has a read-only base part, memory-mapped from the .npy files
+# of the last save, and an in-memory delta that new documents are appended
+# to. Saving writes base + delta as new files; loading maps them without
+# reading the data, so opening a large catalog costs next to nothing.
+# ---------------------------------------------------------------------------
+
+def _save_array(directory, name, values):
+    np.save(os.path.join(directory, f"{name}.npy"), values, allow_pickle=False)
+
+
+def _load_array(directory, name):
+    path = os.path.join(directory, f"{name}.npy")
+    try:
+        # A plain ndarray view of the map; np.memmap indexing is much slower
+        return np.load(path, mmap_mode='r', allow_pickle=False).view(np.ndarray)
+    except ValueError:
+        # Empty arrays cannot be mapped
+        return np.load(path, allow_pickle=False)
+
+
+class Column:
+    """Growable typed column; ``typecode`` is an ``array`` typecode."""
+
+    def __init__(self, typecode, base=None):
+        self.typecode = typecode
+        self.dtype = np.dtype(typecode)
+        self._base = base if base is not None else np.empty(0, dtype=self.dtype)
+        self._delta = array(typecode)
+        self._cache = None
+
+    def __len__(self):
+        return len(self._base) + len(self._delta)
+
+    def __getitem__(self, index):
+        base_len = len(self._base)
+        return self._base[index].item() if index < base_len else self._delta[index - base_len]
+
+    def append(self, value):
+        self._delta.append(value)
+        self._cache = None
+
+    def extend(self, values):
+        self._delta.extend(values)
+        self._cache = None
+
+    def fill(self, value, count):
+        self._delta.extend([value] * count)
+        self._cache = None
+
+    def set(self, index, value):
+        base_len = len(self._base)
+        if index >= base_len:
+            self._delta[index - base_len] = value
+        else:
+            if not self._base.flags.writeable:
+                self._base = np.array(self._base)
+            self._base[index] = value
+        self._cache = None
+
+    def values(self):
+        """All values as one NumPy array (a mapped view when nothing was appended)."""
+        if not self._delta:
+            return self._base
+        if self._cache is None:
+            self._cache = np.concatenate([self._base, np.array(self._delta, dtype=self.dtype)])
+        return self._cache
+
+    def save(self, directory, name):
+        _save_array(directory, name, np.ascontiguousarray(self.values()))
+
+    @classmethod
+    def load(cls, directory, name, typecode):
+        return cls(typecode, _load_array(directory, name))
+
+
+class StringPool:
+    """Append-only list of strings stored as one UTF-8 blob plus byte offsets.
+
+    ``intern`` deduplicates; its lookup table is only built the first time it
+    is needed, so read-only use of a loaded pool never decodes every string.
+    """
+
+    def __init__(self, blob=None, offsets=None):
+        self._blob = blob if blob is not None else np.empty(0, dtype=np.uint8)
+        self._offsets = offsets if offsets is not None else np.zeros(1, dtype=np.int64)
+        self._delta = []
+        self._index = None
+
+    def __len__(self):
+        return len(self._offsets) - 1 + len(self._delta)
+
+    def __getitem__(self, index):
+        base_len = len(self._offsets) - 1
+        if index >= base_len:
+            return self._delta[index - base_len]
+        start, end = self._offsets[index], self._offsets[index + 1]
+        return self._blob[start:end].tobytes().decode('utf-8')
+
+    def __iter__(self):
+        base_len = len(self._offsets) - 1
+        if base_len:
+            data = self._blob.tobytes()
+            offsets = self._offsets.tolist()
+            text = data.decode('utf-8')
+            if len(text) == len(data):
+                # Pure ASCII: byte offsets are character offsets
+                for i in range(base_len):
+                    yield text[offsets[i]:offsets[i + 1]]
+            else:
+                for i in range(base_len):
+                    yield data[offsets[i]:offsets[i + 1]].decode('utf-8')
+        yield from self._delta
+
+    def append(self, text):
+        if self._index is not None:
+            self._index.setdefault(text, len(self))
+        self._delta.append(text)
+        return len(self) - 1
+
+    def intern(self, text):
+        """Index of ``text``, appending it if it is new."""
+        if self._index is None:
+            self._index = {}
+            for i, value in enumerate(self):
+                self._index.setdefault(value, i)
+        index = self._index.get(text)
+        if index is None:
+            index = self.append(text)
+        return index
+
+    def save(self, directory, name):
+        encoded = [text.encode('utf-8') for text in self._delta]
+        lengths = np.fromiter((len(b) for b in encoded), dtype=np.int64, count=len(encoded))
+        base_end = self._offsets[-1]
+        offsets = np.concatenate([self._offsets, base_end + np.cumsum(lengths)])
+        blob = np.concatenate([np.asarray(self._blob[:base_end]),
+                               np.frombuffer(b''.join(encoded), dtype=np.uint8)])
+        _save_array(directory, f"{name}.blob", blob)
+        _save_array(directory, f"{name}.offsets", offsets)
+
+    @classmethod
+    def load(cls, directory, name):
+        return cls(_load_array(directory, f"{name}.blob"), _load_array(directory, f"{name}.offsets"))
+
+
+class PostingTable:
+    """Key -> sorted uint32 ids, with new postings appended in memory.
+
+    The key lookup table of a loaded table is built on first use.
+    """
+
+    def __init__(self, keys=None, offsets=None, docs=None):
+        self._key_pool = keys
+        self._key_index = {} if keys is None else None
+        self._offsets = offsets if offsets is not None else np.zeros(1, dtype=np.int64)
+        self._docs = docs if docs is not None else np.empty(0, dtype=np.uint32)
+        self._delta = {}
+
+    @property
+    def _keys(self):
+        if self._key_index is None:
+            self._key_index = {key: i for i, key in enumerate(self._key_pool)}
+        return self._key_index
+
+    def __len__(self):
+        return len(self._keys) + sum(1 for key in self._delta if key not in self._keys)
+
+    def __iter__(self):
+        yield from self._keys
+        for key in self._delta:
+            if key not in self._keys:
+                yield key
+
+    def __contains__(self, key):
+        return key in self._keys or key in self._delta
+
+    def append(self, key, doc_id):
+        posting = self._delta.get(key)
+        if posting is None:
+            posting = self._delta[key] = array('I')
+        posting.append(doc_id)
+
+    def count(self, key):
+        index = self._keys.get(key)
+        base = 0 if index is None else int(self._offsets[index + 1] - self._offsets[index])
+        return base + len(self._delta.get(key, ()))
+
+    def get(self, key):
+        """Ids for ``key`` as a uint32 array, or None if the key is unknown."""
+        index = self._keys.get(key)
+        delta = self._delta.get(key)
+        base = None if index is None else self._docs[self._offsets[index]:self._offsets[index + 1]]
+        if delta is None:
+            return base
+        delta = np.array(delta, dtype=np.uint32)
+        return delta if base is None else np.concatenate([base, delta])
+
+    def segments(self):
+        """(keys, lengths, ids): every posting list concatenated, with a number per key.
+
+        A key with postings both on disk and in memory has two segments that
+        share its number; numbers run from 0 to the number of keys.
+        """
+        base_count = len(self._offsets) - 1
+        keys = [np.arange(base_count)]
+        lengths = [np.diff(self._offsets)]
+        ids = [np.asarray(self._docs)]
+        if self._delta:
+            known = self._keys
+            numbers = {}
+            for key, posting in self._delta.items():
+                number = known.get(key)
+                if number is None:
+                    number = numbers.setdefault(key, base_count + len(numbers))
+                keys.append(np.array([number]))
+                lengths.append(np.array([len(posting)]))
+                ids.append(np.array(posting, dtype=np.uint32))
+        return np.concatenate(keys), np.concatenate(lengths), np.concatenate(ids)
+
+    def save(self, directory, name):
+        keys = list(self)
+        postings = [self.get(key) for key in keys]
+        lengths = np.fromiter((len(p) for p in postings), dtype=np.int64, count=len(postings))
+        offsets = np.concatenate([np.zeros(1, dtype=np.int64), np.cumsum(lengths)])
+        docs = np.concatenate(postings) if postings else np.empty(0, dtype=np.uint32)
+        pool = StringPool()
+        for key in keys:
+            pool.append(key)
+        pool.save(directory, f"{name}.keys")
+        _save_array(directory, f"{name}.offsets", offsets)
+        _save_array(directory, f"{name}.docs", docs.astype(np.uint32, copy=False))
+
+    @classmethod
+    def load(cls, directory, name):
+        keys = StringPool.load(directory, f"{name}.keys")
+        return cls(keys, _load_array(directory, f"{name}.offsets"), _load_array(directory, f"{name}.docs"))
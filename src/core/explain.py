@@ -0,0 +1,167 @@
+import re
+
+import numpy as np
+
+from core.attention import weight_term
+from core.scan_worker import FIELD_TERMS, field_term, split_query, term_kind, term_matcher
+from core.trigram_index import regex_requirements
+
+
+# ---------------------------------------------------------------------------
+# Query EXPLAIN
+#
+# ``explain_query`` describes how a search will run before it starts: the
+# compiled form of every term, which index answers it and how many documents
+# it leaves as candidates. ``profile_rows`` turns the counters collected
+# during the run into per-term evaluation counts, match rates and time. Both
+# are plain dicts and lists, so the GUI can take them as JSON.
+# ---------------------------------------------------------------------------
+
+def describe_requirement(requirement):
+    """Readable form of a literal requirement tree from core.trigram_index."""
+    if requirement is None:
+        return None
+    kind, value = requirement
+    if kind == 'lit':
+        return repr(value)
+    parts = [describe_requirement(child) for child in value]
+    if kind == 'or':
+        return "(" + " OR ".join(parts) + ")"
+    return " AND ".join(parts)
+
+
+def compile_term(term, case_sensitive):
+    """The form a term is evaluated in, without any index."""
+    field = field_term(term)
+    if field is not None:
+        prefix, value = field
+        return {'field': FIELD_TERMS[prefix], 'value': value,
+                'match': 'hash prefix' if prefix == 'lorahash' else 'exact'}
+    weighted = weight_term(term)
+    if weighted is not None:
+        tag, op, value = weighted
+        return {'tag': tag, 'op': op, 'weight': value}
+    matcher = term_matcher(term, case_sensitive)
+    return {'needle': matcher.needle,
+            'regex': matcher.pattern.pattern if matcher.pattern is not None else None,
+            'case_sensitive': bool(case_sensitive)}
+
+
+def _explain_groups(query, catalog, search_positive, search_negative, case_sensitive):
+    from core.index_search import explain_term
+
+    groups = []
+    for or_index, or_group, terms in split_query(query or ''):
+        entries = []
+        for term in terms:
+            entry = {'term': term, 'kind': term_kind(term), 'compiled': compile_term(term, case_sensitive),
+                     'index': 'scan', 'candidates': None, 'exact': False}
+            if catalog is not None:
+                entry['index'], entry['candidates'], entry['exact'] = explain_term(
+                    catalog, term, search_positive, search_negative, case_sensitive)
+            entries.append(entry)
+        groups.append({'or_index': or_index, 'group': or_group, 'terms': entries})
+    return groups
+
+
+def explain_query(search_term, ignore_term, custom_filter, where, search_positive, search_negative,
+                  case_sensitive, catalog=None):
+    """How a query will be evaluated; ``catalog`` is given when the metadata index answers it."""
+    if search_positive or search_negative:
+        fields = [name for name, selected in (('Positive', search_positive), ('Negative', search_negative))
+                  if selected]
+    else:
+        fields = ['all']
+    report = {
+        'mode': 'index' if catalog is not None else 'scan',
+        'documents': len(catalog) if catalog is not None else None,
+        'fields': fields,
+        'search_term': search_term,
+        'ignore_term': ignore_term or None,
+        'search': _explain_groups(search_term, catalog, search_positive, search_negative, case_sensitive),
+        'ignore': _explain_groups(ignore_term, catalog, search_positive, search_negative, case_sensitive),
+        'where': None,
+        'filter': None,
+    }
+    if where:
+        report['where'] = {'clauses': [[facet, op, value if isinstance(value, (str, int, float)) else list(value)]
+                                       for facet, op, value in where],
+                           'candidates': None}
+        if catalog is not None:
+            report['where']['candidates'] = int(np.count_nonzero(
+                catalog.facets.mask(where, catalog.size) & catalog.searchable_mask()))
+    if custom_filter:
+        pattern = custom_filter.strip()
+        try:
+            re.compile(pattern)
+            valid = True
+        except re.error:
+            valid = False
+        requirement = regex_requirements(pattern) if valid else None
+        report['filter'] = {'pattern': pattern, 'valid': valid,
+                            'required_literals': describe_requirement(requirement),
+                            'index': 'trigram index' if catalog is not None and requirement is not None else 'scan',
+                            'candidates': None}
+        if catalog is not None and requirement is not None:
+            from core.index_search import explain_filter
+            report['filter']['candidates'] = explain_filter(catalog, pattern)
+    return report
+
+
+def merge_profile(total, profile):
+    """Add a profile dict ({key: [evaluations, matches, seconds]}) into ``total``."""
+    for key, (evaluations, matches, seconds) in (profile or {}).items():
+        entry = total.setdefault(key, [0, 0, 0.0])
+        entry[0] += evaluations
+        entry[1] += matches
+        entry[2] += seconds
+    return total
+
+
+def profile_rows(profile):
+    """Profile counters as rows, slowest first."""
+    rows = []
+    for (kind, text), (evaluations, matches, seconds) in profile.items():
+        rows.append({'kind': kind, 'text': text, 'evaluations': evaluations, 'matches': matches,
+                     'match_rate': matches / evaluations if evaluations else None, 'seconds': seconds})
+    return sorted(rows, key=lambda row: (-row['seconds'], row['text']))
+
+
+def format_explain(report):
+    """Log lines for an explain_query report."""
+    documents = f" ({report['documents']} documents)" if report['documents'] is not None else ""
+    lines = [f"Mode: {report['mode']}{documents}", f"Fields: {', '.join(report['fields'])}"]
+
+    def candidates(count):
+        return "?" if count is None else str(count)
+
+    for section in ('search', 'ignore'):
+        for group in report[section]:
+            lines.append(f"{section.capitalize()} group {group['or_index']}: {group['group']}")
+            for term in group['terms']:
+                compiled = ", ".join(f"{key}={value!r}" for key, value in term['compiled'].items())
+                exact = " exact" if term['exact'] else ""
+                lines.append(f"    {term['term']!r} [{term['kind']}] {compiled}  ->  "
+                             f"{term['index']}{exact}, candidates: {candidates(term['candidates'])}")
+    if report['where']:
+        clauses = " && ".join(f"{facet} {op} {value}" for facet, op, value in report['where']['clauses'])
+        lines.append(f"Where: {clauses}  ->  facet columns, candidates: "
+                     f"{candidates(report['where']['candidates'])}")
+    if report['filter']:
+        regex = report['filter']
+        if not regex['valid']:
+            lines.append(f"Filter: {regex['pattern']!r} is not a valid regex; nothing will match")
+        else:
+            lines.append(f"Filter: {regex['pattern']!r} requires {regex['required_literals'] or 'nothing'}  ->  "
+                         f"{regex['index']}, candidates: {candidates(regex['candidates'])}")
+    return lines
+
+
+def format_profile(rows):
+    """Log lines for profile_rows output."""
+    lines = [f"{'evaluations':>12}  {'matches':>9}  {'rate':>7}  {'time ms':>9}  term"]
+    for row in rows:
+        rate = "-" if row['match_rate'] is None else f"{100 * row['match_rate']:.1f}%"
+        label = row['text'] if row['kind'] == 'term' else f"filter: {row['text']}"
+        lines.append(f"{row['evaluations']:>12}  {row['matches']:>9}  {rate:>7}  {1000 * row['seconds']:>9.2f}  {label}")
+    return lines
@@ -0,0 +1,95 @@
+import numpy as np
+
+from core.columns import Column, StringPool
+from core.facets import FACETS, NUMERIC, facet_value
+
+
+class FacetColumns:
+    """Typed per-document columns for the generation-setting facets.
+
+    Numeric facets are float64 columns with NaN for missing values;
+    categorical facets are int32 codes into an interned value list, -1 when
+    missing. Columns grow with the catalog's doc ids and are filtered with
+    vectorized NumPy predicates.
+    """
+
+    def __init__(self):
+        self.numeric = {}
+        self.codes = {}
+        self.categories = {}
+        for facet, (_, kind) in FACETS.items():
+            if kind == NUMERIC:
+                self.numeric[facet] = Column('d')
+            else:
+                self.codes[facet] = Column('i')
+                self.categories[facet] = StringPool()
+
+    def add(self, metadata):
+        for facet, column in self.numeric.items():
+            column.append(facet_value(metadata, facet))
+        for facet, column in self.codes.items():
+            value = facet_value(metadata, facet)
+            column.append(-1 if value is None else self.categories[facet].intern(value))
+
+    def values(self, facet):
+        """Distinct values of a categorical facet, for listing what can be filtered on."""
+        return list(self.categories[facet])
+
+    def save(self, directory):
+        for facet, column in self.numeric.items():
+            column.save(directory, f"facet.{facet}")
+        for facet, column in self.codes.items():
+            column.save(directory, f"facet.{facet}")
+            self.categories[facet].save(directory, f"facet.{facet}.values")
+
+    @classmethod
+    def load(cls, directory):
+        columns = cls()
+        for facet in columns.numeric:
+            columns.numeric[facet] = Column.load(directory, f"facet.{facet}", 'd')
+        for facet in columns.codes:
+            columns.codes[facet] = Column.load(directory, f"facet.{facet}", 'i')
+            columns.categories[facet] = StringPool.load(directory, f"facet.{facet}.values")
+        return columns
+
+    def _clause_mask(self, facet, op, operand):
+        if facet in self.numeric:
+            column = self.numeric[facet].values()
+            present = ~np.isnan(column)
+            if op == '=':
+                return column == operand
+            if op == '!=':
+                return present & (column != operand)
+            if op == '<':
+                return column < operand
+            if op == '<=':
+                return column <= operand
+            if op == '>':
+                return column > operand
+            if op == '>=':
+                return column >= operand
+            if op == 'in':
+                return np.isin(column, np.array(operand, dtype=np.float64))
+            low, high = operand
+            mask = present
+            if low is not None:
+                mask = mask & (column >= low)
+            if high is not None:
+                mask = mask & (column <= high)
+            return mask
+
+        column = self.codes[facet].values()
+        categories = self.categories[facet]
+        wanted = set(operand if op == 'in' else (operand,))
+        wanted_codes = np.array([code for code, value in enumerate(categories) if value in wanted], dtype=np.int32)
+        mask = np.isin(column, wanted_codes)
+        if op == '!=':
+            return (column >= 0) & ~mask
+        return mask
+
+    def mask(self, clauses, size):
+        """Docs passing every clause; comparisons with missing values are always False."""
+        mask = np.ones(size, dtype=bool)
+        for facet, op, operand in clauses:
+            mask &= self._clause_mask(facet, op, operand)
+        return mask
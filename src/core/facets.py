@@ -0,0 +1,150 @@
+import re
+import math
+
+
+# ---------------------------------------------------------------------------
+# Generation-setting filters
+#
+# A filter is a list of clauses joined with &&, e.g.
+#     steps>=30 && cfg in 5..7 && sampler=DPM++ 2M && size=1024x1536
+# Numeric facets support = != < <= > >= and "in lo..hi" ranges or lists;
+# categorical facets support = != and "in a, b" lists (case-insensitive).
+# A file without the setting never passes a clause about it.
+#
+# Kept free of numpy so scanning workers can evaluate clauses per file; the
+# catalog evaluates the same clauses over columns in core.facet_columns.
+# ---------------------------------------------------------------------------
+
+NUMERIC = 'numeric'
+CATEGORICAL = 'categorical'
+
+# facet -> (metadata key, kind)
+FACETS = {
+    'steps':          ('Steps', NUMERIC),
+    'sampler':        ('Sampler', CATEGORICAL),
+    'cfg':            ('CFG scale', NUMERIC),
+    'seed':           ('Seed', NUMERIC),
+    'size':           ('Size', CATEGORICAL),
+    'width':          ('Size', NUMERIC),
+    'height':         ('Size', NUMERIC),
+    'model':          ('Model', CATEGORICAL),
+    'denoise':        ('Denoising strength', NUMERIC),
+    'clipskip':       ('Clip skip', NUMERIC),
+    'hiresupscale':   ('Hires upscale', NUMERIC),
+    'hiressteps':     ('Hires steps', NUMERIC),
+    'hiresupscaler':  ('Hires upscaler', CATEGORICAL),
+}
+
+_ALIASES = {
+    'cfgscale': 'cfg',
+    'denoising': 'denoise',
+    'denoisingstrength': 'denoise',
+}
+
+_CLAUSE_RE = re.compile(r'^\s*([A-Za-z][A-Za-z _]*?)\s*(>=|<=|!=|=|>|<|\s+in\s+)\s*(.*?)\s*$', re.IGNORECASE)
+_SIZE_RE = re.compile(r'^\s*(\d+)\s*x\s*(\d+)\s*$', re.IGNORECASE)
+
+
+def facet_name(name):
+    key = re.sub(r'[\s_]', '', name.lower())
+    return _ALIASES.get(key, key)
+
+
+def _number(text):
+    try:
+        value = float(text)
+    except (TypeError, ValueError):
+        return math.nan
+    return value if math.isfinite(value) else math.nan
+
+
+def facet_value(metadata, facet):
+    """Typed value of a facet for one file: float (nan if missing) or normalized string (None)."""
+    key, kind = FACETS[facet]
+    raw = metadata.get(key)
+    if facet in ('width', 'height'):
+        match = _SIZE_RE.match(raw or '')
+        if not match:
+            return math.nan
+        return float(match.group(1 if facet == 'width' else 2))
+    if kind == NUMERIC:
+        return _number(raw)
+    if not raw:
+        return None
+    return normalize_category(raw)
+
+
+def normalize_category(text):
+    return ' '.join(text.split()).casefold()
+
+
+def _parse_number(facet, text):
+    value = _number(text)
+    if math.isnan(value):
+        raise ValueError(f"'{text.strip()}' is not a number for {facet}")
+    return value
+
+
+def parse_where(text):
+    """``steps>=30 && sampler=Euler a`` -> [(facet, op, value), ...]; raises ValueError."""
+    clauses = []
+    for part in (text or '').split('&&'):
+        if not part.strip():
+            continue
+        match = _CLAUSE_RE.match(part)
+        if not match:
+            raise ValueError(f"Cannot parse filter '{part.strip()}'")
+        facet = facet_name(match.group(1))
+        op = match.group(2).strip().lower()
+        value = match.group(3)
+        if facet not in FACETS:
+            raise ValueError(f"Unknown filter field '{match.group(1).strip()}'. "
+                             f"Known fields: {', '.join(FACETS)}")
+        if not value:
+            raise ValueError(f"Missing value in filter '{part.strip()}'")
+        kind = FACETS[facet][1]
+
+        if kind == CATEGORICAL:
+            if op == 'in':
+                values = tuple(normalize_category(v) for v in value.split(',') if v.strip())
+                clauses.append((facet, 'in', values))
+            elif op in ('=', '!='):
+                clauses.append((facet, op, normalize_category(value)))
+            else:
+                raise ValueError(f"{facet} only supports =, != and in")
+        elif op == 'in' and '..' in value:
+            low, high = value.split('..', 1)
+            low = _parse_number(facet, low) if low.strip() else None
+            high = _parse_number(facet, high) if high.strip() else None
+            clauses.append((facet, 'range', (low, high)))
+        elif op == 'in':
+            clauses.append((facet, 'in', tuple(_parse_number(facet, v) for v in value.split(',') if v.strip())))
+        else:
+            clauses.append((facet, op, _parse_number(facet, value)))
+    return clauses
+
+
+def clause_matches(value, op, operand):
+    """Apply one clause to a typed facet value."""
+    if value is None or (isinstance(value, float) and math.isnan(value)):
+        return False
+    if op == '=':
+        return value == operand
+    if op == '!=':
+        return value != operand
+    if op == '<':
+        return value < operand
+    if op == '<=':
+        return value <= operand
+    if op == '>':
+        return value > operand
+    if op == '>=':
+        return value >= operand
+    if op == 'in':
+        return value in operand
+    low, high = operand
+    return (low is None or value >= low) and (high is None or value <= high)
+
+
+def facets_match(metadata, clauses):
+    return all(clause_matches(facet_value(metadata, facet), op, operand) for facet, op, operand in clauses)
@@ -0,0 +1,44 @@
+import numpy as np
+
+from core.columns import PostingTable
+from core.facets import normalize_category
+from core.scan_worker import FIELD_TERMS, LORA_TERMS
+
+
+class FieldIndex:
+    """Hash lookup from an exact setting value to the docs that have it.
+
+    Backs ``field:value`` terms such as ``seed:123456789`` or ``model:ponyXL``:
+    values are normalized like categorical filters, so a lookup is a single
+    posting fetch instead of a pass over the catalog.
+    """
+
+    def __init__(self):
+        self.postings = PostingTable()
+
+    @staticmethod
+    def _key(prefix, value):
+        return f"{prefix}\x1f{value}"
+
+    def add(self, doc_id, metadata):
+        for prefix, field in FIELD_TERMS.items():
+            value = metadata.get(field)
+            if value and prefix not in LORA_TERMS:
+                self.postings.append(self._key(prefix, normalize_category(value)), doc_id)
+
+    def save(self, directory):
+        self.postings.save(directory, "fields")
+
+    @classmethod
+    def load(cls, directory):
+        index = cls()
+        index.postings = PostingTable.load(directory, "fields")
+        return index
+
+    def docs(self, prefix, value, size):
+        """Doc mask for one normalized value of a field term prefix."""
+        mask = np.zeros(size, dtype=bool)
+        ids = self.postings.get(self._key(prefix, value))
+        if ids is not None:
+            mask[ids] = True
+        return mask
@@ -0,0 +1,53 @@
+import re
+
+from core.attention import weight_term
+from core.scan_worker import FIELD_TERMS, field_term, split_query
+
+
+# ---------------------------------------------------------------------------
+# Search-term highlighting
+#
+# Finds where the terms of a query occur in an image's metadata so a viewer
+# can mark them. Spans are approximate for case-insensitive matches on
+# non-ASCII text, where search compares casefolded NFKC forms whose offsets
+# can differ from the original; wildcards match as little as possible.
+# ---------------------------------------------------------------------------
+
+def _term_regex(term, case_sensitive):
+    pattern = re.escape(term).replace(r"\*", ".*?").replace(r"\?", ".")
+    return re.compile(pattern, 0 if case_sensitive else re.IGNORECASE)
+
+
+def highlight_spans(metadata, queries, search_positive, search_negative, case_sensitive):
+    """{metadata key: sorted [(start, end)]} of the text the terms of ``queries`` match.
+
+    ``seed:123``-style terms mark the whole value they compare; weight terms
+    mark their tag.
+    """
+    prompt_keys = [key for key, selected in (('Positive', search_positive), ('Negative', search_negative))
+                   if selected]
+    text_keys = prompt_keys or [key for key, value in metadata.items() if isinstance(value, str)]
+    spans = {}
+    for query in queries:
+        for _, _, terms in split_query(query or ''):
+            for term in terms:
+                field = field_term(term)
+                if field is not None:
+                    key = FIELD_TERMS[field[0]]
+                    if metadata.get(key):
+                        spans.setdefault(key, []).append((0, len(metadata[key])))
+                    continue
+                weighted = weight_term(term)
+                if weighted is not None:
+                    term, keys = weighted[0], prompt_keys or ['Positive', 'Negative']
+                else:
+                    keys = text_keys
+                if not term.strip('*?'):
+                    continue
+                regex = _term_regex(term, case_sensitive)
+                for key in keys:
+                    value = metadata.get(key)
+                    if isinstance(value, str):
+                        spans.setdefault(key, []).extend(
+                            match.span() for match in regex.finditer(value) if match.end() > match.start())
+    return {key: sorted(set(found)) for key, found in spans.items() if found}
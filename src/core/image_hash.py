@@ -0,0 +1,80 @@
+import numpy as np
+from PIL import Image
+
+
+# ---------------------------------------------------------------------------
+# Perceptual image hashes
+#
+# A difference hash (dHash) shrinks the image to 9x8 grey pixels and keeps
+# one bit per horizontal neighbour pair: whether brightness drops. Upscales,
+# re-encodes and light retouches keep most bits, so visually identical
+# images sit within a small Hamming distance of each other. A BK-tree over
+# the distinct hashes answers "everything within distance r" without
+# comparing every pair.
+# ---------------------------------------------------------------------------
+
+HASH_SIZE = 8
+
+
+def dhash(path):
+    """64-bit difference hash of the image at ``path``; None if it cannot be read."""
+    try:
+        with Image.open(path) as img:
+            small = img.convert('L').resize((HASH_SIZE + 1, HASH_SIZE), Image.BOX)
+    except Exception:
+        return None
+    pixels = np.asarray(small, dtype=np.int16)
+    bits = (pixels[:, 1:] < pixels[:, :-1]).ravel()
+    return int.from_bytes(np.packbits(bits).tobytes(), 'big')
+
+
+def hash_image(path):
+    """Worker entry point: (path, dhash or None)."""
+    return path, dhash(path)
+
+
+def hamming(a, b):
+    return bin(a ^ b).count('1')
+
+
+class BKTree:
+    """Burkhard-Keller tree of integer hashes under Hamming distance.
+
+    Children are keyed by their distance to the parent, so by the triangle
+    inequality a radius query only descends into children whose key lies
+    within ``radius`` of the query's distance to the parent.
+    """
+
+    def __init__(self, values=()):
+        self.root = None
+        for value in values:
+            self.add(value)
+
+    def add(self, value):
+        if self.root is None:
+            self.root = (value, {})
+            return
+        node = self.root
+        while True:
+            distance = hamming(value, node[0])
+            if distance == 0:
+                return
+            child = node[1].get(distance)
+            if child is None:
+                node[1][distance] = (value, {})
+                return
+            node = child
+
+    def query(self, value, radius):
+        """Every stored hash within ``radius`` of ``value``, itself included."""
+        found = []
+        pending = [self.root] if self.root is not None else []
+        while pending:
+            node = pending.pop()
+            distance = hamming(value, node[0])
+            if distance <= radius:
+                found.append(node[0])
+            for key, child in node[1].items():
+                if distance - radius <= key <= distance + radius:
+                    pending.append(child)
+        return found
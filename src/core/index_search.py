@@ -0,0 +1,289 @@
+import re
+import time
+
+import numpy as np
+
+from core.attention import weight_term
+from core.metadata_store import PROMPT, INTEGER, INT_MISSING, INT_OTHER
+from core.scan_worker import LORA_TERMS, WHERE_MATCH, split_query, term_kind, term_matcher, field_term
+from core.tag_index import PROMPT_FIELDS, normalize_tag, is_word
+from core.trigram_index import wildcard_literals, literal_requirements, regex_requirements
+
+
+# ---------------------------------------------------------------------------
+# Query evaluation against a MetadataCatalog
+#
+# Each term is turned into a candidate mask from the tag index, or from the
+# trigram index for wildcards, phrases spanning tags and all-field searches;
+# ``field:value`` terms are answered exactly by the field and LoRA indexes,
+# ``tag:>1.1`` weight terms by the bare-tag postings.
+# The custom regex narrows the corpus through its required literals. AND groups
+# intersect masks, OR groups take what earlier groups left, and the ignore
+# term is subtracted at the end. Candidates the index cannot decide exactly
+# are checked with the same term patterns the scanning workers use, once per
+# distinct prompt or setting value, so results never differ from a full scan.
+# ---------------------------------------------------------------------------
+
+def _prompt_fields(search_positive, search_negative):
+    """Prompt fields a search looks at; empty means every field."""
+    return [field for field, selected in zip(PROMPT_FIELDS, (search_positive, search_negative)) if selected]
+
+
+def _literal_mask(catalog, requirement, fields, casefolded):
+    """Docs that could meet a literal requirement in ``fields``, or in any field if empty.
+
+    The indexes hold folded prompts, so requirements that were not folded the
+    same way (regexes, case-sensitive terms) can only rule out ASCII prompts.
+    """
+    prompts = catalog.trigram_index.prompts_matching(requirement, catalog.prompt_count)
+    if prompts is None:
+        return None
+    mask = catalog.prompt_docs(prompts, fields or PROMPT_FIELDS)
+    if not casefolded:
+        mask |= ~catalog.ascii_mask()
+    if not fields:
+        other = catalog.other_docs(requirement, casefolded)
+        if other is None:
+            return None
+        mask |= other
+    return mask
+
+
+def _term_mask(catalog, term, search_positive, search_negative, case_sensitive):
+    """(mask, exact) for one term; mask is None when the index cannot narrow it."""
+    fields = _prompt_fields(search_positive, search_negative)
+    needle = term_matcher(term, case_sensitive).needle
+    if not fields or '*' in needle or '?' in needle or ',' in needle:
+        requirement = literal_requirements(wildcard_literals(needle))
+        return _literal_mask(catalog, requirement, fields, not case_sensitive), False
+    prompts = catalog.tag_index.prompts_containing(needle, catalog.prompt_count)
+    if prompts is None:
+        return None, False
+    mask = catalog.prompt_docs(prompts, fields)
+    if case_sensitive:
+        return mask | ~catalog.ascii_mask(), False
+    return mask, needle.isascii() and is_word(normalize_tag(needle))
+
+
+def _value_mask(catalog, candidates, matches, fields, memo=None, matches_folded=None, start=0):
+    """Docs within ``candidates`` with a value in ``fields`` (any field if empty) that ``matches`` accepts.
+
+    Every distinct prompt or setting value is tested once, however many
+    documents share it; ``memo`` counts the reuse. With ``matches_folded``
+    prompts are tested in their stored fold_text form. ``candidates`` covers
+    the docs from ``start`` on, and so does the returned mask.
+    """
+    store = catalog.store
+    mask = np.zeros(len(candidates), dtype=bool)
+    docs = np.flatnonzero(candidates)
+    for key, (kind, column) in store.fields.items():
+        if fields and key not in fields:
+            continue
+        docs = docs[~mask[docs]]
+        if not len(docs):
+            break
+        values = column.values()[docs + start]
+        test = matches
+        if kind == INTEGER:
+            for doc_id in docs[values == INT_OTHER]:
+                if matches(store.int_other[key][int(doc_id) + start]):
+                    mask[doc_id] = True
+            present = (values != INT_MISSING) & (values != INT_OTHER)
+            text_of = str
+        elif kind == PROMPT:
+            present = values >= 0
+            if matches_folded is not None:
+                text_of, test = store.folded.__getitem__, matches_folded
+            else:
+                text_of = store.prompts.__getitem__
+        else:
+            present = values >= 0
+            text_of = store.categories[key].__getitem__
+        distinct, inverse = np.unique(values[present], return_inverse=True)
+        found = np.fromiter((bool(test(text_of(value))) for value in distinct.tolist()),
+                            dtype=bool, count=len(distinct))
+        mask[docs[present]] |= found[inverse.ravel()]
+        if memo is not None:
+            memo.misses += len(distinct)
+            memo.hits += int(np.count_nonzero(present)) - len(distinct)
+    return mask
+
+
+def explain_term(catalog, term, search_positive, search_negative, case_sensitive):
+    """(index used, candidate docs or None, exact) for one term, as _group_mask would look it up."""
+    searchable = catalog.searchable_mask()
+    field = field_term(term)
+    if field is not None:
+        index = "lora index" if field[0] in LORA_TERMS else "field index"
+        return index, int(np.count_nonzero(catalog.field_docs(*field) & searchable)), True
+    weighted = weight_term(term)
+    fields = _prompt_fields(search_positive, search_negative)
+    if weighted is not None:
+        prompts = catalog.tag_index.prompts_weighing(*weighted, catalog.store.prompts)
+        mask = catalog.prompt_docs(prompts, fields or PROMPT_FIELDS)
+        return "tag weights", int(np.count_nonzero(mask & searchable)), True
+    mask, exact = _term_mask(catalog, term, search_positive, search_negative, case_sensitive)
+    needle = term_matcher(term, case_sensitive).needle
+    trigram = not fields or '*' in needle or '?' in needle or ',' in needle
+    if mask is None:
+        return "none", None, False
+    return "trigram index" if trigram else "tag index", int(np.count_nonzero(mask & searchable)), exact
+
+
+def explain_filter(catalog, custom_filter):
+    """Candidate docs the custom regex leaves through its required literals, or None."""
+    mask = _literal_mask(catalog, regex_requirements(custom_filter.strip()), [], False)
+    return None if mask is None else int(np.count_nonzero(mask & catalog.searchable_mask()))
+
+
+def _term_values(catalog, candidates, term, case_sensitive, fields, memo, start=0):
+    matcher = term_matcher(term, case_sensitive)
+    return _value_mask(catalog, candidates, matcher.matches, fields, memo,
+                       None if case_sensitive else matcher.matches_folded, start)
+
+
+def _index_mask(masks, key, build):
+    """``build()``, kept in ``masks`` so the slices of one query build each catalog-wide mask once."""
+    if masks is None:
+        return build()
+    if key not in masks:
+        masks[key] = build()
+    return masks[key]
+
+
+def _count(profile, mask):
+    return int(np.count_nonzero(mask)) if profile is not None else 0
+
+
+def _record(profile, key, tested, passed, started):
+    """Add to the [docs tested, docs passed, seconds] entry of ``key`` when profiling."""
+    if profile is not None:
+        entry = profile.setdefault(key, [0, 0, 0.0])
+        entry[0] += tested
+        entry[1] += passed
+        entry[2] += time.perf_counter() - started
+
+
+def _group_mask(catalog, candidates, terms, search_positive, search_negative, case_sensitive, memo=None,
+                profile=None, window=slice(None), masks=None):
+    """Docs within ``candidates`` that match every term of an AND group.
+
+    ``profile`` collects per-term counts and time under ('term', text) keys.
+    ``candidates`` covers the docs of ``window``; index masks come from the
+    ``masks`` cache (see evaluate_query).
+    """
+    candidates = candidates.copy()
+    start = window.indices(catalog.size)[0]
+    fields = _prompt_fields(search_positive, search_negative)
+    exact_terms, verify_terms = [], []
+    for term in terms:
+        started, tested = time.perf_counter(), _count(profile, candidates)
+        field = field_term(term)
+        if field is not None:
+            # Exact setting values come straight from the field index
+            candidates &= _index_mask(masks, ('field', field), lambda: catalog.field_docs(*field))[window]
+            _record(profile, ('term', term), tested, _count(profile, candidates), started)
+            if not candidates.any():
+                return candidates
+            continue
+        weighted = weight_term(term)
+        if weighted is not None:
+            candidates &= _index_mask(masks, ('weight', weighted), lambda: catalog.prompt_docs(
+                catalog.tag_index.prompts_weighing(*weighted, catalog.store.prompts), fields or PROMPT_FIELDS))[window]
+            _record(profile, ('term', term), tested, _count(profile, candidates), started)
+            if not candidates.any():
+                return candidates
+            continue
+        mask, exact = _index_mask(masks, ('term', term), lambda: _term_mask(
+            catalog, term, search_positive, search_negative, case_sensitive))
+        if mask is not None:
+            candidates &= mask[window]
+        _record(profile, ('term', term), tested, _count(profile, candidates), started)
+        (exact_terms if exact else verify_terms).append(term)
+        if not candidates.any():
+            return candidates
+
+    # Substring checks before regexes; each one shrinks what the next has to look at
+    for term in sorted(verify_terms, key=lambda term: term_kind(term) == 'wildcard'):
+        started, tested = time.perf_counter(), _count(profile, candidates)
+        candidates = _term_values(catalog, candidates, term, case_sensitive, fields, memo, start)
+        _record(profile, ('term', term), 0, _count(profile, candidates) - tested, started)
+    # Exact answers only hold for plain ASCII prompts; everything else is verified.
+    unsure = candidates & ~_index_mask(masks, 'ascii', catalog.ascii_mask)[window] if exact_terms else None
+    for term in exact_terms:
+        if not unsure.any():
+            break
+        started = time.perf_counter()
+        failed = unsure & ~_term_values(catalog, unsure, term, case_sensitive, fields, memo, start)
+        candidates &= ~failed
+        unsure &= ~failed
+        _record(profile, ('term', term), 0, -_count(profile, failed), started)
+    return candidates
+
+
+def evaluate_query(catalog, search_term, ignore_term, search_positive, search_negative,
+                   case_sensitive, custom_filter=None, where=None, memo=None, profile=None, docs=None, masks=None):
+    """Same results as ``matches_search_term`` over every catalog document.
+
+    ``where`` holds parsed facet clauses (see core.facets) that every result must pass.
+    ``memo`` is a PromptMemo whose hit counters record how often a verdict was reused.
+    ``profile`` is a dict that collects [docs tested, docs passed, seconds] per
+    ('term', text) and ('filter', pattern). ``docs`` is a slice of doc ids that
+    limits the documents looked at, so a large catalog can be answered in
+    slices; a ``masks`` dict shared by the slices of one query keeps the
+    catalog-wide index masks, so each slice only costs its own length.
+
+    Without a search term, every searchable document that ``where`` accepts
+    matches as WHERE_MATCH.
+
+    Returns ``[(doc_id, (or_index, or_group))]`` in doc id order.
+    """
+    if not search_term and not where:
+        return []
+    window = docs if docs is not None else slice(None)
+    start = window.indices(catalog.size)[0]
+    with catalog.lock:
+        remaining = _index_mask(masks, 'searchable', catalog.searchable_mask)[window].copy()
+        if where:
+            remaining &= _index_mask(masks, 'where', lambda: catalog.facets.mask(where, catalog.size))[window]
+        if custom_filter:
+            # Docs missing a literal the regex requires can never pass the filter
+            filter_mask = _index_mask(masks, 'filter', lambda: _literal_mask(
+                catalog, regex_requirements(custom_filter.strip()), [], False))
+            if filter_mask is not None:
+                remaining &= filter_mask[window]
+        assigned = {}
+        if not search_term:
+            assigned = dict.fromkeys((np.flatnonzero(remaining) + start).tolist(), WHERE_MATCH)
+        for or_index, or_group, terms in split_query(search_term):
+            if not remaining.any():
+                break
+            matched = _group_mask(catalog, remaining, terms, search_positive, search_negative, case_sensitive,
+                                  memo, profile, window, masks)
+            for doc_id in np.flatnonzero(matched):
+                assigned[int(doc_id) + start] = (or_index, or_group)
+            remaining &= ~matched
+
+        if ignore_term and assigned:
+            matched = np.zeros(len(remaining), dtype=bool)
+            matched[np.fromiter(assigned, dtype=np.int64, count=len(assigned)) - start] = True
+            for _, _, terms in split_query(ignore_term):
+                ignored = _group_mask(catalog, matched, terms, search_positive, search_negative,
+                                      case_sensitive, memo, profile, window, masks)
+                for doc_id in np.flatnonzero(ignored):
+                    del assigned[int(doc_id) + start]
+                matched &= ~ignored
+
+        if custom_filter and assigned:
+            try:
+                pattern = re.compile(custom_filter.strip())
+            except re.error:
+                return []
+            started = time.perf_counter()
+            matched = np.zeros(len(remaining), dtype=bool)
+            matched[np.fromiter(assigned, dtype=np.int64, count=len(assigned)) - start] = True
+            passed = _value_mask(catalog, matched, pattern.search, [], start=start)
+            _record(profile, ('filter', custom_filter), len(assigned), _count(profile, passed & matched), started)
+            assigned = {doc_id: match for doc_id, match in assigned.items() if passed[doc_id - start]}
+
+        return [(doc_id, assigned[doc_id]) for doc_id in sorted(assigned)]
@@ -0,0 +1,116 @@
+import os
+from threading import Lock
+from concurrent.futures.process import BrokenProcessPool
+
+from core.facets import parse_where
+from core.scan_worker import PromptMemo
+from core.searcher import validate_search_term
+from core.worker_pool import WorkerPool
+
+
+class LiveSearch:
+    """Answers queries as they are typed from an in-memory catalog of one folder.
+
+    The folder's metadata catalog is opened and refreshed once, then every
+    query is evaluated against it in slices of ``chunk_size`` documents.
+    Matches of each slice are published as they are found, so counts and the
+    browser fill in progressively. Starting a query bumps ``generation``; an
+    evaluation that sees a newer generation stops at the next slice, and its
+    results are never published.
+    """
+
+    def __init__(self, worker_pool=None, chunk_size=50000):
+        self.worker_pool = worker_pool
+        self.chunk_size = chunk_size
+        self.generation = 0
+        self.catalog = None
+        self._catalog_key = None
+        self._lock = Lock()
+        self._load_lock = Lock()
+        self._search_lock = Lock()
+
+    def start(self):
+        """Cancel whatever is running and return the generation of a new query."""
+        with self._lock:
+            self.generation += 1
+            return self.generation
+
+    cancel = start
+
+    def is_current(self, generation):
+        return generation == self.generation
+
+    def invalidate(self):
+        """Drop the cached catalog, e.g. after the folder changed on disk."""
+        with self._load_lock:
+            self.catalog = None
+            self._catalog_key = None
+
+    def load(self, folder_path, recursive, progress_callback=None):
+        """The catalog of ``folder_path``; opened and refreshed only when the folder changes."""
+        from core.catalog import MetadataCatalog
+
+        key = (os.path.normcase(os.path.abspath(folder_path)), bool(recursive))
+        with self._load_lock:
+            if self.catalog is not None and self._catalog_key == key:
+                return self.catalog
+            catalog = MetadataCatalog.open(folder_path, recursive)
+            pool = self.worker_pool or WorkerPool()
+            try:
+                catalog.refresh(pool.executor(), progress_callback)
+            except BrokenProcessPool:
+                pool.reset()
+                raise
+            finally:
+                if self.worker_pool is None:
+                    pool.shutdown()
+            try:
+                catalog.save()
+            except OSError:
+                pass
+            self.catalog, self._catalog_key = catalog, key
+            return catalog
+
+    def search(self, generation, folder_path, recursive, search_term, ignore_term=None, search_positive=True,
+               search_negative=False, case_sensitive=False, custom_filter=None, where=None,
+               result_stream=None, on_progress=None, details=None):
+        """Evaluate one query; returns the matching paths, or None once a newer query started.
+
+        ``on_progress(matches, docs_done, docs_total)`` is called after every slice.
+        A ResultDetails given as ``details`` receives the metadata, stat and OR group of every match.
+        Raises ValueError for an invalid ``where`` filter.
+        """
+        from core.index_search import evaluate_query
+
+        clauses = parse_where(where)
+        search_term, _ = validate_search_term(search_term)
+        ignore_term, _ = validate_search_term(ignore_term) if ignore_term else ("", [])
+        if not search_term and not clauses:
+            return []
+
+        catalog = self.load(folder_path, recursive)
+        memo = PromptMemo()
+        paths = []
+        size = catalog.size
+        # Catalog-wide index masks are built by the first slice and sliced by the rest
+        masks = {}
+        # One query evaluates at a time; a superseded one gives way at its next slice
+        with self._search_lock:
+            for start in range(0, size, self.chunk_size):
+                if not self.is_current(generation):
+                    return None
+                results = evaluate_query(catalog, search_term, ignore_term, search_positive, search_negative,
+                                         case_sensitive, custom_filter, clauses, memo,
+                                         docs=slice(start, start + self.chunk_size), masks=masks)
+                found = [catalog.paths[doc_id] for doc_id, _ in results]
+                if not self.is_current(generation):
+                    return None
+                if details is not None:
+                    for doc_id, match in results:
+                        details.add(catalog.paths[doc_id], match, catalog.record(doc_id), catalog.stat(doc_id))
+                paths.extend(found)
+                if result_stream is not None:
+                    result_stream.publish(found)
+                if on_progress:
+                    on_progress(len(paths), min(size, start + self.chunk_size), size)
+        return paths
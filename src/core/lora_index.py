@@ -0,0 +1,66 @@
+import numpy as np
+
+from core.columns import PostingTable
+from core.facets import normalize_category
+from core.scan_worker import parse_lora_hashes
+
+
+class LoraIndex:
+    """Docs per LoRA name and per LoRA hash, parsed from the Lora hashes field.
+
+    Keys keep the spelling found in the files so usage counts read naturally;
+    lookups compare normalized keys, and there are only ever a few hundred.
+    """
+
+    def __init__(self):
+        self.names = PostingTable()
+        self.hashes = PostingTable()
+
+    def add(self, doc_id, metadata):
+        pairs = parse_lora_hashes(metadata.get('Lora hashes'))
+        for name in {name for name, _ in pairs}:
+            self.names.append(name, doc_id)
+        for lora_hash in {lora_hash for _, lora_hash in pairs}:
+            self.hashes.append(lora_hash, doc_id)
+
+    def save(self, directory):
+        self.names.save(directory, "lora.names")
+        self.hashes.save(directory, "lora.hashes")
+
+    @classmethod
+    def load(cls, directory):
+        index = cls()
+        index.names = PostingTable.load(directory, "lora.names")
+        index.hashes = PostingTable.load(directory, "lora.hashes")
+        return index
+
+    def docs(self, prefix, value, size):
+        """Doc mask for a ``lora:`` name or a ``lorahash:`` hash prefix."""
+        mask = np.zeros(size, dtype=bool)
+        if prefix == 'lora':
+            keys = [key for key in self.names if normalize_category(key) == value]
+            table = self.names
+        else:
+            keys = [key for key in self.hashes if normalize_category(key).startswith(value)]
+            table = self.hashes
+        for key in keys:
+            mask[table.get(key)] = True
+        return mask
+
+    def usage(self, alive):
+        """[(name, image count)] for every LoRA used by a live doc, most used first.
+
+        Spellings that ``lora:`` treats as one LoRA are counted together under
+        the most common one.
+        """
+        groups = {}
+        for name in self.names:
+            ids = self.names.get(name)
+            groups.setdefault(normalize_category(name), []).append((name, ids[alive[ids]]))
+        usage = []
+        for spellings in groups.values():
+            count = len(np.unique(np.concatenate([ids for _, ids in spellings])))
+            if count:
+                name = max(spellings, key=lambda spelling: len(spelling[1]))[0]
+                usage.append((name, count))
+        return sorted(usage, key=lambda entry: (-entry[1], entry[0].lower()))
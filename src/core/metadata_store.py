@@ -0,0 +1,129 @@
+from core.columns import Column, StringPool
+from core.scan_worker import fold_text
+from core.tag_index import PROMPT_FIELDS
+
+# Settings that are almost always plain integers; Seed alone is unique per image
+INT_FIELDS = ('Steps', 'Seed', 'Clip skip', 'Hires steps')
+INT_MISSING = -2 ** 63
+INT_OTHER = INT_MISSING + 1     # not a canonical integer, kept verbatim in ``int_other``
+
+PROMPT = 'prompt'
+INTEGER = 'int'
+CATEGORY = 'category'
+
+
+class MetadataStore:
+    """Column-oriented storage for the dicts ``parse_exif_data`` returns.
+
+    Positive and Negative prompts are ids into one deduplicated string pool,
+    with the fold_text form of each prompt kept at the same id in ``folded``;
+    integer settings are packed int64 columns, and every other field is
+    dictionary-encoded: an int32 code per document into the field's distinct
+    values. ``record`` rebuilds the original dict for one document.
+    """
+
+    def __init__(self):
+        self.size = 0
+        self.prompts = StringPool()
+        self.folded = StringPool()
+        self.fields = {}        # key -> (kind, column), in first-seen order
+        self.categories = {}    # key -> StringPool of distinct values
+        self.int_other = {}     # key -> {doc_id: raw value}
+
+    def _column(self, key):
+        entry = self.fields.get(key)
+        if entry is None:
+            if key in PROMPT_FIELDS:
+                entry = (PROMPT, Column('i'))
+            elif key in INT_FIELDS:
+                entry = (INTEGER, Column('q'))
+                self.int_other[key] = {}
+            else:
+                entry = (CATEGORY, Column('i'))
+                self.categories[key] = StringPool()
+            entry[1].fill(INT_MISSING if entry[0] == INTEGER else -1, self.size)
+            self.fields[key] = entry
+        return entry
+
+    def add(self, metadata):
+        doc_id = self.size
+        for key, value in metadata.items():
+            self._column(key)
+        for key, (kind, column) in self.fields.items():
+            value = metadata.get(key)
+            if kind == INTEGER:
+                if value is None:
+                    column.append(INT_MISSING)
+                elif _is_canonical_int(value):
+                    column.append(int(value))
+                else:
+                    column.append(INT_OTHER)
+                    self.int_other[key][doc_id] = value
+            elif value is None:
+                column.append(-1)
+            elif kind == PROMPT:
+                prompt_id = self.prompts.intern(value)
+                if prompt_id == len(self.folded):
+                    self.folded.append(fold_text(value))
+                column.append(prompt_id)
+            else:
+                column.append(self.categories[key].intern(value))
+        self.size += 1
+        return doc_id
+
+    def prompt_id(self, doc_id, field):
+        entry = self.fields.get(field)
+        return -1 if entry is None else entry[1][doc_id]
+
+    def record(self, doc_id):
+        metadata = {}
+        for key, (kind, column) in self.fields.items():
+            value = column[doc_id]
+            if kind == INTEGER:
+                if value == INT_OTHER:
+                    metadata[key] = self.int_other[key][doc_id]
+                elif value != INT_MISSING:
+                    metadata[key] = str(value)
+            elif value >= 0:
+                metadata[key] = self.prompts[value] if kind == PROMPT else self.categories[key][value]
+        return metadata
+
+    def state(self):
+        """JSON-serializable part of the store, saved in the catalog manifest."""
+        return {
+            'size': self.size,
+            'fields': [[key, kind] for key, (kind, _) in self.fields.items()],
+            'int_other': {key: {str(doc): value for doc, value in other.items()}
+                          for key, other in self.int_other.items()},
+        }
+
+    def save(self, directory):
+        self.prompts.save(directory, 'prompts')
+        self.folded.save(directory, 'prompts.folded')
+        for n, (key, (kind, column)) in enumerate(self.fields.items()):
+            column.save(directory, f"field{n}")
+            if kind == CATEGORY:
+                self.categories[key].save(directory, f"field{n}.values")
+
+    @classmethod
+    def load(cls, directory, state):
+        store = cls()
+        store.size = state['size']
+        store.prompts = StringPool.load(directory, 'prompts')
+        store.folded = StringPool.load(directory, 'prompts.folded')
+        for n, (key, kind) in enumerate(state['fields']):
+            typecode = 'q' if kind == INTEGER else 'i'
+            store.fields[key] = (kind, Column.load(directory, f"field{n}", typecode))
+            if kind == CATEGORY:
+                store.categories[key] = StringPool.load(directory, f"field{n}.values")
+        store.int_other = {key: {int(doc): value for doc, value in other.items()}
+                           for key, other in state['int_other'].items()}
+        return store
+
+
+def _is_canonical_int(text):
+    try:
+        value = int(text)
+    except ValueError:
+        return False
+    return str(value) == text and INT_OTHER < value < 2 ** 63
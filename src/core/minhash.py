@@ -0,0 +1,104 @@
+import zlib
+
+import numpy as np
+
+from core.attention import weighted_tags
+from core.columns import Column
+
+
+# ---------------------------------------------------------------------------
+# Near-duplicate prompts
+#
+# Every distinct prompt gets a MinHash signature over its set of bare tags,
+# computed once when the catalog first sees the prompt. Locality-sensitive
+# hashing splits signatures into bands; prompts sharing a band are compared
+# with the one that opened the bucket and linked when their estimated Jaccard
+# similarity reaches the threshold. Clusters are the connected components of
+# those links, so nothing is compared pairwise.
+# ---------------------------------------------------------------------------
+
+NUM_PERM = 64
+BANDS = 16
+ROWS = NUM_PERM // BANDS
+EMPTY = np.iinfo(np.uint32).max
+
+_rng = np.random.default_rng(0x6D696E68)
+_MULTIPLIERS = _rng.integers(1, 2 ** 63, NUM_PERM, dtype=np.uint64) | np.uint64(1)
+_OFFSETS = _rng.integers(0, 2 ** 63, NUM_PERM, dtype=np.uint64)
+
+
+def signature(text):
+    """MinHash signature (NUM_PERM uint32) of a prompt's bare tags; all EMPTY without tags."""
+    tags = {tag for tag, _ in weighted_tags(text)}
+    if not tags:
+        return np.full(NUM_PERM, EMPTY, dtype=np.uint32)
+    hashes = np.fromiter((zlib.crc32(tag.encode('utf-8')) for tag in tags), dtype=np.uint64, count=len(tags))
+    # Multiply-shift hashing; uint64 products wrap around as intended
+    permuted = (hashes[:, None] * _MULTIPLIERS + _OFFSETS) >> np.uint64(32)
+    return permuted.min(axis=0).astype(np.uint32)
+
+
+class MinHashIndex:
+    """MinHash signatures of every distinct prompt, stored row by row in one column."""
+
+    def __init__(self):
+        self.signatures = Column('I')
+
+    def add_prompt(self, prompt_id, text):
+        self.signatures.extend(signature(text).tolist())
+
+    def save(self, directory):
+        self.signatures.save(directory, "minhash")
+
+    @classmethod
+    def load(cls, directory):
+        index = cls()
+        index.signatures = Column.load(directory, "minhash", 'I')
+        return index
+
+    def matrix(self):
+        """Signatures as a (prompt count, NUM_PERM) array."""
+        return self.signatures.values().reshape(-1, NUM_PERM)
+
+
+def _band_keys(signatures, band):
+    rows = signatures[:, band * ROWS:(band + 1) * ROWS].astype(np.uint64)
+    keys = np.zeros(len(signatures), dtype=np.uint64)
+    for column in range(ROWS):
+        keys = keys * np.uint64(0x100000001B3) ^ rows[:, column]
+    return keys
+
+
+def cluster_labels(signatures, threshold):
+    """Cluster label per signature row: the smallest row index in its cluster.
+
+    Rows without tags (all EMPTY) stay on their own.
+    """
+    count = len(signatures)
+    labels = np.arange(count)
+    if count < 2:
+        return labels
+    tagged = np.flatnonzero(signatures[:, 0] != EMPTY)
+    edges = []
+    for band in range(BANDS):
+        keys = _band_keys(signatures[tagged], band)
+        order = np.argsort(keys, kind='stable')
+        ordered = keys[order]
+        starts = np.r_[True, ordered[1:] != ordered[:-1]]
+        leaders = order[np.maximum.accumulate(np.where(starts, np.arange(len(order)), 0))]
+        members, leaders = tagged[order[~starts]], tagged[leaders[~starts]]
+        similar = (signatures[members] == signatures[leaders]).mean(axis=1) >= threshold
+        edges.append((members[similar], leaders[similar]))
+    if not edges:
+        return labels
+    left = np.concatenate([e[0] for e in edges])
+    right = np.concatenate([e[1] for e in edges])
+
+    # Connected components by propagating the smallest label along the links
+    while True:
+        previous = labels.copy()
+        np.minimum.at(labels, left, labels[right])
+        np.minimum.at(labels, right, labels[left])
+        labels = labels[labels]
+        if np.array_equal(labels, previous):
+            return labels
@@ -0,0 +1,250 @@
+import os
+import json
+import time
+
+
+# ---------------------------------------------------------------------------
+# Query planning
+#
+# An AND group fails as soon as one term fails, so checking the cheap,
+# rarely-passing terms first skips most of the work. Terms have no side
+# effects, which makes any order give the same verdict; OR groups keep their
+# written order so the first matching group is still the one reported.
+#
+# Each term is ranked by cost / (1 - pass rate), the order that minimizes
+# the expected cost of a conjunction. Pass rates are counted on every
+# evaluation and costs timed on a sample; until a term has been seen often
+# enough, its kind (field lookup, literal, weight, wildcard) supplies the
+# estimate. Statistics live as long as the process, so a warm worker pool
+# carries them from one search to the next; each search also sends what its
+# workers observed back to the parent, which adds it to a JSON file that new
+# workers load, so the statistics outlive the pool and the CLI run.
+# ---------------------------------------------------------------------------
+
+# Relative cost of one evaluation before a term has been timed
+PRIOR_COSTS = {
+    'field': 0.5e-6,
+    'literal': 1e-6,
+    'weight': 3e-6,
+    'wildcard': 4e-6,
+}
+PRIOR_PASS_RATE = 0.5
+MIN_SAMPLES = 8
+# Terms kept in the statistics file; the least recently used are dropped first
+STATS_LIMIT = 2000
+
+
+class TermStats:
+    __slots__ = ('kind', 'evaluations', 'passes', 'timed', 'seconds')
+
+    def __init__(self, kind):
+        self.kind = kind
+        self.evaluations = 0
+        self.passes = 0
+        self.timed = 0
+        self.seconds = 0.0
+
+    @property
+    def pass_rate(self):
+        # Laplace smoothing keeps unseen terms at the prior
+        return (self.passes + PRIOR_PASS_RATE) / (self.evaluations + 1)
+
+    @property
+    def cost(self):
+        if self.timed < MIN_SAMPLES:
+            return PRIOR_COSTS[self.kind]
+        return self.seconds / self.timed
+
+    def rank(self):
+        return self.cost / max(1e-9, 1.0 - self.pass_rate)
+
+
+class QueryPlan:
+    """A query compiled once: OR groups in written order, each with its AND terms reordered."""
+
+    __slots__ = ('search_groups', 'ignore_groups', 'ignore_first', 'fixed', 'uses')
+
+    def __init__(self, search_groups, ignore_groups):
+        self.search_groups = search_groups      # [(or_index, or_group, [TermStats key])]
+        self.ignore_groups = ignore_groups
+        self.ignore_first = False
+        # Nothing to reorder: one term per group and no ignore groups
+        self.fixed = not ignore_groups and all(len(terms) == 1 for _, _, terms in search_groups)
+        self.uses = 0
+
+
+class QueryPlanner:
+    """Evaluates ``matches_search_term`` queries with terms ordered by measured selectivity and cost.
+
+    ``check(metadata, term, search_positive, search_negative, case_sensitive)``
+    tests one term, ``split(query)`` parses a query into OR groups and
+    ``term_kind(term)`` names the kind of term for the cost priors.
+    """
+
+    def __init__(self, check, split, term_kind, sample_every=16, replan_every=256):
+        self.check = check
+        self.split = split
+        self.term_kind = term_kind
+        self.sample_every = sample_every
+        self.replan_every = replan_every
+        self.stats = {}
+        self.plans = {}
+        # Term key -> [evaluations, matches, seconds] while profiling (see --explain)
+        self.profile = None
+
+    def term_stats(self, key):
+        stats = self.stats.get(key)
+        if stats is None:
+            stats = self.stats[key] = TermStats(self.term_kind(key[0]))
+        return stats
+
+    def snapshot(self, queries):
+        """Counters of the terms of ``queries`` so far, for ``changes``.
+
+        ``queries`` are (search_term, ignore_term, search_positive,
+        search_negative, case_sensitive) tuples.
+        """
+        snapshot = {}
+        for query in queries:
+            plan = self.plan(*query)
+            for _, _, terms in plan.search_groups + plan.ignore_groups:
+                for key in terms:
+                    stats = self.term_stats(key)
+                    snapshot[key] = (stats.evaluations, stats.passes, stats.timed, stats.seconds)
+        return snapshot
+
+    def changes(self, snapshot):
+        """Counters the terms of ``snapshot`` gained since it was taken.
+
+        One [term, search_positive, search_negative, case_sensitive,
+        evaluations, passes, timed, seconds] list per term evaluated since.
+        """
+        changes = []
+        for key, (evaluations, passes, timed, seconds) in snapshot.items():
+            stats = self.stats[key]
+            if stats.evaluations > evaluations:
+                changes.append([*key, stats.evaluations - evaluations, stats.passes - passes,
+                                stats.timed - timed, stats.seconds - seconds])
+        return changes
+
+    def restore(self, entries):
+        """Add counters saved by ``save_stats`` to the statistics of their terms."""
+        for term, search_positive, search_negative, case_sensitive, evaluations, passes, timed, seconds in entries:
+            stats = self.term_stats((term, search_positive, search_negative, case_sensitive))
+            stats.evaluations += evaluations
+            stats.passes += passes
+            stats.timed += timed
+            stats.seconds += seconds
+        self.plans.clear()
+
+    def plan(self, search_term, ignore_term, search_positive, search_negative, case_sensitive):
+        key = (search_term, ignore_term, search_positive, search_negative, case_sensitive)
+        plan = self.plans.get(key)
+        if plan is None:
+            def groups(query):
+                return [(or_index, or_group,
+                         [(term, search_positive, search_negative, case_sensitive) for term in terms])
+                        for or_index, or_group, terms in self.split(query or '')]
+            if len(self.plans) >= 1024:
+                self.plans.clear()
+            plan = self.plans[key] = QueryPlan(groups(search_term), groups(ignore_term))
+            self._replan(plan)
+        elif plan.uses % self.replan_every == 0 and not plan.fixed:
+            self._replan(plan)
+        plan.uses += 1
+        return plan
+
+    def _replan(self, plan):
+        for _, _, terms in plan.search_groups + plan.ignore_groups:
+            terms.sort(key=lambda key: self.term_stats(key).rank())
+        # The search decides alone when it fails and the ignore groups when they
+        # match, so check first whichever side is expected to settle it cheaper.
+        search_cost, search_pass = self._groups_estimate(plan.search_groups)
+        ignore_cost, ignore_pass = self._groups_estimate(plan.ignore_groups)
+        plan.ignore_first = (ignore_cost + (1 - ignore_pass) * search_cost
+                             < search_cost + search_pass * ignore_cost)
+
+    def _groups_estimate(self, groups):
+        """(expected cost, probability that some group matches) of OR groups checked in order."""
+        cost, miss = 0.0, 1.0
+        for _, _, terms in groups:
+            group_cost, group_pass = 0.0, 1.0
+            for key in terms:
+                stats = self.term_stats(key)
+                group_cost += group_pass * stats.cost
+                group_pass *= stats.pass_rate
+            cost += miss * group_cost
+            miss *= 1 - group_pass
+        return cost, 1 - miss
+
+    def _matches(self, metadata, key):
+        stats = self.term_stats(key)
+        stats.evaluations += 1
+        if self.profile is None and stats.evaluations % self.sample_every:
+            result = self.check(metadata, *key)
+        else:
+            start = time.perf_counter()
+            result = self.check(metadata, *key)
+            elapsed = time.perf_counter() - start
+            stats.seconds += elapsed
+            stats.timed += 1
+            if self.profile is not None:
+                entry = self.profile.setdefault(key, [0, 0, 0.0])
+                entry[0] += 1
+                entry[1] += bool(result)
+                entry[2] += elapsed
+        if result:
+            stats.passes += 1
+        return result
+
+    def _any_group(self, metadata, groups):
+        for or_index, or_group, terms in groups:
+            if all(self._matches(metadata, key) for key in terms):
+                return or_index, or_group
+        return None
+
+    def evaluate(self, metadata, search_term, search_positive, search_negative, case_sensitive, ignore_term=None):
+        plan = self.plan(search_term, ignore_term, search_positive, search_negative, case_sensitive)
+        if plan.fixed and self.profile is None:
+            for or_index, or_group, terms in plan.search_groups:
+                if self.check(metadata, *terms[0]):
+                    return or_index, or_group
+            return None
+        if plan.ignore_first:
+            if plan.ignore_groups and self._any_group(metadata, plan.ignore_groups):
+                return None
+            return self._any_group(metadata, plan.search_groups)
+        match = self._any_group(metadata, plan.search_groups)
+        if match is None or (plan.ignore_groups and self._any_group(metadata, plan.ignore_groups)):
+            return None
+        return match
+
+
+def load_stats(path):
+    """Entries saved by ``save_stats``; empty when the file is missing or unreadable."""
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            entries = json.load(f)['terms']
+        return [entry for entry in entries if isinstance(entry, list) and len(entry) == 8]
+    except (OSError, ValueError, KeyError, TypeError):
+        return []
+
+
+def save_stats(path, changes, limit=STATS_LIMIT):
+    """Add ``changes`` (see QueryPlanner.changes) to the statistics file at ``path``.
+
+    Raises OSError when it cannot be written.
+    """
+    if not changes:
+        return
+    merged = {tuple(entry[:4]): entry[4:] for entry in load_stats(path)}
+    for entry in changes:
+        key = tuple(entry[:4])
+        counters = merged.pop(key, [0, 0, 0, 0.0])
+        merged[key] = [total + change for total, change in zip(counters, entry[4:])]
+    entries = [[*key, *counters] for key, counters in merged.items()][-limit:]
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    temp_path = f"{path}.{os.getpid()}.tmp"
+    with open(temp_path, 'w', encoding='utf-8') as f:
+        json.dump({'terms': entries}, f)
+    os.replace(temp_path, path)
@@ -0,0 +1,91 @@
+import math
+from datetime import datetime
+
+from core.facets import facet_value
+
+
+# ---------------------------------------------------------------------------
+# Result ordering
+#
+# Sorts and groups search results by file stats, generation settings or the
+# OR group they matched, using only what the search captured (ResultDetails),
+# so no file is opened or stat'ed again. Results missing the value sort last
+# in either direction and form a group of their own.
+# ---------------------------------------------------------------------------
+
+# Sort key -> facet of core.facets, for generation settings
+SETTING_KEYS = {
+    'seed': 'seed',
+    'steps': 'steps',
+    'cfg': 'cfg',
+    'model': 'model',
+    'sampler': 'sampler',
+}
+SORT_KEYS = ('order', 'mtime', 'size', *SETTING_KEYS, 'or_group')
+
+
+def _sort_value(key, path, details):
+    """Comparable value of ``path`` for ``key``; None when it is unknown."""
+    if key in SETTING_KEYS:
+        value = facet_value(details.metadata.get(path) or {}, SETTING_KEYS[key])
+        return None if isinstance(value, float) and math.isnan(value) else value
+    if key == 'or_group':
+        match = details.matches.get(path)
+        return match[0] if match else None
+    stat = details.stats.get(path)
+    if stat is None:
+        return None
+    return int(stat[0] if key == 'size' else stat[1])
+
+
+def _group_value(key, value):
+    """The value results are grouped on: dates for mtime, whole MB for size."""
+    if value is None:
+        return None
+    if key == 'mtime':
+        return datetime.fromtimestamp(value / 1e9).date()
+    if key == 'size':
+        return value // (1024 * 1024)
+    return value
+
+
+def _group_label(key, path, group, details):
+    if group is None:
+        return None
+    if key == 'mtime':
+        return group.isoformat()
+    if key == 'size':
+        return f"{group}-{group + 1} MB"
+    if key == 'or_group':
+        return details.matches[path][1]
+    if key in ('model', 'sampler'):
+        # Shown as written in the first result, not normalized
+        return ' '.join(details.metadata[path][{'model': 'Model', 'sampler': 'Sampler'}[key]].split())
+    return str(int(group)) if float(group).is_integer() else f"{group:g}"
+
+
+def order_results(paths, key, details, descending=False, group=False):
+    """Order ``paths`` by ``key`` (one of SORT_KEYS).
+
+    Returns (ordered paths, sections) where sections is a list of
+    (first index, label) for every group when ``group`` is set; the label is
+    None for results without the value. 'order' keeps the search order.
+    """
+    if key == 'order':
+        ordered = list(reversed(paths)) if descending else list(paths)
+    else:
+        values = {path: _sort_value(key, path, details) for path in paths}
+        known = sorted((path for path in paths if values[path] is not None),
+                       key=values.__getitem__, reverse=descending)
+        ordered = known + [path for path in paths if values[path] is None]
+    if not group or key == 'order':
+        return ordered, []
+
+    sections = []
+    previous = object()
+    for index, path in enumerate(ordered):
+        value = _group_value(key, values[path])
+        if value != previous:
+            sections.append((index, _group_label(key, path, value, details)))
+            previous = value
+    return ordered, sections
@@ -0,0 +1,473 @@
+import os
+import re
+import marshal
+import time
+import unicodedata
+from functools import lru_cache
+from PIL import Image
+from core.attention import weight_term, prompt_has_weight
+from core.facets import facets_match, normalize_category
+from core.cache_paths import planner_stats_path
+from core.query_planner import QueryPlanner, load_stats
+
+
+# ---------------------------------------------------------------------------
+# Image processing (runs inside worker processes)
+#
+# Kept free of GUI imports so pool workers only load what scanning needs.
+# ---------------------------------------------------------------------------
+
+# ---------------------------------------------------------------------------
+# Match records
+#
+# A matched file travels back to the parent as one flat tuple
+#     (path, file_size, mtime_ns, keys, values, ((query_index, or_index, or_term), ...))
+# holding everything read from it: the stat key the metadata catalog uses,
+# the parsed metadata split into key and value tuples, and the match of
+# every query it satisfied. Files from one generator share their key layout,
+# so the keys tuple is interned and marshal writes it once per batch; a
+# batch is sent as a single marshal blob, which is cheaper to build and to
+# load than a pickled dict per match.
+# ---------------------------------------------------------------------------
+
+_key_layouts = {}
+
+
+def read_png(image_path):
+    """(size, mtime_ns, metadata) from a single open of the file; metadata is None without text chunks."""
+    with open(image_path, 'rb') as f:
+        stat = os.fstat(f.fileno())
+        with Image.open(f) as image:
+            exif_data = image.info
+    metadata = parse_exif_data(exif_data) if exif_data else None
+    return stat.st_size, stat.st_mtime_ns, metadata
+
+
+def make_record(image_path, file_size, mtime_ns, metadata, found):
+    keys = tuple(metadata)
+    keys = _key_layouts.get(keys) or _key_layouts.setdefault(keys, keys)
+    if len(_key_layouts) > 4096:
+        _key_layouts.clear()
+    return image_path, file_size, mtime_ns, keys, tuple(metadata.values()), tuple(found)
+
+
+def encode_records(records):
+    return marshal.dumps(records)
+
+
+def decode_records(blob):
+    return marshal.loads(blob)
+
+
+def process_single_image(args):
+    """Match one file against one query; returns its match record or None."""
+    (image_path, search_term, search_positive, search_negative, case_sensitive, custom_filter, ignore_term,
+     where) = args
+    try:
+        size, mtime_ns, metadata = read_png(image_path)
+        if not metadata:
+            return None
+        if where and not facets_match(metadata, where):
+            return None
+        if search_term:
+            match_result = matches_search_term(metadata, search_term, search_positive, search_negative, case_sensitive, ignore_term)
+        elif where:
+            match_result = where_only_match(metadata, search_positive, search_negative, case_sensitive, ignore_term)
+        else:
+            return None
+        if match_result and apply_custom_filter(image_path, metadata, custom_filter):
+            return make_record(image_path, size, mtime_ns, metadata, [(0, *match_result)])
+    except Exception:
+        return None
+    return None
+
+
+class PromptMemo:
+    """Per-run table of query verdicts keyed by the text they depend on.
+
+    Batch generations share byte-identical prompts, so the query only has to
+    be evaluated once per distinct prompt (or prompt pair). ``run_id`` ties
+    the table to one search; workers outlive searches and start over when it
+    changes.
+    """
+
+    def __init__(self, limit=100000):
+        self.limit = limit
+        self.run_id = None
+        self.fields = None
+        self.verdicts = {}
+        self.hits = 0
+        self.misses = 0
+
+    def start(self, run_id):
+        if run_id != self.run_id:
+            self.run_id = run_id
+            self.fields = None
+            self.verdicts = {}
+            self.hits = 0
+            self.misses = 0
+
+    def verdict(self, metadata, search_term, search_positive, search_negative, case_sensitive, ignore_term):
+        if self.fields is None:
+            self.fields = field_term_keys(search_term, ignore_term)
+        key = memo_key(metadata, search_positive, search_negative, self.fields)
+        verdict = self.verdicts.get(key, self)
+        if verdict is not self:
+            self.hits += 1
+            return verdict
+        self.misses += 1
+        verdict = matches_search_term(metadata, search_term, search_positive, search_negative, case_sensitive, ignore_term)
+        if len(self.verdicts) >= self.limit:
+            self.verdicts.clear()
+        self.verdicts[key] = verdict
+        return verdict
+
+
+def memo_key(metadata, search_positive, search_negative, fields=()):
+    """The part of ``metadata`` a search verdict depends on; ``fields`` come from field terms."""
+    if search_positive or search_negative:
+        return (metadata.get('Positive') if search_positive else None,
+                metadata.get('Negative') if search_negative else None,
+                *(metadata.get(key) for key in fields))
+    # All-field searches see every value, so only fully identical metadata is shared
+    return tuple(value for value in metadata.values() if isinstance(value, str))
+
+
+_memos = []
+
+
+def process_image_batch(args):
+    """Match a batch of files against one or more queries, reading each file once.
+
+    Each query keeps its own memo, so verdicts are reused for prompts seen
+    earlier in the run. Returns (records, memo_hits, memo_misses, profile, planner_changes)
+    for the batch, with the match records of matched files encoded by
+    encode_records. With ``profile`` set, ``profile`` maps ('term', text) and
+    ('filter', pattern) to [evaluations, matches, seconds]; otherwise it is
+    None. ``planner_changes`` are the term statistics the batch added (see
+    QueryPlanner.changes), for the parent to save.
+    """
+    run_id, paths, queries, profile = args
+    while len(_memos) < len(queries):
+        _memos.append(PromptMemo())
+    memos = _memos[:len(queries)]
+    for memo in memos:
+        memo.start(run_id)
+    hits = sum(memo.hits for memo in memos)
+    misses = sum(memo.misses for memo in memos)
+    _planner.profile = {} if profile else None
+    planner_snapshot = _planner.snapshot([(query[0], query[5], query[1], query[2], query[3])
+                                          for query in queries if query[0]])
+    filter_profile = {}
+    records = []
+    try:
+        for image_path in paths:
+            try:
+                size, mtime_ns, metadata = read_png(image_path)
+            except Exception:
+                continue
+            if metadata is None:
+                continue
+            found = []
+            for index, (memo, query) in enumerate(zip(memos, queries)):
+                (search_term, search_positive, search_negative, case_sensitive, custom_filter,
+                 ignore_term, where) = query
+                try:
+                    if where and not facets_match(metadata, where):
+                        continue
+                    if search_term:
+                        match_result = memo.verdict(metadata, search_term, search_positive, search_negative,
+                                                    case_sensitive, ignore_term)
+                    elif where:
+                        match_result = where_only_match(metadata, search_positive, search_negative,
+                                                        case_sensitive, ignore_term)
+                    else:
+                        continue
+                    if not match_result:
+                        continue
+                    if profile and custom_filter:
+                        start = time.perf_counter()
+                        passed = apply_custom_filter(image_path, metadata, custom_filter)
+                        entry = filter_profile.setdefault(custom_filter, [0, 0, 0.0])
+                        entry[0] += 1
+                        entry[1] += bool(passed)
+                        entry[2] += time.perf_counter() - start
+                    else:
+                        passed = apply_custom_filter(image_path, metadata, custom_filter)
+                    if passed:
+                        found.append((index, *match_result))
+                except Exception:
+                    continue
+            if found:
+                records.append(make_record(image_path, size, mtime_ns, metadata, found))
+        if profile:
+            profile = {('term', key[0]): [0, 0, 0.0] for key in _planner.profile}
+            for key, (evaluations, passed, seconds) in _planner.profile.items():
+                entry = profile[('term', key[0])]
+                entry[0] += evaluations
+                entry[1] += passed
+                entry[2] += seconds
+            profile.update({('filter', pattern): entry for pattern, entry in filter_profile.items()})
+    finally:
+        _planner.profile = None
+    return (encode_records(records), sum(memo.hits for memo in memos) - hits,
+            sum(memo.misses for memo in memos) - misses, profile or None, _planner.changes(planner_snapshot))
+
+
+def read_image_metadata(image_path):
+    """Parse one PNG for the metadata catalog; unreadable files get empty metadata."""
+    try:
+        with Image.open(image_path) as image:
+            return image_path, parse_exif_data(image.info)
+    except Exception:
+        return image_path, {}
+
+
+def parse_exif_data(exif_data):
+    if not exif_data or 'parameters' not in exif_data:
+        return {}
+
+    params = exif_data['parameters']
+    parsed_data = {}
+
+    positive_end = params.find('Negative prompt:')
+    if positive_end != -1:
+        parsed_data['Positive'] = params[:positive_end].strip()
+        negative_start = positive_end + len('Negative prompt:')
+        negative_end = params.find('Steps:')
+        if negative_end != -1:
+            parsed_data['Negative'] = params[negative_start:negative_end].strip()
+
+    param_patterns = {
+        'Steps':              r'Steps: (.*?)(?:,|$)',
+        'Sampler':            r'Sampler: (.*?)(?:,|$)',
+        'CFG scale':          r'CFG scale: (.*?)(?:,|$)',
+        'Seed':               r'Seed: (.*?)(?:,|$)',
+        'Size':               r'Size: (.*?)(?:,|$)',
+        'Model':              r'Model: (.*?)(?:,|$)',
+        'Model hash':         r'Model hash: (.*?)(?:,|$)',
+        'Denoising strength': r'Denoising strength: (.*?)(?:,|$)',
+        'Clip skip':          r'Clip skip: (.*?)(?:,|$)',
+        'Hires upscale':      r'Hires upscale: (.*?)(?:,|$)',
+        'Hires steps':        r'Hires steps: (.*?)(?:,|$)',
+        'Hires upscaler':     r'Hires upscaler: (.*?)(?:,|$)',
+        'Lora hashes':        r'Lora hashes: "(.*?)"(?:,|$)',
+    }
+
+    for key, pattern in param_patterns.items():
+        match = re.search(pattern, params)
+        if match:
+            parsed_data[key] = match.group(1).strip()
+
+    return parsed_data
+
+
+def parse_lora_hashes(text):
+    """``"styleA: 1234abcd, detail: 9f8e"`` -> [('styleA', '1234abcd'), ('detail', '9f8e')]."""
+    pairs = []
+    for entry in (text or '').split(','):
+        name, separator, lora_hash = entry.rpartition(':')
+        if separator and name.strip() and lora_hash.strip():
+            pairs.append((name.strip(), lora_hash.strip()))
+    return pairs
+
+
+def term_pattern(term):
+    """Wildcard term -> regex; ``*`` and ``?`` become ``.*`` and ``.``."""
+    return re.escape(term).replace(r"\*", ".*").replace(r"\?", ".")
+
+
+@lru_cache(maxsize=1024)
+def fold_text(text):
+    """Casefolded NFKC form that case-insensitive searches compare.
+
+    Composed and decomposed accents, full-width letters and case variants all
+    fold to the same string, so matching is a plain substring test.
+    """
+    if text.isascii():
+        return text.lower()
+    return unicodedata.normalize('NFKC', unicodedata.normalize('NFKC', text).casefold())
+
+
+class TermMatcher:
+    """One search term, compiled for the fastest test that keeps its meaning.
+
+    Case-insensitive terms are folded like the text they are compared with,
+    and terms without wildcards are plain substring checks.
+    """
+
+    def __init__(self, term, case_sensitive):
+        self.case_sensitive = case_sensitive
+        self.needle = term if case_sensitive else fold_text(term)
+        self.pattern = None
+        if '*' in self.needle or '?' in self.needle:
+            self.pattern = re.compile(term_pattern(self.needle))
+
+    def matches_folded(self, text):
+        """Test text that is already in the form this matcher compares (see fold_text)."""
+        if self.pattern is None:
+            return self.needle in text
+        return self.pattern.search(text) is not None
+
+    def matches(self, text):
+        return self.matches_folded(text if self.case_sensitive else fold_text(text))
+
+
+@lru_cache(maxsize=512)
+def term_matcher(term, case_sensitive):
+    return TermMatcher(term, case_sensitive)
+
+
+# Query prefix -> metadata key for exact-value terms like ``seed:123456789``
+FIELD_TERMS = {
+    'seed':      'Seed',
+    'model':     'Model',
+    'modelhash': 'Model hash',
+    'size':      'Size',
+    'sampler':   'Sampler',
+    'lora':      'Lora hashes',
+    'lorahash':  'Lora hashes',
+}
+
+# Prefixes answered from the parsed Lora hashes entries rather than one value
+LORA_TERMS = ('lora', 'lorahash')
+
+
+@lru_cache(maxsize=512)
+def field_term(term):
+    """``seed:123`` -> ('seed', '123'); None for ordinary terms."""
+    name, separator, value = term.partition(':')
+    prefix = re.sub(r'[\s_]', '', name.lower())
+    if not separator or prefix not in FIELD_TERMS or not value.strip():
+        return None
+    return prefix, normalize_category(value)
+
+
+def field_term_keys(*queries):
+    """Metadata keys that field terms in the queries look at."""
+    keys = set()
+    for query in queries:
+        for _, _, terms in split_query(query or ''):
+            for term in terms:
+                field = field_term(term)
+                if field is not None:
+                    keys.add(FIELD_TERMS[field[0]])
+    return tuple(sorted(keys))
+
+
+def field_matches(metadata, prefix, value):
+    """Exact, case-insensitive comparison behind a ``prefix:value`` term.
+
+    ``lora:`` compares LoRA names; ``lorahash:`` also accepts a hash prefix.
+    """
+    text = metadata.get(FIELD_TERMS[prefix])
+    if text is None:
+        return False
+    if prefix == 'lora':
+        return any(normalize_category(name) == value for name, _ in parse_lora_hashes(text))
+    if prefix == 'lorahash':
+        return any(normalize_category(lora_hash).startswith(value) for _, lora_hash in parse_lora_hashes(text))
+    return normalize_category(text) == value
+
+
+def term_matches(metadata, term, search_positive, search_negative, case_sensitive):
+    field = field_term(term)
+    if field is not None:
+        # Setting lookups ignore which prompts are searched
+        return field_matches(metadata, *field)
+    weighted = weight_term(term)
+    if weighted is not None:
+        # masterpiece:>1.1 compares attention weights; all-field searches look at both prompts
+        fields = [key for key, selected in (('Positive', search_positive), ('Negative', search_negative))
+                  if selected or not (search_positive or search_negative)]
+        return any(key in metadata and prompt_has_weight(metadata[key], *weighted) for key in fields)
+    matcher = term_matcher(term, case_sensitive)
+    if search_positive or search_negative:
+        if search_positive and 'Positive' in metadata:
+            if matcher.matches(metadata['Positive']):
+                return True
+        if search_negative and 'Negative' in metadata:
+            if matcher.matches(metadata['Negative']):
+                return True
+        return False
+    for value in metadata.values():
+        if isinstance(value, str) and matcher.matches(value):
+            return True
+    return False
+
+
+def split_query(query):
+    """``a && b || c`` -> [(0, 'a && b', ['a', 'b']), (1, 'c', ['c'])].
+
+    Empty OR groups are skipped but keep their position in the numbering, which
+    is what ``create_or_subfolders`` reports.
+    """
+    groups = []
+    for or_index, group in enumerate([t.strip() for t in query.split('||')]):
+        if not group:
+            continue
+        terms = [t.strip() for t in group.split('&&') if t.strip()]
+        groups.append((or_index, group, terms))
+    return groups
+
+
+@lru_cache(maxsize=1024)
+def term_kind(term):
+    """'field', 'weight', 'wildcard' or 'literal': how a term is evaluated, for the query planner."""
+    if field_term(term) is not None:
+        return 'field'
+    if weight_term(term) is not None:
+        return 'weight'
+    if '*' in term or '?' in term:
+        return 'wildcard'
+    return 'literal'
+
+
+_planner = QueryPlanner(term_matches, split_query, term_kind)
+
+
+def init_worker():
+    """Worker process initializer: start the query planner from the saved term statistics."""
+    _planner.restore(load_stats(planner_stats_path()))
+
+
+def matches_search_term(metadata, search_term, search_positive, search_negative, case_sensitive, ignore_term=None):
+    """(or_index, or_group) of the first OR group ``metadata`` matches, or None.
+
+    Nothing matches when an ignore group does. Terms are checked in the order
+    the query planner expects to be cheapest; the verdict does not depend on it.
+    """
+    if not metadata:
+        return None
+    if not search_term:
+        return None
+    return _planner.evaluate(metadata, search_term, search_positive, search_negative, case_sensitive, ignore_term)
+
+
+# (or_index, or_group) of a query that filters on settings alone
+WHERE_MATCH = (0, 'where')
+
+
+def where_only_match(metadata, search_positive, search_negative, case_sensitive, ignore_term=None):
+    """WHERE_MATCH for an image with metadata that no ignore group matches, else None.
+
+    A query with a ``where`` filter and no search term selects every image its
+    facets accept, whether or not it has a prompt.
+    """
+    if not metadata:
+        return None
+    if ignore_term and matches_search_term(metadata, ignore_term, search_positive, search_negative, case_sensitive):
+        return None
+    return WHERE_MATCH
+
+
+def apply_custom_filter(image_path, metadata, custom_filter):
+    if not custom_filter:
+        return True
+    try:
+        for value in metadata.values():
+            if isinstance(value, str) and re.search(custom_filter.strip(), value):
+                return True
+        return False
+    except re.error:
+        return False
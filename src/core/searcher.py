@@ -0,0 +1,656 @@
+import os
+import sys
+import re
+import time
+import shutil
+import uuid
+from datetime import datetime
+from threading import Lock
+from concurrent.futures import as_completed
+from concurrent.futures.process import BrokenProcessPool
+from core.cache_paths import planner_stats_path
+from core.facets import parse_where
+from core.query_planner import save_stats
+from core.scan_worker import PromptMemo, decode_records, process_image_batch, read_image_metadata
+from core.worker_pool import WorkerPool
+
+
+def sanitize_folder_name(name):
+    sanitized = re.sub(r'[<>:"/\\|?*]', '_', name).strip('. ')
+    return sanitized if sanitized else 'unnamed'
+
+
+def validate_search_term(search_term):
+    warnings = []
+    if not search_term:
+        return "", []
+    cleaned = re.sub(r'\|{3,}', '||', search_term)
+    if cleaned != search_term:
+        warnings.append("Multiple consecutive OR operators simplified to ||")
+    cleaned = re.sub(r'&{3,}', '&&', cleaned)
+    or_terms = [t.strip() for t in cleaned.split('||')]
+    valid_or_terms = []
+    for or_term in or_terms:
+        and_terms = [t.strip() for t in or_term.split('&&')]
+        valid_and = [t for t in and_terms if t]
+        if len(and_terms) != len(valid_and):
+            warnings.append("Empty AND terms were removed from search")
+        if valid_and:
+            valid_or_terms.append(' && '.join(valid_and))
+    if len(or_terms) != len(valid_or_terms):
+        warnings.append("Empty OR terms were removed from search")
+    if not valid_or_terms:
+        warnings.append("No valid search terms found after cleaning")
+        return "", warnings
+    return ' || '.join(valid_or_terms), warnings
+
+
+# ---------------------------------------------------------------------------
+# MetadataSearcher
+# ---------------------------------------------------------------------------
+
+class SearchResultStream:
+    """Thread-safe feed of matched paths published by a running search.
+
+    Subscribers first receive everything published so far, then every new
+    batch as it arrives, and finally a close notification.
+    """
+
+    def __init__(self):
+        self._lock = Lock()
+        self._items = []
+        self._subscribers = []
+        self.closed = False
+
+    def __len__(self):
+        with self._lock:
+            return len(self._items)
+
+    def publish(self, items):
+        if not items:
+            return
+        with self._lock:
+            self._items.extend(items)
+            for on_batch, _ in list(self._subscribers):
+                on_batch(list(items))
+
+    def close(self):
+        with self._lock:
+            if self.closed:
+                return
+            self.closed = True
+            for _, on_close in list(self._subscribers):
+                if on_close:
+                    on_close()
+
+    def subscribe(self, on_batch, on_close=None):
+        """Register callbacks and return a function that unsubscribes them."""
+        entry = (on_batch, on_close)
+        with self._lock:
+            if self._items:
+                on_batch(list(self._items))
+            if self.closed:
+                if on_close:
+                    on_close()
+                return lambda: None
+            self._subscribers.append(entry)
+
+        def unsubscribe():
+            with self._lock:
+                if entry in self._subscribers:
+                    self._subscribers.remove(entry)
+        return unsubscribe
+
+
+class ResultDetails:
+    """What a search learned about each result, keyed by output path.
+
+    ``metadata`` holds the parsed metadata, ``stats`` the (size, mtime_ns)
+    of the file and ``matches`` the (or_index, or_term) it matched, so views
+    of the results never read a file again.
+    """
+
+    def __init__(self):
+        self.metadata = {}
+        self.stats = {}
+        self.matches = {}
+
+    def add(self, path, match, metadata=None, stat=None):
+        self.matches[path] = match
+        if metadata is not None:
+            self.metadata[path] = metadata
+        if stat is not None:
+            self.stats[path] = stat
+
+
+def process_file_matches(image_path, matches, metadata=None, stat=None):
+    """Hand the matches of one file to their searchers: every copy first, then the move.
+
+    ``matches`` lists (searcher, (or_index, or_term)). Once one searcher has
+    moved the file, later move destinations get a copy from its new place. A
+    copy or move that fails is logged by its searcher and skipped. Returns
+    the output paths of the recorded matches.
+    """
+    output_paths = []
+    source = image_path
+    for searcher, match in sorted(matches, key=lambda entry: bool(entry[0].move_path)):
+        try:
+            output_path = searcher.process_match((image_path, match), metadata, stat, source)
+        except OSError as e:
+            searcher.log(searcher.lang.get_string("errors.file_action").format(image_path, e))
+            continue
+        if searcher.move_path and source == image_path:
+            source = output_path
+        output_paths.append(output_path)
+    return output_paths
+
+
+class MetadataSearcher:
+    def __init__(self, search_term, recursive=False, log_path=None, copy_path=None,
+                 move_path=None, custom_filter=None, search_positive=True,
+                 search_negative=False, case_sensitive=False, ignore_term=None, lang=None,
+                 worker_pool=None, use_index=False, where=None):
+        cleaned_term, search_warnings = validate_search_term(search_term)
+        cleaned_ignore, ignore_warnings = validate_search_term(ignore_term) if ignore_term else ("", [])
+        self.where = parse_where(where)
+        self.search_term = cleaned_term
+        self.ignore_term = cleaned_ignore
+
+        warnings = search_warnings + ignore_warnings
+        self.recursive = recursive
+        self.log_path = log_path
+        self.copy_path = copy_path
+        self.move_path = move_path
+        self.custom_filter = custom_filter
+        self.match_folder_structure = True
+        self.create_or_subfolders = False
+        self.search_positive = search_positive
+        self.search_negative = search_negative
+        self.case_sensitive = case_sensitive
+        self.lang = lang
+        self.worker_pool = worker_pool
+        self.use_index = use_index
+        self.output_text = []
+        self.search_root = None
+
+        self.found_files = []
+        self.found_paths = []
+        self.output_paths = []
+        self.copied_files = []
+        self.moved_files = []
+        self.duplicate_groups = {}
+        self.result_details = ResultDetails()
+        self.log_lock = Lock()
+        self.progress_callback = None
+        self.result_stream = SearchResultStream()
+        self.stream_batch_size = 64
+        self.stream_interval = 0.25
+        self.scan_batch_size = 32
+        self.explain = False
+        self.explain_report = None
+
+        if self.log_path:
+            os.makedirs(self.log_path, exist_ok=True)
+        if self.copy_path:
+            os.makedirs(self.copy_path, exist_ok=True)
+        if self.move_path:
+            os.makedirs(self.move_path, exist_ok=True)
+
+        for warning in warnings:
+            self.log(f"Warning: {warning}")
+        if search_term and cleaned_term != search_term:
+            self.log(f"Search term was cleaned to: {cleaned_term}")
+
+    def count_files(self, folder_path):
+        if self.recursive:
+            return sum(
+                sum(1 for f in files if f.lower().endswith('.png'))
+                for _, _, files in os.walk(folder_path)
+            )
+        return sum(1 for f in os.listdir(folder_path) if f.lower().endswith('.png'))
+
+    def get_all_png_files(self, folder_path):
+        if self.recursive:
+            return [
+                os.path.join(root, f)
+                for root, _, files in os.walk(folder_path)
+                for f in files if f.lower().endswith('.png')
+            ]
+        return [
+            os.path.join(folder_path, f)
+            for f in os.listdir(folder_path) if f.lower().endswith('.png')
+        ]
+
+    def process_match(self, match_data, metadata=None, stat=None, source=None):
+        """Record one match, copying or moving its file; returns the path it ends up at.
+
+        ``source`` is where the file is now when another query already moved
+        it away from ``image_path``; it is then copied instead of moved. A
+        failed copy or move raises OSError and the match is not recorded.
+        """
+        if not match_data:
+            return None
+        image_path, (or_index, or_term) = match_data
+        filename = os.path.basename(image_path)
+        source = source or image_path
+
+        output_path = image_path
+        if self.copy_path or self.move_path:
+            if self.create_or_subfolders:
+                subfolder = sanitize_folder_name(or_term)
+                if self.match_folder_structure:
+                    rel_path = os.path.relpath(os.path.dirname(image_path), self.search_root)
+                    dest_dir = (os.path.join(self.copy_path or self.move_path, subfolder)
+                                if rel_path == '.'
+                                else os.path.join(self.copy_path or self.move_path, subfolder, rel_path))
+                else:
+                    dest_dir = os.path.join(self.copy_path or self.move_path, subfolder)
+            else:
+                if self.match_folder_structure:
+                    rel_path = os.path.relpath(os.path.dirname(image_path), self.search_root)
+                    dest_dir = (self.copy_path or self.move_path
+                                if rel_path == '.'
+                                else os.path.join(self.copy_path or self.move_path, rel_path))
+                else:
+                    dest_dir = self.copy_path or self.move_path
+
+            os.makedirs(dest_dir, exist_ok=True)
+            output_path = os.path.join(dest_dir, filename)
+
+            if self.copy_path:
+                shutil.copy2(source, output_path)
+            if self.move_path:
+                if source == image_path:
+                    shutil.move(source, output_path)
+                else:
+                    shutil.copy2(source, output_path)
+            if self.copy_path:
+                self.copied_files.append(output_path)
+            if self.move_path:
+                self.moved_files.append(output_path)
+
+        self.found_files.append(filename)
+        self.found_paths.append(image_path)
+        self.output_paths.append(output_path)
+        self.result_details.add(output_path, (or_index, or_term), metadata, stat)
+        return output_path
+
+    def log(self, message):
+        with self.log_lock:
+            self.output_text.append(message)
+            print(message)
+            if self.log_path:
+                timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+                log_file = os.path.join(self.log_path, f"log_{timestamp}.txt")
+                with open(log_file, 'a', encoding='utf-8') as f:
+                    f.write(f"{datetime.now().isoformat()}: {message}\n")
+
+    def set_progress_callback(self, callback):
+        self.progress_callback = callback
+
+    def update_progress(self, phase, current, total):
+        if self.progress_callback:
+            self.progress_callback(phase, current, total)
+
+    def search_images(self, folder_path):
+        self.search_root = folder_path
+        if self.result_stream.closed:
+            self.result_stream = SearchResultStream()
+        try:
+            self._search_images(folder_path)
+        finally:
+            self.result_stream.close()
+
+    def _search_images(self, folder_path):
+        self.log(self.lang.get_string("messages.searching_in").format(folder_path))
+        self._reset_results()
+
+        if not self.search_term and not self.where and not self.custom_filter:
+            self.log(self.lang.get_string("errors.no_valid_terms"))
+            return
+
+        if self.use_index:
+            total_files, matching_files = self._search_catalog(folder_path)
+        else:
+            total_files, matching_files = self._search_files(folder_path)
+        self._log_results(total_files, matching_files)
+
+    def _reset_results(self):
+        self.found_files = []
+        self.found_paths = []
+        self.output_paths = []
+        self.copied_files = []
+        self.moved_files = []
+        self.duplicate_groups = {}
+        self.result_details = ResultDetails()
+
+    def search_similar(self, folder_path, query, k=20):
+        """Rank the folder's images by how closely their Positive prompt resembles ``query``.
+
+        ``query`` is prompt text, or the path of a PNG whose Positive prompt is used.
+        """
+        self.search_root = folder_path
+        if self.result_stream.closed:
+            self.result_stream = SearchResultStream()
+        try:
+            self._search_similar(folder_path, query, k)
+        finally:
+            self.result_stream.close()
+
+    def _search_similar(self, folder_path, query, k):
+        from core.similarity import PromptSimilarity
+
+        self.log(self.lang.get_string("messages.searching_in").format(folder_path))
+        self._reset_results()
+        catalog = self._open_catalog(folder_path)
+        prompt, exclude = query, None
+        if os.path.isfile(query):
+            path = os.path.abspath(query)
+            exclude = catalog.doc_ids.get(path)
+            metadata = catalog.record(exclude) if exclude is not None else read_image_metadata(path)[1]
+            prompt = metadata.get('Positive')
+            if not prompt:
+                self.log(self.lang.get_string("errors.no_prompt").format(query))
+                return
+
+        results = PromptSimilarity(catalog).most_similar(prompt, k, exclude)
+        self.log("\n" + self.lang.get_string("messages.similar_results").format(len(results)))
+        for doc_id, score in results:
+            path = catalog.paths[doc_id]
+            self.log(f"{score:.3f}  {path}")
+            self.process_match((path, (0, 'similar')), catalog.record(doc_id), catalog.stat(doc_id))
+        self.result_stream.publish(list(self.output_paths))
+        self._log_results(len(catalog), len(results))
+
+    def find_near_duplicates(self, folder_path, threshold=0.8):
+        """Cluster the folder's images by near-duplicate Positive prompts.
+
+        Every cluster of two or more images is reported and its first image
+        goes through process_match as the representative; images without a
+        near-duplicate are left alone.
+        """
+        self.search_root = folder_path
+        if self.result_stream.closed:
+            self.result_stream = SearchResultStream()
+        try:
+            self._find_near_duplicates(folder_path, threshold)
+        finally:
+            self.result_stream.close()
+
+    def _find_near_duplicates(self, folder_path, threshold):
+        self.log(self.lang.get_string("messages.searching_in").format(folder_path))
+        self._reset_results()
+        catalog = self._open_catalog(folder_path)
+        clusters = catalog.near_duplicates(threshold)
+
+        groups = [(docs, prompts) for docs, prompts in clusters if len(docs) > 1]
+        self.log("\n" + self.lang.get_string("messages.near_duplicates").format(len(groups)))
+        for docs, prompts in groups:
+            self.log(f"{len(docs):>8}  {prompts:>6}  {catalog.paths[docs[0]]}")
+
+        for docs, _ in groups:
+            self.process_match((catalog.paths[docs[0]], (0, 'representative')), catalog.record(docs[0]),
+                               catalog.stat(docs[0]))
+        self.result_stream.publish(list(self.output_paths))
+        self._log_results(len(catalog), len(groups))
+
+    def find_duplicate_images(self, folder_path, radius=4):
+        """Group the folder's images that look the same, whatever their metadata.
+
+        Images are compared by perceptual hash; hashes are kept in the metadata
+        index, so a rescan only decodes new or changed files. Every image of
+        every group goes through process_match with its group as OR term, and
+        ``duplicate_groups`` maps each output path to its group number.
+        """
+        self.search_root = folder_path
+        if self.result_stream.closed:
+            self.result_stream = SearchResultStream()
+        try:
+            self._find_duplicate_images(folder_path, radius)
+        finally:
+            self.result_stream.close()
+
+    def _find_duplicate_images(self, folder_path, radius):
+        self.log(self.lang.get_string("messages.searching_in").format(folder_path))
+        self._reset_results()
+        catalog = self._open_catalog(folder_path)
+        pool = self.worker_pool or WorkerPool()
+        try:
+            hashed = catalog.update_image_hashes(pool.executor(), self.update_progress)
+        except BrokenProcessPool:
+            pool.reset()
+            raise
+        finally:
+            if self.worker_pool is None:
+                pool.shutdown()
+        self.log(self.lang.get_string("messages.image_hashes").format(hashed))
+        try:
+            catalog.save()
+        except OSError as e:
+            self.log(f"Warning: {e}")
+
+        groups = catalog.duplicate_images(radius)
+        self.log("\n" + self.lang.get_string("messages.duplicate_images").format(len(groups)))
+        matching_files = 0
+        for number, docs in enumerate(groups, 1):
+            self.log(f"{len(docs):>8}  {catalog.paths[docs[0]]}")
+            first = len(self.output_paths)
+            for doc_id in docs:
+                self.process_match((catalog.paths[doc_id], (number, f"duplicates_{number}")),
+                                   catalog.record(doc_id), catalog.stat(doc_id))
+            for path in self.output_paths[first:]:
+                self.duplicate_groups[path] = number
+            self.result_stream.publish(self.output_paths[first:])
+            matching_files += len(docs)
+        self._log_results(len(catalog), matching_files)
+
+    def _search_files(self, folder_path):
+        self.log(self.lang.get_string("progress.counting"))
+        total_files = self.count_files(folder_path)
+        self.log(self.lang.get_string("progress.found_files").format(total_files))
+
+        png_files = self.get_all_png_files(folder_path)
+        profile = self._start_explain(None)
+        started = time.perf_counter()
+        matching_files, = self._scan_files(png_files, total_files, [self], profile)
+        self._finish_explain(profile, time.perf_counter() - started)
+        return total_files, matching_files
+
+    def query(self):
+        """The query tuple scan workers evaluate."""
+        return (self.search_term, self.search_positive, self.search_negative,
+                self.case_sensitive, self.custom_filter, self.ignore_term, self.where)
+
+    def _scan_files(self, png_files, total_files, searchers, profile=None):
+        """Read every file once and evaluate the query of each of ``searchers`` on it.
+
+        Matches go to the searcher whose query they satisfy, through
+        process_file_matches, and are streamed from this one. A ``profile`` dict collects the workers' per-term
+        counters. Returns the match count per searcher.
+        """
+        queries = tuple(searcher.query() for searcher in searchers)
+        run_id = uuid.uuid4().hex
+        if profile is not None:
+            from core.explain import merge_profile
+
+        processed_files = 0
+        memo_hits = memo_misses = 0
+        planner_changes = []
+        pending_stream = []
+        last_publish = time.monotonic()
+        progress = None
+        # Without a shared pool this search owns a short-lived one.
+        pool = self.worker_pool or WorkerPool()
+        try:
+            executor = pool.executor()
+            # Small folders still get spread over every worker
+            size = max(1, min(self.scan_batch_size, len(png_files) // (pool.max_workers * 4)))
+            batches = [png_files[i:i + size] for i in range(0, len(png_files), size)]
+            futures = {executor.submit(process_image_batch, (run_id, batch, queries, profile is not None)):
+                       len(batch) for batch in batches}
+            progress_stream = sys.stderr if sys.stderr is not None else sys.stdout
+            if progress_stream is not None:
+                from tqdm import tqdm
+                progress = tqdm(
+                    total=len(png_files),
+                    desc=self.lang.get_string("progress.processing"),
+                    unit="file",
+                    file=progress_stream,
+                )
+            for future in as_completed(futures):
+                processed_files += futures[future]
+                records, hits, misses, batch_profile, batch_changes = future.result()
+                if profile is not None:
+                    merge_profile(profile, batch_profile)
+                memo_hits += hits
+                memo_misses += misses
+                planner_changes.extend(batch_changes)
+                for image_path, file_size, mtime_ns, keys, values, found in decode_records(records):
+                    matches = [(searchers[index], (or_index, or_term)) for index, or_index, or_term in found]
+                    pending_stream.extend(process_file_matches(image_path, matches, dict(zip(keys, values)),
+                                                               (file_size, mtime_ns)))
+                if pending_stream and (len(pending_stream) >= self.stream_batch_size
+                                       or time.monotonic() - last_publish >= self.stream_interval):
+                    self.result_stream.publish(pending_stream)
+                    pending_stream = []
+                    last_publish = time.monotonic()
+                if progress is not None:
+                    progress.update(futures[future])
+                self.update_progress("search", processed_files, total_files)
+        except BrokenProcessPool:
+            pool.reset()
+            raise
+        finally:
+            if progress is not None:
+                progress.close()
+            if self.worker_pool is None:
+                pool.shutdown()
+        self._log_memo(memo_hits, memo_misses)
+        self._save_planner_stats(planner_changes)
+        self.result_stream.publish(pending_stream)
+        return [len(searcher.found_paths) for searcher in searchers]
+
+    def _start_explain(self, catalog):
+        """Log how the query will run when ``explain`` is set; returns the profile dict to fill, or None."""
+        if not self.explain:
+            return None
+        # Explaining needs numpy and the trigram index, which plain searches never load
+        from core.explain import explain_query, format_explain
+
+        self.explain_report = explain_query(self.search_term, self.ignore_term, self.custom_filter, self.where,
+                                            self.search_positive, self.search_negative, self.case_sensitive,
+                                            catalog)
+        self.log("\n" + self.lang.get_string("messages.explain_plan"))
+        for line in format_explain(self.explain_report):
+            self.log(line)
+        return {}
+
+    def _finish_explain(self, profile, seconds):
+        if profile is None:
+            return
+        from core.explain import format_profile, profile_rows
+
+        rows = profile_rows(profile)
+        self.explain_report['profile'] = rows
+        self.explain_report['seconds'] = seconds
+        self.log("\n" + self.lang.get_string("messages.explain_profile").format(seconds))
+        for line in format_profile(rows):
+            self.log(line)
+
+    def _save_planner_stats(self, changes):
+        """Add what the workers learned about the terms to the stats new workers start from."""
+        if not changes:
+            return
+        try:
+            save_stats(planner_stats_path(), changes)
+        except OSError as e:
+            self.log(f"Warning: {e}")
+
+    def _log_memo(self, hits, misses):
+        evaluated = hits + misses
+        if evaluated:
+            self.log(self.lang.get_string("messages.prompt_memo").format(evaluated, misses, 100.0 * hits / evaluated))
+
+    def _open_catalog(self, folder_path):
+        """The folder's metadata catalog, refreshed and saved; only new or changed files are parsed."""
+        from core.catalog import MetadataCatalog
+
+        catalog = MetadataCatalog.open(folder_path, self.recursive)
+        pool = self.worker_pool or WorkerPool()
+        try:
+            new, changed, removed = catalog.refresh(pool.executor(), self.update_progress)
+        except BrokenProcessPool:
+            pool.reset()
+            raise
+        finally:
+            if self.worker_pool is None:
+                pool.shutdown()
+        self.log(self.lang.get_string("messages.index_refresh").format(len(catalog), new, changed, removed))
+        try:
+            catalog.save()
+        except OSError as e:
+            self.log(f"Warning: {e}")
+        return catalog
+
+    def _search_catalog(self, folder_path):
+        """Answer the query from the metadata index."""
+        from core.index_search import evaluate_query
+
+        catalog = self._open_catalog(folder_path)
+        total_files = len(catalog)
+        memo = PromptMemo()
+        profile = self._start_explain(catalog)
+        started = time.perf_counter()
+        results = evaluate_query(catalog, self.search_term, self.ignore_term, self.search_positive,
+                                 self.search_negative, self.case_sensitive, self.custom_filter, self.where, memo,
+                                 profile)
+        self._finish_explain(profile, time.perf_counter() - started)
+        self._log_memo(memo.hits, memo.misses)
+        pending_stream = []
+        for processed, (doc_id, match) in enumerate(results, 1):
+            pending_stream.extend(process_file_matches(catalog.paths[doc_id], [(self, match)],
+                                                       catalog.record(doc_id), catalog.stat(doc_id)))
+            if len(pending_stream) >= self.stream_batch_size:
+                self.result_stream.publish(pending_stream)
+                pending_stream = []
+            self.update_progress("search", processed, len(results))
+        self.result_stream.publish(pending_stream)
+        return total_files, len(self.found_paths)
+
+    def report_lora_usage(self, folder_path):
+        """Log how many images use each LoRA, counted from the metadata index."""
+        usage = self._open_catalog(folder_path).lora_usage()
+        self.log("\n" + self.lang.get_string("messages.lora_usage").format(len(usage)))
+        for name, count in usage:
+            self.log(f"{count:>8}  {name}")
+        return usage
+
+    def _log_results(self, total_files, matching_files):
+        if matching_files > 0:
+            self.log("\n" + self.lang.get_string("messages.matching_files"))
+            for filename in self.found_files:
+                self.log(filename)
+            self.log("\n" + self.lang.get_string("messages.complete_paths"))
+            if self.copy_path:
+                for path in self.copied_files:
+                    self.log(path)
+            elif self.move_path:
+                for path in self.moved_files:
+                    self.log(path)
+            else:
+                for path in self.found_paths:
+                    self.log(path)
+
+        self.log("\n" + self.lang.get_string("messages.summary"))
+        self.log(self.lang.get_string("messages.total_files").format(total_files))
+        self.log(self.lang.get_string("messages.matches_found").format(matching_files))
+
+        actions = []
+        if self.log_path:
+            actions.append(self.lang.get_string("messages.logged_files"))
+        if self.copy_path:
+            actions.append(self.lang.get_string("messages.copied_files").format(len(self.copied_files)))
+        if self.move_path:
+            actions.append(self.lang.get_string("messages.moved_files").format(len(self.moved_files)))
+        if actions:
+            self.log(self.lang.get_string("messages.actions_taken").format(", ".join(actions)))
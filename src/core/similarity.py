@@ -0,0 +1,78 @@
+import math
+
+import numpy as np
+
+from core.attention import weighted_tags
+from core.metadata_store import PROMPT
+
+
+class PromptSimilarity:
+    """TF-IDF cosine similarity between Positive prompts, over their bare tags.
+
+    Each distinct prompt is a binary vector of the tags ``weighted_tags`` finds
+    in it, weighted by smoothed inverse document frequency. The bare-tag
+    postings of the catalog's tag index already are that sparse matrix by
+    column, so a query only walks the posting lists of its own tags and
+    scores every prompt with a few vectorized adds.
+    """
+
+    def __init__(self, catalog):
+        self.catalog = catalog
+        store = catalog.store
+        count = catalog.prompt_count
+        entry = store.fields.get('Positive')
+        alive = catalog.alive.values().astype(bool)
+        self.doc_prompts = np.full(catalog.size, -1, dtype=np.int64)
+        self.positive = np.zeros(count, dtype=bool)
+        if entry is not None and entry[0] == PROMPT:
+            self.doc_prompts = np.where(alive, entry[1].values(), -1).astype(np.int64)
+            self.positive[self.doc_prompts[self.doc_prompts >= 0]] = True
+        self.prompt_total = int(np.count_nonzero(self.positive))
+
+        # Vector norms of every Positive prompt in one pass over the postings
+        keys, lengths, ids = catalog.tag_index.bare.segments()
+        posting_keys = np.repeat(keys, lengths)
+        used = self.positive[ids] if len(ids) else np.zeros(0, dtype=bool)
+        frequency = np.bincount(posting_keys[used], minlength=int(keys.max()) + 1 if len(keys) else 0)
+        weights = self._idf(frequency) ** 2
+        norms = np.bincount(ids[used], weights=weights[posting_keys[used]], minlength=count)
+        self.norms = np.sqrt(norms)
+
+    def _idf(self, frequency):
+        return np.log((1 + self.prompt_total) / (1 + np.asarray(frequency, dtype=np.float64))) + 1
+
+    def prompt_scores(self, prompt):
+        """Cosine similarity of ``prompt`` to every prompt id (0 for unused prompts)."""
+        scores = np.zeros(self.catalog.prompt_count, dtype=np.float64)
+        query_norm = 0.0
+        for tag in {tag for tag, _ in weighted_tags(prompt)}:
+            ids = self.catalog.tag_index.bare.get(tag)
+            ids = ids[self.positive[ids]] if ids is not None else np.empty(0, dtype=np.uint32)
+            weight = float(self._idf(len(ids)))
+            query_norm += weight * weight
+            scores[ids] += weight * weight
+        if query_norm == 0:
+            return scores
+        with np.errstate(divide='ignore', invalid='ignore'):
+            scores /= self.norms * math.sqrt(query_norm)
+        return np.nan_to_num(scores, copy=False)
+
+    def most_similar(self, prompt, k, exclude=None):
+        """The ``k`` live docs whose Positive prompt is closest to ``prompt``.
+
+        Returns [(doc_id, score)], best first, leaving out ``exclude`` and
+        docs that share no tag with the prompt.
+        """
+        prompt_scores = self.prompt_scores(prompt)
+        if k < 1 or not len(prompt_scores):
+            return []
+        scores = np.where(self.doc_prompts >= 0, prompt_scores[np.maximum(self.doc_prompts, 0)], 0.0)
+        if exclude is not None:
+            scores[exclude] = 0.0
+        candidates = np.flatnonzero(scores > 0)
+        if len(candidates) > k:
+            # Keep everything tied with the k-th score so ties go to the lowest doc ids
+            cutoff = -np.partition(-scores[candidates], k - 1)[k - 1]
+            candidates = candidates[scores[candidates] >= cutoff]
+        order = np.lexsort((candidates, -scores[candidates]))[:k]
+        return [(int(doc_id), float(scores[doc_id])) for doc_id in candidates[order]]
@@ -0,0 +1,113 @@
+import re
+
+import numpy as np
+
+from core.attention import weighted_tags, prompt_has_weight
+from core.columns import PostingTable
+from core.scan_worker import fold_text
+
+PROMPT_FIELDS = ('Positive', 'Negative')
+
+_WORD_RE = re.compile(r'\w+')
+_SPACE_RE = re.compile(r'\s+')
+
+
+def normalize_tag(text):
+    return _SPACE_RE.sub(' ', fold_text(text)).strip()
+
+
+def split_tags(prompt):
+    """Comma-separated prompt -> normalized, non-empty tags."""
+    return [tag for tag in (normalize_tag(part) for part in prompt.split(',')) if tag]
+
+
+def is_word(text):
+    return _WORD_RE.fullmatch(text) is not None
+
+
+class TagIndex:
+    """Inverted index from normalized tags and words to prompt ids.
+
+    Prompts are indexed once per distinct text (ids from the catalog's prompt
+    pool), whether a file uses them as Positive or Negative; the catalog maps
+    prompt masks back to documents per field. Ids only ever increase, so the
+    posting lists stay sorted without rewriting.
+    """
+
+    def __init__(self):
+        self.tags = PostingTable()
+        self.words = PostingTable()
+        self.bare = PostingTable()     # tags with attention syntax removed, for weight terms
+        self._expansions = {}
+
+    def add_prompt(self, prompt_id, text, folded):
+        """Index one prompt; ``folded`` is its fold_text form, which tags and words come from."""
+        tags = set(split_tags(folded))
+        words = set()
+        for tag in tags:
+            words.update(_WORD_RE.findall(tag))
+        for tag in tags:
+            self.tags.append(tag, prompt_id)
+        for word in words:
+            self.words.append(word, prompt_id)
+        for tag in {tag for tag, _ in weighted_tags(text)}:
+            self.bare.append(tag, prompt_id)
+        self._expansions.clear()
+
+    def save(self, directory):
+        self.tags.save(directory, "tags")
+        self.words.save(directory, "words")
+        self.bare.save(directory, "bare")
+
+    @classmethod
+    def load(cls, directory):
+        index = cls()
+        index.tags = PostingTable.load(directory, "tags")
+        index.words = PostingTable.load(directory, "words")
+        index.bare = PostingTable.load(directory, "bare")
+        return index
+
+    def vocabulary_size(self):
+        return len(self.tags), len(self.words)
+
+    def _expand(self, table, key, needle):
+        """Every vocabulary entry that contains ``needle`` (cached until the next add)."""
+        keys = self._expansions.get(key)
+        if keys is None:
+            keys = [entry for entry in table if needle in entry]
+            self._expansions[key] = keys
+        return keys
+
+    def prompts_containing(self, needle, count):
+        """Mask of prompts with a tag or word containing the normalized ``needle``.
+
+        Any occurrence of a needle without commas lies inside a single tag, and a
+        needle made only of word characters lies inside a single word, so the
+        mask is a superset of the substring matches. Returns None when the needle
+        spans tags and the index cannot narrow it.
+        """
+        needle = normalize_tag(needle)
+        if not needle or ',' in needle:
+            return None
+        if is_word(needle):
+            table, kind = self.words, 'w'
+        else:
+            table, kind = self.tags, 't'
+        keys = self._expand(table, (kind, needle), needle)
+        mask = np.zeros(count, dtype=bool)
+        if keys:
+            mask[np.concatenate([table.get(k) for k in keys])] = True
+        return mask
+
+    def prompts_weighing(self, tag, op, value, prompts):
+        """Mask of prompts that weigh the bare ``tag`` as ``op value`` asks.
+
+        Only prompts containing the tag are tokenized; ``prompts`` is the
+        catalog's prompt pool.
+        """
+        mask = np.zeros(len(prompts), dtype=bool)
+        ids = self.bare.get(tag)
+        if ids is not None:
+            for prompt_id in ids.tolist():
+                mask[prompt_id] = prompt_has_weight(prompts[prompt_id], tag, op, value)
+        return mask
@@ -0,0 +1,164 @@
+import numpy as np
+
+try:
+    from re import _parser as sre_parse
+    from re import _constants as sre_constants
+except ImportError:  # Python < 3.11
+    import sre_parse
+    import sre_constants
+
+from core.columns import PostingTable
+from core.scan_worker import fold_text
+
+_INTEGER_CHARS = frozenset('-0123456789')
+
+
+def trigrams(text):
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+def wildcard_literals(term):
+    """Literal runs every match of a ``*``/``?`` term must contain."""
+    literal = term.replace('?', '*')
+    return [part for part in literal.split('*') if len(part) >= 3]
+
+
+# ---------------------------------------------------------------------------
+# Required literals of a regex
+#
+# A parsed pattern is reduced to a small and/or tree of literal strings that
+# any match must contain: ('lit', s), ('and', [...]) or ('or', [...]). None
+# means "no requirement", so the index cannot narrow that part.
+# ---------------------------------------------------------------------------
+
+def _and(nodes):
+    nodes = [n for n in nodes if n is not None]
+    if not nodes:
+        return None
+    return nodes[0] if len(nodes) == 1 else ('and', nodes)
+
+
+def _required(items):
+    nodes = []
+    run = []
+
+    def flush():
+        if run:
+            nodes.append(('lit', ''.join(run)))
+            run.clear()
+
+    for op, av in items:
+        if op is sre_constants.LITERAL:
+            # Under (?i) a non-ASCII letter can match an ASCII one that
+            # fold_text keeps apart (dotless i and i), so only ASCII is required
+            if av < 128:
+                run.append(chr(av))
+                continue
+        flush()
+        if op is sre_constants.SUBPATTERN:
+            nodes.append(_required(av[-1]))
+        elif op is sre_constants.BRANCH:
+            branches = [_required(branch) for branch in av[1]]
+            if all(b is not None for b in branches):
+                nodes.append(('or', branches))
+        elif op in (sre_constants.MAX_REPEAT, sre_constants.MIN_REPEAT,
+                    getattr(sre_constants, 'POSSESSIVE_REPEAT', None)):
+            min_count, _, inner = av
+            if min_count >= 1:
+                nodes.append(_required(inner))
+        elif op is getattr(sre_constants, 'ATOMIC_GROUP', None):
+            nodes.append(_required(av))
+    flush()
+    return _and(nodes)
+
+
+def regex_requirements(pattern):
+    """Literal requirements of a regex, or None when it cannot be parsed or narrowed."""
+    try:
+        return _required(sre_parse.parse(pattern))
+    except (sre_constants.error, RecursionError, OverflowError, ValueError):
+        return None
+
+
+def literal_requirements(literals):
+    return _and([('lit', literal) for literal in literals])
+
+
+def requirement_met(requirement, folded_text):
+    """Whether a folded string contains the literals a requirement asks for."""
+    kind, value = requirement
+    if kind == 'lit':
+        return fold_text(value) in folded_text
+    if kind == 'or':
+        return any(requirement_met(child, folded_text) for child in value)
+    return all(requirement_met(child, folded_text) for child in value)
+
+
+def integer_could_meet(requirement):
+    """False when no integer string can contain the required literals."""
+    kind, value = requirement
+    if kind == 'lit':
+        return set(fold_text(value)) <= _INTEGER_CHARS
+    if kind == 'or':
+        return any(integer_could_meet(child) for child in value)
+    return all(integer_could_meet(child) for child in value)
+
+
+class TrigramIndex:
+    """Trigram postings over the fold_text form of every distinct prompt.
+
+    Lookups return candidate masks over prompt ids that are always a superset
+    of the real matches, case-sensitive or not, so callers verify the
+    candidates with the actual pattern.
+    """
+
+    def __init__(self):
+        self.postings = PostingTable()
+
+    def add_prompt(self, prompt_id, folded):
+        for gram in trigrams(folded):
+            self.postings.append(gram, prompt_id)
+
+    def save(self, directory):
+        self.postings.save(directory, "trigrams")
+
+    @classmethod
+    def load(cls, directory):
+        index = cls()
+        index.postings = PostingTable.load(directory, "trigrams")
+        return index
+
+    def _literal_ids(self, literal):
+        """Sorted prompt ids containing every trigram of ``literal``."""
+        table = self.postings
+        grams = sorted(trigrams(fold_text(literal)), key=table.count)
+        if table.count(grams[0]) == 0:
+            return np.empty(0, dtype=np.uint32)
+        ids = table.get(grams[0])
+        for gram in grams[1:]:
+            if not len(ids):
+                break
+            ids = np.intersect1d(ids, table.get(gram), assume_unique=True)
+        return ids
+
+    def _node_mask(self, node, count):
+        kind, value = node
+        if kind == 'lit':
+            if len(value) < 3:
+                return None
+            mask = np.zeros(count, dtype=bool)
+            mask[self._literal_ids(value)] = True
+            return mask
+        masks = [self._node_mask(child, count) for child in value]
+        if kind == 'or':
+            if any(m is None for m in masks):
+                return None
+            return np.logical_or.reduce(masks)
+        masks = [m for m in masks if m is not None]
+        return np.logical_and.reduce(masks) if masks else None
+
+    def prompts_matching(self, requirement, count):
+        """Candidate prompt mask for a requirement; None when it cannot be narrowed."""
+        if requirement is None:
+            return None
+        return self._node_mask(requirement, count)
@@ -0,0 +1,54 @@
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from threading import Lock
+from core.scan_worker import init_worker
+
+
+def default_worker_count():
+    return max(1, multiprocessing.cpu_count() - 1)
+
+
+class WorkerPool:
+    """Process pool that is started on first use and kept warm between searches.
+
+    Spawning workers is expensive in the frozen build, so one pool is owned by
+    the GUI (or a CLI session) and reused. Changing the size restarts it on the
+    next request.
+    """
+
+    def __init__(self, max_workers=None):
+        self._lock = Lock()
+        self._executor = None
+        self._size = 0
+        self.max_workers = max(1, int(max_workers)) if max_workers else default_worker_count()
+
+    @property
+    def running(self):
+        return self._executor is not None
+
+    def resize(self, max_workers):
+        """Set the worker count; 0 or None means one less than the CPU count."""
+        self.max_workers = max(1, int(max_workers)) if max_workers else default_worker_count()
+
+    def executor(self):
+        with self._lock:
+            if self._executor is not None and self._size != self.max_workers:
+                self._executor.shutdown(wait=False, cancel_futures=True)
+                self._executor = None
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(max_workers=self.max_workers, initializer=init_worker)
+                self._size = self.max_workers
+            return self._executor
+
+    def reset(self):
+        """Drop a broken pool so the next request starts a fresh one."""
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=False, cancel_futures=True)
+                self._executor = None
+
+    def shutdown(self, wait=True):
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=wait, cancel_futures=True)
+                self._executor = None
@@ -0,0 +1,1131 @@
+import os
+import sys
+import ctypes
+import struct
+import math
+import bisect
+import threading
+from datetime import datetime
+import tkinter as tk
+from tkinter import ttk, messagebox
+from threading import Lock
+from PIL import Image, ImageTk
+from gui.theme import _DARK, resource_path, style_menu
+from gui.widgets import ModernSlider
+from gui.image_preview import ImagePreview
+from core.highlight import highlight_spans
+from core.result_order import SORT_KEYS, order_results
+from core.scan_worker import PromptMemo
+from core.searcher import ResultDetails, validate_search_term
+
+
+# ---------------------------------------------------------------------------
+# Justified row layout
+# ---------------------------------------------------------------------------
+
+class JustifiedRowLayout:
+    """Row breaks and row offsets for the justified thumbnail grid.
+
+    Rows are kept as start offsets into the item list plus cumulative row tops,
+    so edits only recompute rows from the first one they touch and lookups by
+    item index or canvas position are binary searches. Items listed in
+    ``sections`` start a new row below a header band of ``header_height``.
+    """
+
+    def __init__(self, padding, row_height):
+        self.padding = padding
+        self.row_height = row_height
+        self.max_width = 0
+        self.widths = []        # image width of each item
+        self.row_starts = []    # index of the first item of each row
+        self.row_widths = []    # summed item width (with padding) of each row
+        self.row_tops = []      # y offset of each row
+        self.sections = set()   # indexes of items that start a section
+        self.header_height = 0
+        self.height = padding * 2
+
+    def __len__(self):
+        return len(self.widths)
+
+    @property
+    def row_count(self):
+        return len(self.row_starts)
+
+    def set_items(self, widths, max_width, row_height, sections=(), header_height=0):
+        self.widths = list(widths)
+        self.max_width = max_width
+        self.row_height = row_height
+        self.sections = set(sections)
+        self.header_height = header_height
+        del self.row_starts[:]
+        return self.relayout(0)
+
+    def set_max_width(self, max_width):
+        if max_width == self.max_width:
+            return None
+        self.max_width = max_width
+        return self.relayout(0)
+
+    def append(self, widths):
+        first_item = len(self.widths)
+        self.widths.extend(widths)
+        return self.relayout(first_item)
+
+    def remove(self, indexes):
+        indexes = sorted(set(indexes))
+        if not indexes:
+            return None
+        drop = set(indexes)
+        self.widths = [w for i, w in enumerate(self.widths) if i not in drop]
+        return self.relayout(indexes[0])
+
+    def relayout(self, from_item=0):
+        """Recompute row breaks from the row holding ``from_item``; returns that row."""
+        first_row = max(0, self.row_of_index(from_item)) if self.row_starts else 0
+        if first_row < len(self.row_starts):
+            start = self.row_starts[first_row]
+            y = self.row_tops[first_row]
+        else:
+            start = 0
+            y = self.padding + (self.header_height if 0 in self.sections else 0)
+        del self.row_starts[first_row:]
+        del self.row_widths[first_row:]
+        del self.row_tops[first_row:]
+
+        pad2 = self.padding * 2
+        row_start = start
+        row_width = 0
+        for i in range(start, len(self.widths)):
+            item_width = self.widths[i] + pad2
+            if i > row_start and (i in self.sections or row_width + item_width > self.max_width):
+                self._push_row(row_start, row_width, y)
+                y += self.row_height
+                if i in self.sections:
+                    y += self.header_height
+                row_start = i
+                row_width = 0
+            row_width += item_width
+        if row_start < len(self.widths):
+            self._push_row(row_start, row_width, y)
+            y += self.row_height
+        self.height = y + self.padding
+        return first_row
+
+    def _push_row(self, start, width, top):
+        self.row_starts.append(start)
+        self.row_widths.append(width)
+        self.row_tops.append(top)
+
+    def _row_length(self, row):
+        end = self.row_starts[row + 1] if row + 1 < len(self.row_starts) else len(self.widths)
+        return end - self.row_starts[row]
+
+    def row_range(self, row):
+        start = self.row_starts[row]
+        return start, start + self._row_length(row)
+
+    def row_of_index(self, index):
+        return bisect.bisect_right(self.row_starts, index) - 1
+
+    def rows_between(self, y1, y2):
+        first = max(0, bisect.bisect_right(self.row_tops, y1) - 1)
+        last = bisect.bisect_right(self.row_tops, y2)
+        return range(first, min(last, len(self.row_starts)))
+
+    def row_positions(self, row):
+        """Left x offset of every item in ``row``; non-final rows are stretched to full width."""
+        start, end = self.row_range(row)
+        count = end - start
+        if row == len(self.row_starts) - 1 or count <= 1 or end in self.sections:
+            gap = self.padding
+        else:
+            extra = max(0, self.max_width - self.row_widths[row])
+            gap = self.padding + (extra / count)
+        xs = []
+        x = self.padding
+        for i in range(start, end):
+            xs.append(x)
+            x += self.widths[i] + gap
+        return xs
+
+    def index_at(self, x, y):
+        row = bisect.bisect_right(self.row_tops, y) - 1
+        if row < 0 or y > self.row_tops[row] + self.row_height - self.padding:
+            return None
+        xs = self.row_positions(row)
+        col = bisect.bisect_right(xs, x) - 1
+        if col < 0:
+            return None
+        index = self.row_starts[row] + col
+        if x > xs[col] + self.widths[index]:
+            return None
+        return index
+
+
+class ImageBrowser(tk.Toplevel):
+    def __init__(self, parent, image_paths, lang, search_term="", config=None, dark_mode=True,
+                 result_stream=None, groups=None, details=None, search_options=(True, False, False)):
+        super().__init__(parent)
+        self.image_paths = []           # shown paths, in grid order
+        self._all_paths = []            # every result, refined or not
+        self._cells = {}                # path -> cell, kept while it is filtered out
+        self._initial_paths = list(image_paths)
+        self._result_stream = result_stream
+        self._unsubscribe_stream = None
+        self.groups = dict(groups or {})    # path -> duplicate group number
+        self.details = details if details is not None else ResultDetails()    # what the search captured
+        self.search_options = search_options    # (search_positive, search_negative, case_sensitive)
+        self._refine_term = ""
+        self._refine_job = None
+        self._sort_key = 'order'
+        self._sections = {}         # first item index -> group label
+        self._view_job = None
+        self._details_panel = None  # built the first time it is shown
+        self._details_path = None
+        self.lang = lang
+        self.search_term = (search_term or "").strip()
+        self._config = config
+        self._dark_mode = dark_mode
+        self.selected = set()
+        self.thumbnail_cache = {}
+        self.photo_cache = {}
+        saved_size = 700
+        if config:
+            try:
+                saved_size = int(config.get("Interface", "browser_thumbnail_size", "700"))
+                saved_size = max(80, min(1200, saved_size))
+            except (ValueError, TypeError):
+                saved_size = 700
+        self.thumbnail_size = saved_size
+        self.cell_data = []
+        self._scale_job = None
+        self._place_job = None
+        self._mousewheel_bound = False
+        self._mmb_origin_y = None
+        self._mmb_current_y = None
+        self._mmb_active = False
+        self._rounded_mask_cache = {}
+        self._padding = 1
+        self._label_height = 18
+        self._layout = JustifiedRowLayout(self._padding, self._row_height())
+        self._placed_rows = {}      # row -> cells currently shown on the canvas
+        self._placed_headers = {}   # row -> section header text item above it
+        self._header_height = 26
+        self._spinner_angle = 0
+        self._spinner_job = None
+        self._spinner_arc = None
+        self._spinner_text = None
+        self._pending_paths = []
+        self._load_lock = Lock()
+        self._loader_running = False
+        self._load_batch = 32
+        self._stream_generation = 0     # bumped when the browser switches to a new result stream
+
+        self.configure(bg=_DARK['bg'])
+
+        try:
+            self.iconbitmap(resource_path('app_icon.ico'))
+        except Exception:
+            pass
+
+        self.geometry("1200x820")
+        self._setup_ui()
+        self.scale_var.set(saved_size)
+        self._update_status()
+        self.after(0, self._maximize_window)
+        self._start_loading()
+        self.protocol("WM_DELETE_WINDOW", self._on_close)
+
+    def _maximize_window(self):
+        try:
+            if sys.platform == 'win32':
+                from ctypes import wintypes
+                rc = wintypes.RECT()
+                # SPI_GETWORKAREA: screen area minus taskbar
+                ctypes.windll.user32.SystemParametersInfoW(0x0030, 0, ctypes.byref(rc), 0)
+                self.geometry(f"{rc.right - rc.left}x{rc.bottom - rc.top}+{rc.left}+{rc.top}")
+            else:
+                self.state('zoomed')
+        except Exception:
+            try:
+                self.state('zoomed')
+            except Exception:
+                pass
+
+    def _on_close(self):
+        if self._unsubscribe_stream:
+            self._unsubscribe_stream()
+            self._unsubscribe_stream = None
+        if self._config:
+            self._config.set("Interface", "browser_thumbnail_size", str(self.thumbnail_size))
+            self._config.set("Interface", "browser_details_panel", str(self.details_var.get()))
+            self._config.save_config()
+        self.destroy()
+
+    def _setup_ui(self):
+        top = ttk.Frame(self, padding=(4, 4, 4, 4))
+        top.pack(fill=tk.X)
+        top.columnconfigure(0, weight=1)
+
+        self.scale_var = tk.IntVar(value=700)
+        self.scale_widget = ModernSlider(
+            top,
+            from_=80,
+            to=1200,
+            resolution=10,
+            variable=self.scale_var,
+            command=self._on_scale_change,
+            dark_mode=self._dark_mode,
+        )
+        self.scale_widget.grid(row=0, column=0, sticky='ew', padx=(4, 4), pady=2)
+
+        ttk.Label(top, text=self.lang.get_string("image_browser.refine_label")).grid(
+            row=0, column=1, sticky='e', padx=(12, 4))
+        self.refine_var = tk.StringVar()
+        self.refine_entry = ttk.Entry(top, textvariable=self.refine_var, width=40)
+        self.refine_entry.grid(row=0, column=2, sticky='e', padx=(0, 4), pady=2)
+        self.refine_var.trace_add('write', lambda *args: self._on_refine_changed())
+        self.refine_entry.bind('<Return>', lambda e: self._apply_refine())
+
+        ttk.Label(top, text=self.lang.get_string("image_browser.sort_label")).grid(
+            row=0, column=3, sticky='e', padx=(12, 4))
+        self.sort_combo = ttk.Combobox(top, state='readonly', width=16,
+                                       values=[self._sort_name(key) for key in SORT_KEYS])
+        self.sort_combo.current(0)
+        self.sort_combo.grid(row=0, column=4, sticky='e', pady=2)
+        self.sort_combo.bind('<<ComboboxSelected>>', self._on_sort_changed)
+        self.sort_desc_var = tk.BooleanVar(value=False)
+        ttk.Checkbutton(top, text=self.lang.get_string("image_browser.sort_descending"),
+                        variable=self.sort_desc_var, command=self._on_sort_changed).grid(
+            row=0, column=5, sticky='e', padx=(8, 0))
+        self.group_var = tk.BooleanVar(value=False)
+        ttk.Checkbutton(top, text=self.lang.get_string("image_browser.sort_group"),
+                        variable=self.group_var, command=self._on_sort_changed).grid(
+            row=0, column=6, sticky='e', padx=(8, 4))
+        show_details = self._config.get_bool("Interface", "browser_details_panel", False) if self._config else False
+        self.details_var = tk.BooleanVar(value=show_details)
+        ttk.Checkbutton(top, text=self.lang.get_string("image_browser.details_toggle"),
+                        variable=self.details_var, command=self._toggle_details).grid(
+            row=0, column=7, sticky='e', padx=(8, 4))
+
+        ttk.Separator(self, orient=tk.HORIZONTAL).pack(fill=tk.X)
+
+        container = ttk.Frame(self)
+        container.pack(fill=tk.BOTH, expand=True)
+        self._container = container
+
+        self.canvas = tk.Canvas(container, bg='#18192a', highlightthickness=0)
+        self.v_scroll = ttk.Scrollbar(container, orient=tk.VERTICAL, command=self.canvas.yview)
+        self.canvas.configure(yscrollcommand=self._on_yview)
+        self.v_scroll.pack(side=tk.RIGHT, fill=tk.Y)
+        self.canvas.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+
+        self.canvas.bind('<Configure>', self._on_canvas_resize)
+        self.canvas.bind('<Enter>', self._bind_mousewheel)
+        self.canvas.bind('<Leave>', self._unbind_mousewheel)
+        self.canvas.bind('<ButtonPress-2>', self._start_mmb_scroll)
+        self.canvas.bind('<B2-Motion>', self._on_mmb_scroll)
+        self.canvas.bind('<ButtonRelease-2>', self._end_mmb_scroll)
+        self.canvas.bind('<Button-1>', lambda e: self._on_canvas_event(e, self._on_click))
+        self.canvas.bind('<Double-Button-1>',
+                         lambda e: self._on_canvas_event(e, lambda ev, i: self._on_double_click(i)))
+        self.canvas.bind('<Button-3>', lambda e: self._on_canvas_event(e, self._on_right_click))
+        self.bind('<Escape>', lambda e: self.destroy())
+        self.bind('<Prior>', lambda e: self.canvas.yview_scroll(-1, 'pages'))
+        self.bind('<Next>', lambda e: self.canvas.yview_scroll(1, 'pages'))
+        self.bind('<Home>', lambda e: self._scroll_to_index(0))
+        self.bind('<End>', lambda e: self._scroll_to_index(len(self.cell_data) - 1))
+        if self.details_var.get():
+            self._toggle_details()
+
+    def _bind_mousewheel(self, event=None):
+        if self._mousewheel_bound:
+            return
+        self.bind_all('<MouseWheel>', self._on_mousewheel)
+        self._mousewheel_bound = True
+
+    def _unbind_mousewheel(self, event=None):
+        current = self.winfo_containing(self.winfo_pointerx(), self.winfo_pointery())
+        if current and str(current).startswith(str(self)):
+            return
+        if not self._mousewheel_bound:
+            return
+        self.unbind_all('<MouseWheel>')
+        self._mousewheel_bound = False
+
+    def _on_mousewheel(self, event):
+        try:
+            if event.widget.winfo_toplevel() is not self:
+                return
+        except Exception:
+            return
+        if event.state & 0x4:
+            direction = 1 if event.delta > 0 else -1
+            current = int(self.scale_var.get())
+            new_value = max(80, min(1200, current + direction * 10))
+            self.scale_var.set(new_value)
+            self._apply_scale_change()
+            return
+        self.canvas.yview_scroll(int(-1 * (event.delta / 120)), 'units')
+
+    def _on_canvas_resize(self, event=None):
+        self._layout_cells()
+
+    def _on_yview(self, first, last):
+        self.v_scroll.set(first, last)
+        self._schedule_place()
+
+    def _on_canvas_event(self, event, handler):
+        idx = self._layout.index_at(self.canvas.canvasx(event.x), self.canvas.canvasy(event.y))
+        if idx is not None and idx < len(self.cell_data):
+            handler(event, idx)
+
+    def _scroll_to_index(self, idx):
+        if not self.cell_data or idx < 0:
+            return
+        row = self._layout.row_of_index(min(idx, len(self.cell_data) - 1))
+        top = self._layout.row_tops[row]
+        bottom = top + self._layout.row_height
+        view_top = self.canvas.canvasy(0)
+        view_bottom = view_top + self.canvas.winfo_height()
+        if top < view_top:
+            self.canvas.yview_moveto(top / max(1, self._layout.height))
+        elif bottom > view_bottom:
+            target = bottom - self.canvas.winfo_height()
+            self.canvas.yview_moveto(max(0, target) / max(1, self._layout.height))
+
+    def _on_scale_change(self, value):
+        if self._scale_job is not None:
+            self.after_cancel(self._scale_job)
+        self._scale_job = self.after(60, self._apply_scale_change)
+
+    def _apply_scale_change(self, event=None):
+        if self._scale_job is not None:
+            self.after_cancel(self._scale_job)
+            self._scale_job = None
+        size = int(self.scale_var.get())
+        if size == self.thumbnail_size:
+            return
+        # Keep the first row in view where it lands at the new size
+        top = self.canvas.canvasy(0)
+        rows = self._layout.rows_between(top, top) if self.cell_data else range(0)
+        top_index = self._layout.row_range(rows[0])[0] if len(rows) else None
+        self.thumbnail_size = size
+        self.photo_cache.clear()
+        # Only the geometry changes here; photos and fonts follow when a cell is placed again
+        for cell in self._cells.values():
+            cell['img_w'], cell['img_h'], cell['img_radius'] = self._cell_geometry(cell['path'])
+            cell['photo'] = None
+            cell['size'] = None
+        self._layout.set_items([cell['img_w'] for cell in self.cell_data], self._available_width(),
+                               self._row_height(), self._sections, self._header_height)
+        self._refresh_layout()
+        if top_index is not None:
+            row = self._layout.row_of_index(top_index)
+            self.canvas.yview_moveto(self._layout.row_tops[row] / max(1, self._layout.height))
+            self._place_visible_rows()
+
+    def _start_mmb_scroll(self, event):
+        self._mmb_origin_y = event.y_root
+        self._mmb_current_y = event.y_root
+        self._mmb_active = True
+        self.canvas.config(cursor='sb_v_double_arrow')
+        self._mmb_tick()
+
+    def _on_mmb_scroll(self, event):
+        if self._mmb_active:
+            self._mmb_current_y = event.y_root
+
+    def _end_mmb_scroll(self, event):
+        self._mmb_active = False
+        self._mmb_origin_y = None
+        self.canvas.config(cursor='')
+
+    def _mmb_tick(self):
+        if not self._mmb_active:
+            return
+        dy = self._mmb_current_y - self._mmb_origin_y
+        dead = 8
+        if abs(dy) > dead:
+            direction = 1 if dy > 0 else -1
+            distance = abs(dy) - dead
+            # Power curve: smooth ramp-up, max 84 px/tick (~5040 px/sec at 60fps)
+            px = min(math.pow(distance / 80.0, 1.7) * 84.0, 84.0) * direction
+            total_h = max(1, self._layout.height)
+            self.canvas.yview_moveto(
+                max(0.0, min(1.0, self.canvas.yview()[0] + px / total_h))
+            )
+        self.after(16, self._mmb_tick)
+
+    def _start_loading(self):
+        self.after(20, self._show_spinner)
+        if self._initial_paths:
+            self._enqueue_paths(self._initial_paths)
+        if self._result_stream is not None:
+            self._unsubscribe_stream = self._result_stream.subscribe(
+                self._enqueue_paths, self._on_stream_closed)
+        elif not self._initial_paths:
+            self.after(0, self._build_cells)
+
+    def _show_spinner(self):
+        streaming = self._result_stream is not None and not self._result_stream.closed
+        if self.cell_data or not (self._loader_running or streaming):
+            return
+        self._spinner_r = 42  # radius (32 * 1.3 ≈ 42)
+        self._spinner_arc = self.canvas.create_arc(
+            0, 0, 1, 1,  # positioned each frame in _animate_spinner
+            start=0, extent=280, outline='#4a6eff', style='arc', width=4,
+        )
+        self._spinner_text = self.canvas.create_text(
+            0, 0, text="Loading…", fill='#8890b8', font=('Segoe UI', 11),
+        )
+        self._animate_spinner()
+
+    def _animate_spinner(self):
+        if self._spinner_arc is None:
+            return
+        try:
+            cw = self.canvas.winfo_width() or 800
+            ch = self.canvas.winfo_height() or 600
+            cx, cy = cw // 2, ch // 2
+            r = self._spinner_r
+            self.canvas.coords(self._spinner_arc, cx - r, cy - r, cx + r, cy + r)
+            self.canvas.coords(self._spinner_text, cx, cy + r + 24)
+            self._spinner_angle = (self._spinner_angle + 9) % 360
+            self.canvas.itemconfig(self._spinner_arc, start=self._spinner_angle)
+            self._spinner_job = self.after(28, self._animate_spinner)
+        except Exception:
+            pass
+
+    def _hide_spinner(self):
+        if self._spinner_job is not None:
+            try:
+                self.after_cancel(self._spinner_job)
+            except Exception:
+                pass
+            self._spinner_job = None
+        for attr in ('_spinner_arc', '_spinner_text'):
+            item = getattr(self, attr, None)
+            if item is not None:
+                try:
+                    self.canvas.delete(item)
+                except Exception:
+                    pass
+                setattr(self, attr, None)
+
+    def _enqueue_paths(self, paths):
+        # Called from the search thread for streamed results; no Tk calls here.
+        with self._load_lock:
+            self._pending_paths.extend(paths)
+            if self._loader_running:
+                return
+            self._loader_running = True
+        threading.Thread(target=self._load_pending, daemon=True).start()
+
+    def _load_pending(self):
+        while True:
+            with self._load_lock:
+                batch = self._pending_paths[:self._load_batch]
+                del self._pending_paths[:self._load_batch]
+                generation = self._stream_generation
+                if not batch:
+                    self._loader_running = False
+                    return
+            for path in batch:
+                if path in self.thumbnail_cache:
+                    continue
+                try:
+                    img = Image.open(path)
+                    img.load()
+                    self.thumbnail_cache[path] = img.convert('RGBA')
+                except Exception:
+                    self.thumbnail_cache[path] = None
+            try:
+                self.after(0, self._append_cells, batch, generation)
+            except (RuntimeError, tk.TclError):
+                return
+
+    def follow_stream(self, result_stream, search_term=None, details=None, search_options=None):
+        """Replace the shown results with those of ``result_stream`` (live search).
+
+        ``search_options`` are the (search_positive, search_negative,
+        case_sensitive) of the new search, which refine and highlighting
+        follow. Thumbnails stay cached, so images that match again reappear
+        without being decoded a second time.
+        """
+        if self._unsubscribe_stream:
+            self._unsubscribe_stream()
+            self._unsubscribe_stream = None
+        with self._load_lock:
+            self._pending_paths = []
+            self._stream_generation += 1
+        if search_term is not None:
+            self.search_term = search_term.strip()
+        if details is not None:
+            self.details = details
+        if search_options is not None:
+            self.search_options = tuple(search_options)
+        self._details_path = None   # re-highlight for the new search
+        self.image_paths = []
+        self._all_paths = []
+        self.selected = set()
+        self.groups = {}
+        self._build_cells()
+        self._result_stream = result_stream
+        self._unsubscribe_stream = result_stream.subscribe(self._enqueue_paths, self._on_stream_closed)
+        self._show_spinner()
+
+    def _on_stream_closed(self):
+        try:
+            self.after(0, self._finish_stream)
+        except (RuntimeError, tk.TclError):
+            pass
+
+    def _finish_stream(self):
+        if self._result_stream is not None and not self._result_stream.closed:
+            return  # a stream this browser no longer follows
+        self._unsubscribe_stream = None
+        if not self._loader_running and not self.cell_data:
+            self._hide_spinner()
+
+    def _get_photo(self, path):
+        size = max(32, self.thumbnail_size)
+        key = (path, size)
+        if key in self.photo_cache:
+            return self.photo_cache[key]
+        src = self.thumbnail_cache.get(path)
+        if src is None:
+            return None
+        scale = size / src.height
+        target_w = max(1, int(src.width * scale))
+        target_h = size
+        img = src.resize((target_w, target_h), Image.LANCZOS)
+        radius = max(8, min(18, target_h // 10))
+        mask_key = (target_w, target_h, radius)
+        mask = self._rounded_mask_cache.get(mask_key)
+        if mask is None:
+            from PIL import ImageDraw
+            mask = Image.new('L', (target_w, target_h), 0)
+            ImageDraw.Draw(mask).rounded_rectangle((0, 0, target_w, target_h), radius=radius, fill=255)
+            self._rounded_mask_cache[mask_key] = mask
+        rounded = Image.new('RGBA', (target_w, target_h), (0, 0, 0, 0))
+        rounded.paste(img, (0, 0), mask)
+        photo = ImageTk.PhotoImage(rounded)
+        result = (photo, target_w, target_h, radius)
+        self.photo_cache[key] = result
+        return result
+
+    def _truncate_filename(self, path, max_chars):
+        name = os.path.basename(path)
+        if len(name) <= max_chars:
+            return name
+        return name[:max(1, max_chars - 1)] + "…"
+
+    def _cell_label(self, path, max_chars):
+        group = self.groups.get(path)
+        if group is None:
+            return self._truncate_filename(path, max_chars)
+        prefix = f"#{group}  "
+        return prefix + self._truncate_filename(path, max(1, max_chars - len(prefix)))
+
+    def _build_cells(self):
+        self._hide_spinner()
+        self.canvas.delete("all")
+        self.cell_data = []
+        self._cells = {}
+        self._placed_rows = {}
+        self._placed_headers = {}
+        self._apply_view()
+
+    def _cell_for(self, idx, path):
+        """The cell of ``path`` at grid position ``idx``, created on first use."""
+        cell = self._cells.get(path)
+        if cell is None:
+            cell = self._cells[path] = self._create_cell(idx, path)
+        cell['idx'] = idx
+        return cell
+
+    def _font_size(self):
+        return max(9, min(13, self.thumbnail_size // 18))
+
+    def _cell_geometry(self, path):
+        """(width, height, corner radius) of the thumbnail of ``path`` at the current size."""
+        height = max(32, self.thumbnail_size)
+        src = self.thumbnail_cache.get(path)
+        if src is None:
+            width = max(40, int(self.thumbnail_size * 0.7))
+        else:
+            width = max(1, int(src.width * (height / src.height)))  # as _get_photo scales it
+        return width, height, max(8, min(18, height // 10))
+
+    def _create_cell(self, idx, path):
+        """Hidden canvas items for ``path``; the photo is made when the cell is first placed."""
+        width, height, img_radius = self._cell_geometry(path)
+        bg_id = self.canvas.create_rectangle(0, 0, 0, 0, fill='#18192a', outline='', width=0,
+                                             state='hidden')
+        if self.thumbnail_cache.get(path) is not None:
+            image_id = self.canvas.create_image(0, 0, anchor=tk.NW, state='hidden')
+        else:
+            image_id = self.canvas.create_rectangle(0, 0, width, height, fill='#2a2b40', outline='',
+                                                    state='hidden')
+        sel_id = self.canvas.create_polygon(
+            [0, 0, 1, 0, 1, 1, 0, 1], smooth=True, fill='', outline='', width=4, state='hidden'
+        )
+        text_id = self.canvas.create_text(
+            0, 0, anchor=tk.NW, text="", fill='#ccccdd', font=('Segoe UI', self._font_size()), state='hidden'
+        )
+        return {
+            'bg': bg_id,
+            'image': image_id,
+            'sel': sel_id,
+            'text': text_id,
+            'path': path,
+            'idx': idx,
+            'photo': None,
+            'size': None,       # thumbnail size the photo was made for
+            'font_size': self._font_size(),
+            'img_w': width,
+            'img_h': height,
+            'img_radius': img_radius,
+            'label_chars': None,
+        }
+
+    def _refresh_cell(self, cell):
+        """Give a cell the photo and font of the current thumbnail size."""
+        photo_info = self._get_photo(cell['path'])
+        if photo_info:
+            cell['photo'] = photo_info[0]
+            self.canvas.itemconfig(cell['image'], image=cell['photo'])
+        font_size = self._font_size()
+        if cell['font_size'] != font_size:
+            cell['font_size'] = font_size
+            self.canvas.itemconfig(cell['text'], font=('Segoe UI', font_size))
+        cell['size'] = self.thumbnail_size
+
+    def _row_height(self):
+        return self.thumbnail_size + self._label_height + (self._padding * 3)
+
+    def _available_width(self):
+        return max(120, self.canvas.winfo_width() - 8)
+
+    def _append_cells(self, paths, generation=None):
+        """Add freshly loaded thumbnails without re-placing rows that are already laid out."""
+        if generation is not None and generation != self._stream_generation:
+            return
+        self._hide_spinner()
+        self._all_paths.extend(paths)
+        if not self._in_search_order():
+            self._schedule_view()
+            return
+        paths = self._refined(paths)
+        start = len(self.cell_data)
+        cells = [self._cell_for(start + i, path) for i, path in enumerate(paths)]
+        self.image_paths.extend(paths)
+        self.cell_data.extend(cells)
+        if self._layout.set_max_width(self._available_width()) is not None:
+            self._layout.append([cell['img_w'] for cell in cells])
+            first_row = 0
+        else:
+            first_row = self._layout.append([cell['img_w'] for cell in cells])
+        self._refresh_layout(first_row)
+        self._update_status()
+
+    # ── Refine / sort ─────────────────────────────────────────────────────
+
+    def _refined(self, paths):
+        """The part of ``paths`` whose search metadata matches the refine term."""
+        if not self._refine_term:
+            return list(paths)
+        search_positive, search_negative, case_sensitive = self.search_options
+        memo = PromptMemo()
+        metadata = self.details.metadata
+        return [path for path in paths if path in metadata and memo.verdict(
+            metadata[path], self._refine_term, search_positive, search_negative, case_sensitive, None)]
+
+    def _on_refine_changed(self):
+        if self._refine_job is not None:
+            self.after_cancel(self._refine_job)
+        self._refine_job = self.after(200, self._apply_refine)
+
+    def _apply_refine(self):
+        """Show the results matching the refine term, reusing the cells already created."""
+        if self._refine_job is not None:
+            self.after_cancel(self._refine_job)
+            self._refine_job = None
+        term, _ = validate_search_term(self.refine_var.get())
+        if term == self._refine_term:
+            return
+        self._refine_term = term
+        self._details_path = None   # re-highlight for the new term
+        self._apply_view(scroll_top=True)
+
+    def _sort_name(self, key):
+        return self.lang.get_string(f"image_browser.sort_{key}")
+
+    def _in_search_order(self):
+        return self._sort_key == 'order' and not self.sort_desc_var.get()
+
+    def _on_sort_changed(self, event=None):
+        self._sort_key = SORT_KEYS[max(0, self.sort_combo.current())]
+        self._apply_view(scroll_top=True)
+
+    def _schedule_view(self):
+        # Streamed batches arrive often; re-sort at most every 150 ms
+        if self._view_job is None:
+            self._view_job = self.after(150, self._apply_view)
+
+    def _apply_view(self, scroll_top=False):
+        """Lay out the refined results in the chosen order, reusing the cells already created."""
+        if self._view_job is not None:
+            self.after_cancel(self._view_job)
+            self._view_job = None
+        selected = {self.image_paths[idx] for idx in self.selected if idx < len(self.image_paths)}
+        self.image_paths, sections = order_results(self._refined(self._all_paths), self._sort_key, self.details,
+                                                   self.sort_desc_var.get(), self.group_var.get())
+        self._sections = dict(sections)
+        self.cell_data = [self._cell_for(idx, path) for idx, path in enumerate(self.image_paths)]
+        self.selected = {cell['idx'] for cell in self.cell_data if cell['path'] in selected}
+        self._layout.set_items([cell['img_w'] for cell in self.cell_data], self._available_width(),
+                               self._row_height(), self._sections, self._header_height)
+        self._refresh_layout()
+        if scroll_top:
+            self.canvas.yview_moveto(0)
+        self._refresh_highlights()
+        self._update_status()
+
+    def _layout_cells(self):
+        if self._layout.set_max_width(self._available_width()) is not None:
+            self._refresh_layout()
+        else:
+            self._place_visible_rows()
+
+    def _refresh_layout(self, first_row=0):
+        """Drop placements from ``first_row`` on and re-place whatever is in view."""
+        for row in [r for r in self._placed_rows if r >= first_row]:
+            for cell in self._placed_rows.pop(row):
+                for key in ('bg', 'image', 'sel', 'text'):
+                    self.canvas.itemconfigure(cell[key], state='hidden')
+        for row in [r for r in self._placed_headers if r >= first_row]:
+            self.canvas.delete(self._placed_headers.pop(row))
+        width = max(self._layout.max_width, self.canvas.winfo_width())
+        height = max(self._layout.height, self.canvas.winfo_height())
+        self.canvas.configure(scrollregion=(0, 0, width, height))
+        self._place_visible_rows()
+
+    def _schedule_place(self):
+        if self._place_job is None:
+            self._place_job = self.after_idle(self._place_visible_rows)
+
+    def _place_visible_rows(self):
+        self._place_job = None
+        if not self.cell_data:
+            return
+        view_h = max(1, self.canvas.winfo_height())
+        top = self.canvas.canvasy(0)
+        for row in self._layout.rows_between(top - view_h, top + view_h * 2):
+            if row not in self._placed_rows:
+                self._place_row(row)
+
+    def _sel_polygon_pts(self, x1, y1, x2, y2, r):
+        return [
+            x1+r, y1, x2-r, y1,
+            x2, y1, x2, y1+r,
+            x2, y2-r, x2, y2,
+            x2-r, y2, x1+r, y2,
+            x1, y2, x1, y2-r,
+            x1, y1+r, x1, y1,
+        ]
+
+    def _place_row(self, row):
+        start, end = self._layout.row_range(row)
+        y = self._layout.row_tops[row]
+        cells = self.cell_data[start:end]
+        for cell, x in zip(cells, self._layout.row_positions(row)):
+            if cell['size'] != self.thumbnail_size:
+                self._refresh_cell(cell)
+            img_w = cell['img_w']
+            img_h = cell['img_h']
+            self.canvas.coords(cell['bg'], x - 1, y - 1, x + img_w + 1, y + img_h + self._label_height + 1)
+            if cell['photo'] is not None:
+                self.canvas.coords(cell['image'], x, y)
+            else:
+                self.canvas.coords(cell['image'], x, y, x + img_w, y + img_h)
+            # B-spline smooth=True renders corners at ~70% of the r vertex distance.
+            # Multiply the PIL radius by 1/0.7 ≈ 1.43, then add 20% extra rounding.
+            img_r = cell.get('img_radius', max(8, min(18, img_h // 10)))
+            r = int(img_r * 2.471) + 2
+            pts = self._sel_polygon_pts(x - 2, y - 2, x + img_w + 2, y + img_h + 2, r)
+            self.canvas.coords(cell['sel'], *pts)
+            max_chars = max(10, img_w // 9)
+            if cell['label_chars'] != max_chars:
+                cell['label_chars'] = max_chars
+                self.canvas.itemconfig(cell['text'], text=self._cell_label(cell['path'], max_chars))
+            self.canvas.coords(cell['text'], x, y + img_h + 1)
+            for key in ('bg', 'image', 'sel', 'text'):
+                self.canvas.itemconfigure(cell[key], state='normal')
+        self._placed_rows[row] = cells
+        if start in self._sections:
+            self._place_header(row, start, y)
+
+    def _place_header(self, row, start, row_top):
+        label = self._sections[start]
+        if label is None:
+            label = self.lang.get_string("image_browser.sort_missing")
+        self._placed_headers[row] = self.canvas.create_text(
+            self._padding + 6, row_top - self._header_height // 2, anchor=tk.W,
+            text=f"{self._sort_name(self._sort_key)}: {label}", fill='#8890b8',
+            font=('Segoe UI', 11, 'bold'))
+
+    def _on_click(self, event, idx):
+        ctrl = bool(event.state & 0x4)
+        if ctrl:
+            if idx in self.selected:
+                self.selected.discard(idx)
+            else:
+                self.selected.add(idx)
+        else:
+            self.selected = {idx}
+        self._refresh_highlights()
+        self._update_status()
+
+    def _refresh_highlights(self):
+        for cell in self.cell_data:
+            if cell['idx'] in self.selected:
+                self.canvas.itemconfig(cell['sel'], outline='#ffffff', width=4)
+            else:
+                self.canvas.itemconfig(cell['sel'], outline='', width=0)
+        self._show_details()
+
+    def _update_status(self):
+        total = len(self.image_paths)
+        sel = len(self.selected)
+        count_str = f"{total} image{'s' if total != 1 else ''}"
+        if self._refine_term:
+            count_str = self.lang.get_string("image_browser.refine_status").format(total, len(self._all_paths))
+        sel_str = f" - {sel} selected" if sel else ""
+        if self.groups:
+            groups = len(set(self.groups.get(path) for path in self.image_paths) - {None})
+            count_str += " - " + self.lang.get_string("image_browser.group_status").format(groups)
+        term_str = f" - {self.search_term}" if self.search_term else ""
+        self.title(f"Metadata Image Search{term_str} - {count_str}{sel_str}")
+
+    # ── Details panel ─────────────────────────────────────────────────────
+
+    def _toggle_details(self):
+        if not self.details_var.get():
+            if self._details_panel is not None:
+                self._details_panel.pack_forget()
+            return
+        if self._details_panel is None:
+            self._build_details_panel()
+        self._details_panel.pack(side=tk.RIGHT, fill=tk.Y, before=self.v_scroll)
+        self._details_path = None
+        self._show_details()
+
+    def _build_details_panel(self):
+        d = _DARK
+        bg, fg = (d['bg2'], d['fg']) if self._dark_mode else ('white', 'black')
+        panel = ttk.Frame(self._container)
+        text = tk.Text(panel, width=46, wrap=tk.WORD, bg=bg, fg=fg, relief='flat', borderwidth=0,
+                       padx=8, pady=6, font=('Segoe UI', 10), cursor='arrow')
+        scroll = ttk.Scrollbar(panel, orient=tk.VERTICAL, command=text.yview)
+        text.configure(yscrollcommand=scroll.set)
+        scroll.pack(side=tk.RIGHT, fill=tk.Y)
+        text.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+        muted = d['fg2'] if self._dark_mode else '#555577'
+        text.tag_configure('key', font=('Segoe UI', 10, 'bold'), foreground=muted, spacing1=6)
+        text.tag_configure('hit', background='#6b5a00' if self._dark_mode else '#fff0a0')
+        text.tag_configure('note', foreground=muted)
+        # Read-only, but still selectable for copying
+        text.bind('<Key>', lambda e: None if e.state & 0x4 else 'break')
+        self._details_panel = panel
+        self._details_text = text
+
+    def _show_details(self):
+        """Show the selected image's metadata as the search captured it; nothing is read from disk."""
+        if self._details_panel is None or not self.details_var.get():
+            return
+        path = self.image_paths[next(iter(self.selected))] if len(self.selected) == 1 else None
+        if path == self._details_path:
+            return
+        self._details_path = path
+        text = self._details_text
+        text.delete('1.0', tk.END)
+        if path is None:
+            text.insert(tk.END, self.lang.get_string("image_browser.details_no_selection"), 'note')
+            return
+
+        text.insert(tk.END, self.lang.get_string("image_browser.details_file") + "\n", 'key')
+        text.insert(tk.END, path + "\n")
+        stat = self.details.stats.get(path)
+        if stat is not None:
+            size, mtime_ns = stat
+            text.insert(tk.END, self.lang.get_string("image_browser.details_size") + "\n", 'key')
+            text.insert(tk.END, f"{int(size) / (1024 * 1024):.2f} MB\n")
+            text.insert(tk.END, self.lang.get_string("image_browser.details_modified") + "\n", 'key')
+            text.insert(tk.END, datetime.fromtimestamp(int(mtime_ns) / 1e9).strftime("%Y-%m-%d %H:%M:%S") + "\n")
+        match = self.details.matches.get(path)
+        if match is not None and match[1]:
+            text.insert(tk.END, self.lang.get_string("image_browser.details_match") + "\n", 'key')
+            text.insert(tk.END, f"{match[1]}\n")
+
+        metadata = self.details.metadata.get(path)
+        if not metadata:
+            text.insert(tk.END, "\n" + self.lang.get_string("image_browser.details_no_metadata"), 'note')
+            return
+        search_positive, search_negative, case_sensitive = self.search_options
+        spans = highlight_spans(metadata, (self.search_term, self._refine_term),
+                                search_positive, search_negative, case_sensitive)
+        keys = [key for key in ('Positive', 'Negative') if key in metadata]
+        keys += [key for key in metadata if key not in ('Positive', 'Negative')]
+        for key in keys:
+            value = str(metadata[key])
+            text.insert(tk.END, key + "\n", 'key')
+            position = 0
+            for start, end in spans.get(key, ()):
+                if start < position:
+                    start = position    # overlapping hits
+                if end <= start:
+                    continue
+                text.insert(tk.END, value[position:start])
+                text.insert(tk.END, value[start:end], 'hit')
+                position = end
+            text.insert(tk.END, value[position:] + "\n")
+
+    def _on_double_click(self, idx):
+        ImagePreview(self, self.image_paths[idx], self.lang, dark_mode=self._dark_mode)
+
+    def _on_right_click(self, event, idx):
+        if len(self.selected) <= 1:
+            self.selected = {idx}
+            self._refresh_highlights()
+            self._update_status()
+
+        paths = [self.image_paths[i] for i in sorted(self.selected)]
+        multi = len(paths) > 1
+        lang = self.lang
+
+        menu = tk.Menu(self, tearoff=0)
+        style_menu(menu, dark=self._dark_mode)
+
+        if not multi:
+            menu.add_command(
+                label=lang.get_string("image_browser.menu_open_preview"),
+                command=lambda: ImagePreview(self, paths[0], self.lang, dark_mode=self._dark_mode))
+            menu.add_command(
+                label=lang.get_string("image_browser.menu_open_default"),
+                command=lambda: os.startfile(paths[0]))
+            menu.add_command(
+                label=lang.get_string("image_browser.menu_open_folder"),
+                command=lambda: os.startfile(os.path.dirname(paths[0])))
+            menu.add_separator()
+            menu.add_command(
+                label=lang.get_string("image_browser.menu_copy_path"),
+                command=lambda: self._copy_text(paths[0]))
+        else:
+            n_prev = min(len(paths), 5)
+            menu.add_command(
+                label=lang.get_string("image_browser.menu_preview_n").format(n_prev),
+                command=lambda: [ImagePreview(self, p, self.lang, dark_mode=self._dark_mode) for p in paths[:5]])
+            menu.add_command(
+                label=lang.get_string("image_browser.menu_open_folder"),
+                command=lambda: os.startfile(os.path.dirname(paths[0])))
+            menu.add_separator()
+            menu.add_command(
+                label=lang.get_string("image_browser.menu_copy_paths"),
+                command=lambda: self._copy_text('\n'.join(paths)))
+
+        group = self.groups.get(self.image_paths[idx])
+        if group is not None:
+            menu.add_command(
+                label=lang.get_string("image_browser.menu_select_group"),
+                command=lambda: self._select_group(group))
+
+        menu.add_command(
+            label=lang.get_string("image_browser.menu_copy_files"),
+            command=lambda: self._copy_files_to_clipboard(paths))
+        menu.add_separator()
+        del_label = (
+            lang.get_string("image_browser.menu_delete_many").format(len(paths))
+            if multi else
+            lang.get_string("image_browser.menu_delete_one")
+        )
+        menu.add_command(label=del_label, foreground='#ff6060',
+                         command=lambda: self._delete_images(paths))
+
+        menu.tk_popup(event.x_root, event.y_root)
+
+    def _select_group(self, group):
+        self.selected = {i for i, path in enumerate(self.image_paths) if self.groups.get(path) == group}
+        self._refresh_highlights()
+        self._update_status()
+
+    def _copy_text(self, text):
+        self.clipboard_clear()
+        self.clipboard_append(text)
+
+    def _copy_files_to_clipboard(self, paths):
+        try:
+            CF_HDROP = 15
+            GHND = 0x0042
+            file_list = '\0'.join(paths) + '\0\0'
+            file_bytes = file_list.encode('utf-16-le')
+            dropfiles = struct.pack('<IIIII', 20, 0, 0, 0, 1)
+            data = dropfiles + file_bytes
+            h = ctypes.windll.kernel32.GlobalAlloc(GHND, len(data))
+            p = ctypes.windll.kernel32.GlobalLock(h)
+            ctypes.memmove(p, data, len(data))
+            ctypes.windll.kernel32.GlobalUnlock(h)
+            ctypes.windll.user32.OpenClipboard(0)
+            ctypes.windll.user32.EmptyClipboard()
+            ctypes.windll.user32.SetClipboardData(CF_HDROP, h)
+            ctypes.windll.user32.CloseClipboard()
+        except Exception:
+            self._copy_text('\n'.join(paths))
+
+    def _delete_images(self, paths):
+        n = len(paths)
+        msg_key = "image_browser.confirm_delete_one" if n == 1 else "image_browser.confirm_delete_many"
+        msg = self.lang.get_string(msg_key).format(n)
+        if not messagebox.askyesno(
+                self.lang.get_string("image_browser.confirm_delete_title"),
+                msg,
+                parent=self):
+            return
+        for path in paths:
+            try:
+                os.remove(path)
+            except Exception as e:
+                messagebox.showerror(
+                    self.lang.get_string("image_browser.delete_error_title"),
+                    self.lang.get_string("image_browser.delete_error_message").format(path, e),
+                    parent=self)
+            self.thumbnail_cache.pop(path, None)
+            for key in [k for k in self.photo_cache if k[0] == path]:
+                del self.photo_cache[key]
+        self.selected.clear()
+        self._remove_cells(set(paths))
+
+    def _remove_cells(self, paths):
+        removed = [cell['idx'] for cell in self.cell_data if cell['path'] in paths]
+        for idx in removed:
+            cell = self.cell_data[idx]
+            for key in ('bg', 'image', 'sel', 'text'):
+                self.canvas.delete(cell[key])
+        self.image_paths = [p for p in self.image_paths if p not in paths]
+        self._all_paths = [p for p in self._all_paths if p not in paths]
+        for path in paths:
+            self._cells.pop(path, None)
+        if self._sections:
+            # Group boundaries move with the removed items
+            self.selected = set()
+            self._apply_view()
+            return
+        self.cell_data = [cell for cell in self.cell_data if cell['path'] not in paths]
+        for idx, cell in enumerate(self.cell_data):
+            cell['idx'] = idx
+        first_row = self._layout.remove(removed)
+        if first_row is not None:
+            self._refresh_layout(first_row)
+        self._refresh_highlights()
+        self._update_status()
@@ -0,0 +1,180 @@
+import os
+import tkinter as tk
+from tkinter import ttk
+from PIL import Image, ImageTk
+from gui.theme import _DARK, resource_path, style_menu
+
+
+# ---------------------------------------------------------------------------
+# Image Preview window
+# ---------------------------------------------------------------------------
+
+class ImagePreview(tk.Toplevel):
+    def __init__(self, parent, image_path, lang, dark_mode=True):
+        super().__init__(parent)
+        self.lang = lang
+        self._dark_mode = dark_mode
+        self.image_path = image_path
+        self.pil_image = None
+        self.zoom = 1.0
+        self.photo = None
+        self._zoom_drag_origin = None
+        self._zoom_drag_start = 1.0
+        self._zoom_dragged = False
+        self._pan_offset = [0, 0]
+        self._pan_start = None
+        self._pan_start_offset = [0, 0]
+
+        self.configure(bg=_DARK['bg'])
+        self._setup_ui()
+        self._load_image()
+
+        try:
+            self.iconbitmap(resource_path('app_icon.ico'))
+        except Exception:
+            pass
+
+    def _setup_ui(self):
+        frame = ttk.Frame(self)
+        frame.pack(fill=tk.BOTH, expand=True)
+
+        self.canvas = tk.Canvas(frame, bg='#1a1a2e', cursor='fleur', highlightthickness=0)
+        self.canvas.pack(fill=tk.BOTH, expand=True)
+
+        self.canvas.bind('<MouseWheel>', self._on_mousewheel)
+        self.canvas.bind('<ButtonPress-3>', self._start_zoom_drag)
+        self.canvas.bind('<B3-Motion>', self._on_zoom_drag)
+        self.canvas.bind('<ButtonRelease-3>', self._end_zoom_drag)
+        self.canvas.bind('<ButtonPress-1>', self._start_pan)
+        self.canvas.bind('<B1-Motion>', self._on_pan)
+        self.canvas.bind('<ButtonRelease-1>', self._end_pan)
+        self.canvas.bind('<ButtonPress-2>', self._start_pan)
+        self.canvas.bind('<B2-Motion>', self._on_pan)
+        self.canvas.bind('<ButtonRelease-2>', self._end_pan)
+        self.canvas.bind('<Configure>', lambda e: self._display())
+        self.bind('<Escape>', lambda e: self.destroy())
+
+    def _load_image(self):
+        try:
+            self.pil_image = Image.open(self.image_path)
+            w, h = self.pil_image.size
+            self.title(f"{w}×{h} — {os.path.basename(self.image_path)}")
+            self.after(50, self._open_sized_to_image)
+        except Exception as e:
+            err = self.lang.get_string("image_preview.error_loading").format(e)
+            self.canvas.create_text(200, 200, text=err, fill='white')
+
+    def _open_sized_to_image(self):
+        if not self.pil_image:
+            return
+        self.update_idletasks()
+        screen_w = self.winfo_screenwidth()
+        screen_h = self.winfo_screenheight()
+        max_canvas_w = max(480, int(screen_w * 0.92))
+        max_canvas_h = max(360, int(screen_h * 0.88))
+        fit_zoom = min(max_canvas_w / self.pil_image.width, max_canvas_h / self.pil_image.height, 1.0)
+        display_w = max(1, int(self.pil_image.width * fit_zoom))
+        display_h = max(1, int(self.pil_image.height * fit_zoom))
+        win_w = display_w + 24
+        win_h = display_h + 48
+        x = max((screen_w - win_w) // 2, 0)
+        y = max((screen_h - win_h) // 2, 0)
+        self.geometry(f"{win_w}x{win_h}+{x}+{y}")
+        self.after(10, self._fit_to_window)
+
+    def _display(self):
+        if not self.pil_image:
+            return
+        w = max(1, int(self.pil_image.width * self.zoom))
+        h = max(1, int(self.pil_image.height * self.zoom))
+        resized = self.pil_image.resize((w, h), Image.LANCZOS)
+        self.photo = ImageTk.PhotoImage(resized)
+        self.canvas.delete("all")
+        cw = max(1, self.canvas.winfo_width())
+        ch = max(1, self.canvas.winfo_height())
+        x = (cw - w) // 2 + self._pan_offset[0]
+        y = (ch - h) // 2 + self._pan_offset[1]
+        self.canvas.create_image(x, y, anchor=tk.NW, image=self.photo)
+        try:
+            iw, ih = self.pil_image.size
+            pct = int(self.zoom * 100)
+            self.title(f"{iw}×{ih} — {os.path.basename(self.image_path)} — {pct}%")
+        except Exception:
+            pass
+
+    def _fit_to_window(self):
+        if not self.pil_image:
+            return
+        self.update_idletasks()
+        cw = self.canvas.winfo_width() or 800
+        ch = self.canvas.winfo_height() or 600
+        self.zoom = min(cw / self.pil_image.width, ch / self.pil_image.height, 1.0)
+        self._pan_offset = [0, 0]
+        self._display()
+
+    def _actual_size(self):
+        self.zoom = 1.0
+        self._pan_offset = [0, 0]
+        self._display()
+
+    def _on_mousewheel(self, event):
+        if event.delta > 0:
+            self.zoom = min(self.zoom * 1.12, 8.0)
+        else:
+            self.zoom = max(self.zoom / 1.12, 0.05)
+        self._display()
+
+    def _start_zoom_drag(self, event):
+        self._zoom_drag_origin = (event.x_root, event.y_root)
+        self._zoom_drag_start = self.zoom
+        self._zoom_dragged = False
+
+    def _on_zoom_drag(self, event):
+        if self._zoom_drag_origin is None:
+            return
+        dx = event.x_root - self._zoom_drag_origin[0]
+        dy = self._zoom_drag_origin[1] - event.y_root
+        if abs(dx) > 5 or abs(dy) > 5:
+            self._zoom_dragged = True
+        if self._zoom_dragged:
+            factor = max(0.1, 1.0 + ((dx + dy) / 320.0))
+            self.zoom = min(max(self._zoom_drag_start * factor, 0.05), 8.0)
+            self._display()
+
+    def _end_zoom_drag(self, event):
+        dragged = self._zoom_dragged
+        self._zoom_drag_origin = None
+        self._zoom_dragged = False
+        if not dragged:
+            self._show_context_menu(event)
+
+    def _show_context_menu(self, event):
+        menu = tk.Menu(self, tearoff=0)
+        style_menu(menu, dark=self._dark_mode)
+        menu.add_command(
+            label=self.lang.get_string("image_preview.menu_fit_to_window"),
+            command=self._fit_to_window,
+        )
+        menu.add_command(
+            label=self.lang.get_string("image_preview.menu_actual_size"),
+            command=self._actual_size,
+        )
+        menu.add_separator()
+        hint = self.lang.get_string("image_preview.hint")
+        for part in hint.split('  •  '):
+            menu.add_command(label=part.strip(), state='disabled')
+        menu.tk_popup(event.x_root, event.y_root)
+
+    def _start_pan(self, event):
+        self._pan_start = (event.x, event.y)
+        self._pan_start_offset = list(self._pan_offset)
+
+    def _on_pan(self, event):
+        if self._pan_start is None:
+            return
+        self._pan_offset[0] = self._pan_start_offset[0] + (event.x - self._pan_start[0])
+        self._pan_offset[1] = self._pan_start_offset[1] + (event.y - self._pan_start[1])
+        self._display()
+
+    def _end_pan(self, event):
+        self._pan_start = None
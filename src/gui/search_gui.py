@@ -0,0 +1,777 @@
+import os
+import threading
+import tkinter as tk
+from tkinter import ttk, filedialog, scrolledtext, messagebox
+from core.live_search import LiveSearch
+from core.searcher import MetadataSearcher, ResultDetails, SearchResultStream
+from core.worker_pool import WorkerPool
+from gui.theme import _DARK, resource_path, apply_dark_theme, apply_light_theme
+from gui.image_browser import ImageBrowser
+from localization.language_manager_metadatasearch import LanguageManagerMetadataSearch
+from config.config_manager_metadatasearch import ConfigManagerMetadataSearch
+
+
+# ---------------------------------------------------------------------------
+# Main GUI
+# ---------------------------------------------------------------------------
+
+class SearchGUI:
+    def __init__(self):
+        self.root = tk.Tk()
+        self.search_thread = None
+        self.search_active = False
+        self._closing = False
+
+        self.config = ConfigManagerMetadataSearch()
+        initial_language = self.config.get("Interface", "language", "English")
+        self.lang = LanguageManagerMetadataSearch("metadatasearch", initial_language)
+        self._initial_language = initial_language
+
+        self.dark_mode = tk.BooleanVar(
+            value=self.config.get_bool("Interface", "dark_mode", False))
+        if self.dark_mode.get():
+            apply_dark_theme(self.root)
+
+        self.root.title(self.lang.get_string("window.title"))
+        self.root.geometry("990x620")
+
+        # Application icon
+        self._app_icon_photo = None
+        try:
+            self.root.iconbitmap(resource_path('app_icon.ico'))
+        except Exception:
+            try:
+                self._app_icon_photo = tk.PhotoImage(file=resource_path('app_icon.png'))
+                self.root.iconphoto(True, self._app_icon_photo)
+            except Exception:
+                pass
+
+        self.browse_buttons = []
+
+        # ── Main frame ───────────────────────────────────────────────────
+        self.main_frame = ttk.Frame(self.root, padding="10")
+        self.main_frame.grid(row=0, column=0, sticky=(tk.W, tk.E, tk.N, tk.S))
+        self.root.columnconfigure(0, weight=1)
+        self.root.rowconfigure(0, weight=1)
+
+        # Folder selection
+        folder_label = ttk.Label(self.main_frame,
+                                  text=self.lang.get_string("labels.folder_path"),
+                                  width=20, anchor='e')
+        folder_label.grid(row=0, column=0, sticky=tk.W)
+        self._add_tooltip(folder_label, "folder_path")
+
+        self.folder_path = tk.StringVar(value=self.config.get("Paths", "default_search_folder", ""))
+        self.folder_entry = ttk.Entry(self.main_frame, textvariable=self.folder_path)
+        self.folder_entry.grid(row=0, column=1, columnspan=2, sticky=(tk.W, tk.E))
+
+        self.browse_button = ttk.Button(
+            self.main_frame, text=self.lang.get_string("buttons.browse"),
+            command=self.browse_folder, width=20)
+        self.browse_button.grid(row=0, column=3, padx=5)
+        self.browse_buttons.append(self.browse_button)
+
+        # Search term
+        search_label = ttk.Label(self.main_frame,
+                                  text=self.lang.get_string("labels.search_term"),
+                                  width=20, anchor='e')
+        search_label.grid(row=1, column=0, sticky=tk.W)
+        self._add_tooltip(search_label, "search_term")
+
+        self.search_term = tk.StringVar(value=self.config.get("Search", "search_term", ""))
+        ttk.Entry(self.main_frame, textvariable=self.search_term).grid(
+            row=1, column=1, columnspan=2, sticky=(tk.W, tk.E))
+
+        # Ignore term
+        ignore_label = ttk.Label(self.main_frame,
+                                  text=self.lang.get_string("labels.ignore_term"),
+                                  width=20, anchor='e')
+        ignore_label.grid(row=2, column=0, sticky=tk.W)
+        self._add_tooltip(ignore_label, "ignore_term")
+
+        self.ignore_term = tk.StringVar(value=self.config.get("Search", "ignore_term", ""))
+        ttk.Entry(self.main_frame, textvariable=self.ignore_term).grid(
+            row=2, column=1, columnspan=2, sticky=(tk.W, tk.E))
+
+        # ── Options frame ────────────────────────────────────────────────
+        options_frame = ttk.LabelFrame(
+            self.main_frame, text=self.lang.get_string("frames.options"), padding="5")
+        options_frame.grid(row=3, column=0, columnspan=4, sticky=(tk.W, tk.E), pady=10)
+        options_frame.columnconfigure(1, weight=1)
+        options_frame.frame_id = "options"
+
+        # Row 0 checkboxes
+        checkbox_frame = ttk.Frame(options_frame)
+        checkbox_frame.grid(row=0, column=0, columnspan=3, sticky=(tk.W, tk.E))
+        self._checkbox_frame = checkbox_frame
+
+        self.recursive = tk.BooleanVar(value=self.config.get_bool("Search", "recursive", True))
+        rc = ttk.Checkbutton(checkbox_frame, text=self.lang.get_string("checkboxes.recursive.text"),
+                             variable=self.recursive)
+        rc.grid(row=0, column=0, sticky=tk.W, padx=5)
+        self._add_tooltip(rc, "recursive")
+
+        self.log_enabled = tk.BooleanVar(value=self.config.get_bool("Output", "enable_logging", False))
+        lc = ttk.Checkbutton(checkbox_frame, text=self.lang.get_string("checkboxes.logging.text"),
+                             variable=self.log_enabled)
+        lc.grid(row=0, column=1, sticky=tk.W, padx=5)
+        self._add_tooltip(lc, "logging")
+
+        self.match_folder_structure = tk.BooleanVar(
+            value=self.config.get_bool("Output", "match_folder_structure", True))
+        mc = ttk.Checkbutton(checkbox_frame,
+                             text=self.lang.get_string("checkboxes.match_structure.text"),
+                             variable=self.match_folder_structure)
+        mc.grid(row=0, column=2, sticky=tk.W, padx=5)
+        self._add_tooltip(mc, "match_structure")
+
+        self.create_or_subfolders = tk.BooleanVar(
+            value=self.config.get_bool("Output", "create_or_subfolders", False))
+        oc = ttk.Checkbutton(checkbox_frame,
+                             text=self.lang.get_string("checkboxes.or_subfolders.text"),
+                             variable=self.create_or_subfolders)
+        oc.grid(row=0, column=3, sticky=tk.W, padx=5)
+        self._add_tooltip(oc, "or_subfolders")
+
+        # Row 1 checkboxes
+        self.search_positive = tk.BooleanVar(value=self.config.get_bool("Search", "search_positive", True))
+        pc = ttk.Checkbutton(checkbox_frame,
+                             text=self.lang.get_string("checkboxes.search_positive.text"),
+                             variable=self.search_positive)
+        pc.grid(row=1, column=0, sticky=tk.W, padx=5)
+        self._add_tooltip(pc, "search_positive")
+
+        self.search_negative = tk.BooleanVar(value=self.config.get_bool("Search", "search_negative", False))
+        nc = ttk.Checkbutton(checkbox_frame,
+                             text=self.lang.get_string("checkboxes.search_negative.text"),
+                             variable=self.search_negative)
+        nc.grid(row=1, column=1, sticky=tk.W, padx=5)
+        self._add_tooltip(nc, "search_negative")
+
+        self.case_sensitive = tk.BooleanVar(value=self.config.get_bool("Search", "case_sensitive", False))
+        cc = ttk.Checkbutton(checkbox_frame,
+                             text=self.lang.get_string("checkboxes.case_sensitive.text"),
+                             variable=self.case_sensitive)
+        cc.grid(row=1, column=2, sticky=tk.W, padx=5)
+        self._add_tooltip(cc, "case_sensitive")
+
+        self.dark_mode_cb = ttk.Checkbutton(
+            checkbox_frame,
+            text=self.lang.get_string("checkboxes.dark_mode.text"),
+            variable=self.dark_mode,
+            command=self._toggle_dark_mode)
+        self.dark_mode_cb.grid(row=1, column=3, sticky=tk.W, padx=5)
+        self._add_tooltip(self.dark_mode_cb, "dark_mode")
+
+        # Row 2 checkboxes
+        self.use_index = tk.BooleanVar(value=self.config.get_bool("Search", "use_index", False))
+        ic = ttk.Checkbutton(checkbox_frame,
+                             text=self.lang.get_string("checkboxes.use_index.text"),
+                             variable=self.use_index)
+        ic.grid(row=2, column=0, sticky=tk.W, padx=5)
+        self._add_tooltip(ic, "use_index")
+
+        self.live_search = tk.BooleanVar(value=self.config.get_bool("Search", "live_search", False))
+        lsc = ttk.Checkbutton(checkbox_frame,
+                              text=self.lang.get_string("checkboxes.live_search.text"),
+                              variable=self.live_search,
+                              command=self._on_query_changed)
+        lsc.grid(row=2, column=1, sticky=tk.W, padx=5)
+        self._add_tooltip(lsc, "live_search")
+
+        # ── Language selector (col 3 = same column as Browse buttons) ────────
+        self._lang_display_to_code = {}
+        _all_langs = self.lang.get_languages()
+        _ordered = ['English'] + sorted([l for l in _all_langs if l != 'English'])
+        _lang_display = []
+        for _lc in _ordered:
+            if _lc not in _all_langs:
+                continue
+            _name = self._get_language_name(_lc)
+            self._lang_display_to_code[_name] = _lc
+            _lang_display.append(_name)
+
+        lang_frame = ttk.Frame(options_frame)
+        lang_frame.grid(row=0, column=3, sticky=(tk.N, tk.S, tk.E, tk.W), padx=5)
+
+        self.language_label_widget = ttk.Label(
+            lang_frame, text=self.lang.get_string("labels.language"), anchor='w')
+        self.language_label_widget.pack(anchor='w', side=tk.TOP, pady=(0, 2))
+
+        self.language_combo = ttk.Combobox(
+            lang_frame, values=_lang_display, state='readonly')
+        _current_display = self._get_language_name(initial_language)
+        self.language_combo.set(_current_display)
+        self.language_combo.pack(fill=tk.X, side=tk.TOP, padx=(0, 30))
+        self.language_combo.bind('<<ComboboxSelected>>', self._on_language_combo_change)
+
+        # ── Copy To (checkbox + entry + browse) ───────────────────────────
+        self.copy_enabled = tk.BooleanVar(
+            value=self.config.get_bool("Output", "copy_enabled", False))
+        self.copy_cb = ttk.Checkbutton(
+            self.main_frame,
+            text=self.lang.get_string("labels.copy_to"),
+            variable=self.copy_enabled)
+        self.copy_cb.grid(row=4, column=0, sticky=tk.W, pady=2)
+        self._add_tooltip(self.copy_cb, "copy_to")
+
+        self.copy_path = tk.StringVar(value=self.config.get("Paths", "default_copy_folder", ""))
+        ttk.Entry(self.main_frame, textvariable=self.copy_path).grid(
+            row=4, column=1, columnspan=2, sticky=(tk.W, tk.E), pady=2)
+
+        copy_browse = ttk.Button(self.main_frame, text=self.lang.get_string("buttons.browse"),
+                                  command=lambda: self.browse_output("copy"), width=20)
+        copy_browse.grid(row=4, column=3, padx=5, pady=2)
+        self.browse_buttons.append(copy_browse)
+
+        # ── Move To (checkbox + entry + browse) ───────────────────────────
+        self.move_enabled = tk.BooleanVar(
+            value=self.config.get_bool("Output", "move_enabled", False))
+        self.move_cb = ttk.Checkbutton(
+            self.main_frame,
+            text=self.lang.get_string("labels.move_to"),
+            variable=self.move_enabled)
+        self.move_cb.grid(row=5, column=0, sticky=tk.W, pady=2)
+        self._add_tooltip(self.move_cb, "move_to")
+
+        self.move_path = tk.StringVar(value=self.config.get("Paths", "default_move_folder", ""))
+        ttk.Entry(self.main_frame, textvariable=self.move_path).grid(
+            row=5, column=1, columnspan=2, sticky=(tk.W, tk.E), pady=2)
+
+        move_browse = ttk.Button(self.main_frame, text=self.lang.get_string("buttons.browse"),
+                                  command=lambda: self.browse_output("move"), width=20)
+        move_browse.grid(row=5, column=3, padx=5, pady=2)
+        self.browse_buttons.append(move_browse)
+
+        # Regex filter
+        regex_label = ttk.Label(self.main_frame, text=self.lang.get_string("labels.regex"),
+                                 width=20, anchor='e')
+        regex_label.grid(row=6, column=0, sticky=tk.W, pady=2)
+        self._add_tooltip(regex_label, "regex_filter")
+
+        self.custom_filter = ttk.Entry(self.main_frame)
+        self.custom_filter.grid(row=6, column=1, columnspan=2, sticky=(tk.W, tk.E), pady=2)
+
+        # Generation setting filters
+        filters_label = ttk.Label(self.main_frame, text=self.lang.get_string("labels.filters"),
+                                  width=20, anchor='e')
+        filters_label.grid(row=7, column=0, sticky=tk.W, pady=2)
+        self._add_tooltip(filters_label, "filters")
+
+        self.where_filter = ttk.Entry(self.main_frame)
+        self.where_filter.grid(row=7, column=1, columnspan=2, sticky=(tk.W, tk.E), pady=2)
+
+        # ── Button row (Search + View) ────────────────────────────────────
+        btn_frame = ttk.Frame(self.main_frame)
+        btn_frame.grid(row=8, column=0, columnspan=4, pady=10)
+
+        self.search_button = ttk.Button(
+            btn_frame, text=self.lang.get_string("buttons.search"),
+            command=self.start_search, width=30, padding=(10, 5))
+        self.search_button.pack(side=tk.LEFT, padx=6)
+
+        self.duplicates_button = ttk.Button(
+            btn_frame, text=self.lang.get_string("buttons.find_duplicates"),
+            command=lambda: self.start_search("duplicates"), width=16, padding=(10, 5))
+        self.duplicates_button.pack(side=tk.LEFT, padx=6)
+        self._add_tooltip(self.duplicates_button, "find_duplicates")
+
+        self.view_button = ttk.Button(
+            btn_frame, text=self.lang.get_string("buttons.view_images"),
+            command=self.open_image_browser, width=16, padding=(10, 5))
+        self.view_button.pack(side=tk.LEFT, padx=6)
+        self.view_button.state(['disabled'])
+
+        # ── Progress ──────────────────────────────────────────────────────
+        progress_frame = ttk.LabelFrame(
+            self.main_frame, text=self.lang.get_string("frames.progress"), padding="5")
+        progress_frame.grid(row=9, column=0, columnspan=4, sticky=(tk.W, tk.E), pady=5)
+        progress_frame.columnconfigure(0, weight=1)
+        progress_frame.frame_id = "progress"
+
+        self.progress_var = tk.DoubleVar()
+        self.progress_bar = ttk.Progressbar(progress_frame, variable=self.progress_var, maximum=100)
+        self.progress_bar.grid(row=0, column=0, sticky=(tk.W, tk.E), padx=5, pady=5)
+
+        self.progress_label = ttk.Label(progress_frame, text=self.lang.get_string("progress.ready"))
+        self.progress_label.grid(row=1, column=0, sticky=tk.W, padx=5)
+
+        # ── Output text area ──────────────────────────────────────────────
+        d = _DARK
+        _oa_bg = d['bg3'] if self.dark_mode.get() else 'white'
+        _oa_fg = d['fg'] if self.dark_mode.get() else 'black'
+        _oa_sel = d['sel_bg'] if self.dark_mode.get() else '#0078d7'
+        _oa_selfg = d['fg'] if self.dark_mode.get() else 'white'
+        self.output_area = scrolledtext.ScrolledText(
+            self.main_frame, height=15,
+            bg=_oa_bg, fg=_oa_fg, insertbackground=_oa_fg,
+            selectbackground=_oa_sel, selectforeground=_oa_selfg,
+            relief='flat', borderwidth=1,
+            font=('Consolas', 9),
+        )
+        self.output_area.grid(row=10, column=0, columnspan=4, sticky=(tk.W, tk.E, tk.N, tk.S))
+
+        self.main_frame.columnconfigure(1, weight=1)
+        self.main_frame.rowconfigure(10, weight=1)
+
+        self._last_result_paths = []
+        self._last_duplicate_groups = {}
+        self._last_details = ResultDetails()
+        self._result_stream = None
+        self._browser = None
+        self.worker_pool = WorkerPool(self._worker_count())
+        self._live = LiveSearch(self.worker_pool)
+        self._live_job = None
+        for var in (self.search_term, self.ignore_term, self.search_positive, self.search_negative,
+                    self.case_sensitive):
+            var.trace_add('write', lambda *args: self._on_query_changed())
+        self.root.protocol("WM_DELETE_WINDOW", self._on_closing)
+
+    # ── Tooltip ───────────────────────────────────────────────────────────
+
+    def _add_tooltip(self, widget, key):
+        widget.tooltip_key = key
+        tooltip_text = self.lang.get_tooltip(key)
+        if not tooltip_text:
+            return
+        widget.tooltip = tooltip_text
+
+        def show(event):
+            if hasattr(widget, '_tip_win'):
+                widget._tip_win.destroy()
+            tip = tk.Toplevel()
+            tip.wm_overrideredirect(True)
+            tip.wm_geometry(f"+{event.x_root+10}+{event.y_root+10}")
+            ttk.Label(tip, text=widget.tooltip, justify='left',
+                      relief='solid', borderwidth=1).pack()
+            widget._tip_win = tip
+
+        def hide(event):
+            if hasattr(widget, '_tip_win'):
+                widget._tip_win.destroy()
+                del widget._tip_win
+
+        widget.bind('<Enter>', show)
+        widget.bind('<Leave>', hide)
+
+    # ── Dark mode ─────────────────────────────────────────────────────────
+
+    def _toggle_dark_mode(self):
+        if self.dark_mode.get():
+            apply_dark_theme(self.root)
+            d = _DARK
+            self.output_area.config(
+                bg=d['bg3'], fg=d['fg'], insertbackground=d['fg'],
+                selectbackground=d['sel_bg'], selectforeground=d['fg'])
+        else:
+            apply_light_theme(self.root)
+            self.output_area.config(
+                bg='white', fg='black', insertbackground='black',
+                selectbackground='#0078d7', selectforeground='white')
+
+    # ── Language ──────────────────────────────────────────────────────────
+
+    def _get_language_name(self, lang_code):
+        # Display names come from the language manifest; no need to load each language
+        return self.lang.get_language_name(self.lang.get_language_code(lang_code))
+
+    def _on_language_combo_change(self, event=None):
+        selected = self.language_combo.get()
+        lang_code = self._lang_display_to_code.get(selected)
+        if lang_code:
+            self._on_language_change(lang_code)
+
+    def _on_language_change(self, lang_code):
+        self.lang.set_language(lang_code)
+        self.config.set("Interface", "language", lang_code)
+        self.config.save_config()
+        self._update_gui_strings()
+
+    def _update_gui_strings(self):
+        self.root.title(self.lang.get_string("window.title"))
+
+        def update_container(container):
+            for widget in container.winfo_children():
+                gi = widget.grid_info()
+
+                if isinstance(widget, ttk.Label):
+                    if container == self.main_frame:
+                        if gi.get('row') == 0 and gi.get('column') == 0:
+                            widget.config(text=self.lang.get_string("labels.folder_path"))
+                        elif gi.get('row') == 1 and gi.get('column') == 0:
+                            widget.config(text=self.lang.get_string("labels.search_term"))
+                        elif gi.get('row') == 2 and gi.get('column') == 0:
+                            widget.config(text=self.lang.get_string("labels.ignore_term"))
+                        elif gi.get('row') == 6 and gi.get('column') == 0:
+                            widget.config(text=self.lang.get_string("labels.regex"))
+                        elif gi.get('row') == 7 and gi.get('column') == 0:
+                            widget.config(text=self.lang.get_string("labels.filters"))
+
+                elif isinstance(widget, ttk.Button):
+                    if widget == self.search_button:
+                        widget.config(text=self.lang.get_string("buttons.search"))
+                    elif widget == self.view_button:
+                        widget.config(text=self.lang.get_string("buttons.view_images"))
+                    elif widget == self.duplicates_button:
+                        widget.config(text=self.lang.get_string("buttons.find_duplicates"))
+                    elif widget in self.browse_buttons:
+                        widget.config(text=self.lang.get_string("buttons.browse"))
+
+                elif isinstance(widget, ttk.Checkbutton):
+                    row = gi.get('row', -1)
+                    col = gi.get('column', 0)
+                    if container is self._checkbox_frame:
+                        if row == 0:
+                            if col == 0:
+                                widget.config(text=self.lang.get_string("checkboxes.recursive.text"))
+                            elif col == 1:
+                                widget.config(text=self.lang.get_string("checkboxes.logging.text"))
+                            elif col == 2:
+                                widget.config(text=self.lang.get_string("checkboxes.match_structure.text"))
+                            elif col == 3:
+                                widget.config(text=self.lang.get_string("checkboxes.or_subfolders.text"))
+                        elif row == 1:
+                            if col == 0:
+                                widget.config(text=self.lang.get_string("checkboxes.search_positive.text"))
+                            elif col == 1:
+                                widget.config(text=self.lang.get_string("checkboxes.search_negative.text"))
+                            elif col == 2:
+                                widget.config(text=self.lang.get_string("checkboxes.case_sensitive.text"))
+                            elif col == 3:
+                                widget.config(text=self.lang.get_string("checkboxes.dark_mode.text"))
+                        elif row == 2:
+                            if col == 0:
+                                widget.config(text=self.lang.get_string("checkboxes.use_index.text"))
+                            elif col == 1:
+                                widget.config(text=self.lang.get_string("checkboxes.live_search.text"))
+                    elif container is self.main_frame:
+                        if row == 4 and col == 0:
+                            widget.config(text=self.lang.get_string("labels.copy_to"))
+                        elif row == 5 and col == 0:
+                            widget.config(text=self.lang.get_string("labels.move_to"))
+
+                elif isinstance(widget, ttk.LabelFrame):
+                    if hasattr(widget, 'frame_id'):
+                        widget.config(text=self.lang.get_string(f"frames.{widget.frame_id}"))
+                    update_container(widget)
+                elif isinstance(widget, (ttk.Frame, tk.Frame)):
+                    update_container(widget)
+
+        update_container(self.main_frame)
+        self.language_label_widget.config(text=self.lang.get_string("labels.language"))
+        self.progress_label.config(text=self.lang.get_string("progress.ready"))
+        self._update_tooltips()
+
+    def _update_tooltips(self):
+        def update_tips(container):
+            for widget in container.winfo_children():
+                if hasattr(widget, 'tooltip_key'):
+                    t = self.lang.get_tooltip(widget.tooltip_key)
+                    if t:
+                        widget.tooltip = t
+                if isinstance(widget, (ttk.Frame, ttk.LabelFrame, tk.Frame)):
+                    update_tips(widget)
+        update_tips(self.main_frame)
+
+    # ── File browser ──────────────────────────────────────────────────────
+
+    def browse_folder(self):
+        folder = filedialog.askdirectory()
+        if folder:
+            self.folder_path.set(folder)
+
+    def browse_output(self, output_type):
+        folder = filedialog.askdirectory()
+        if folder:
+            if output_type == "copy":
+                self.copy_path.set(folder)
+            else:
+                self.move_path.set(folder)
+
+    # ── Output / progress ─────────────────────────────────────────────────
+
+    def _run_on_ui_thread(self, callback, *args):
+        if self._closing:
+            return
+        try:
+            if threading.current_thread() is threading.main_thread():
+                if self.root.winfo_exists():
+                    callback(*args)
+            else:
+                self.root.after(0, lambda: self._run_on_ui_thread(callback, *args))
+        except (RuntimeError, tk.TclError):
+            pass
+
+    def _set_search_controls(self, running):
+        if running:
+            self.search_button.state(['disabled'])
+            self.duplicates_button.state(['disabled'])
+            self.view_button.state(['disabled'])
+        else:
+            self.search_button.state(['!disabled'])
+            self.duplicates_button.state(['!disabled'])
+            if self._last_result_paths:
+                self.view_button.state(['!disabled'])
+
+    def log_output(self, message):
+        self._run_on_ui_thread(self._append_log_output, message)
+
+    def _append_log_output(self, message):
+        self.output_area.insert(tk.END, message + "\n")
+        self.output_area.see(tk.END)
+        self.root.update_idletasks()
+
+    def update_progress(self, phase, current, total):
+        self._run_on_ui_thread(self._update_progress_ui, phase, current, total)
+
+    def _update_progress_ui(self, phase, current, total):
+        if total > 0:
+            pct = (current / total) * 100
+            self.progress_var.set(pct)
+            phase_text = self.lang.get_string(f"progress.{phase}")
+            self.progress_label.config(text=f"{phase_text}: {current}/{total} ({pct:.1f}%)")
+        self.root.update_idletasks()
+
+    def _confirm_action(self, action_type):
+        if action_type == "move":
+            return messagebox.askyesno(
+                self.lang.get_string("confirmations.move_title"),
+                self.lang.get_string("confirmations.move_message"))
+        return True
+
+    # ── Search ────────────────────────────────────────────────────────────
+
+    def start_search(self, mode="search"):
+        """Run a search, or with ``mode="duplicates"`` group visually identical images."""
+        self._cancel_live_search()
+        # A full search re-reads the folder; live search reloads its catalog afterwards
+        self._live.invalidate()
+        self.output_area.delete(1.0, tk.END)
+        self.progress_var.set(0)
+        self.progress_label.config(text=self.lang.get_string("progress.starting"))
+        self._set_search_controls(True)
+        self._last_result_paths = []
+        self._last_duplicate_groups = {}
+        self._last_details = ResultDetails()
+        self._result_stream = None
+        options = {
+            "mode": mode,
+            "folder_path": self.folder_path.get(),
+            "search_term": self.search_term.get(),
+            "recursive": self.recursive.get(),
+            "log_path": "logs" if self.log_enabled.get() else None,
+            "copy_path": self.copy_path.get() if self.copy_enabled.get() else None,
+            "move_path": self.move_path.get() if self.move_enabled.get() else None,
+            "custom_filter": self.custom_filter.get() or None,
+            "where": self.where_filter.get() or None,
+            "search_positive": self.search_positive.get(),
+            "search_negative": self.search_negative.get(),
+            "case_sensitive": self.case_sensitive.get(),
+            "use_index": self.use_index.get(),
+            "ignore_term": self.ignore_term.get() or None,
+            "match_folder_structure": self.match_folder_structure.get(),
+            "create_or_subfolders": self.create_or_subfolders.get(),
+        }
+
+        if options["move_path"] and not self._confirm_action("move"):
+            self._set_search_controls(False)
+            self.progress_label.config(text=self.lang.get_string("progress.ready"))
+            return
+
+        self.worker_pool.resize(self._worker_count())
+        self.search_active = True
+        self.search_thread = threading.Thread(target=self._run_search, args=(options,), daemon=True)
+        self.search_thread.start()
+
+    def _run_search(self, options):
+        result_paths = []
+        duplicate_groups = {}
+
+        try:
+            searcher = MetadataSearcher(
+                search_term=options["search_term"],
+                recursive=options["recursive"],
+                log_path=options["log_path"],
+                copy_path=options["copy_path"],
+                move_path=options["move_path"],
+                custom_filter=options["custom_filter"],
+                search_positive=options["search_positive"],
+                search_negative=options["search_negative"],
+                case_sensitive=options["case_sensitive"],
+                ignore_term=options["ignore_term"],
+                lang=self.lang,
+                worker_pool=self.worker_pool,
+                use_index=options["use_index"],
+                where=options["where"],
+            )
+            searcher.match_folder_structure = options["match_folder_structure"]
+            searcher.create_or_subfolders = options["create_or_subfolders"]
+            searcher.set_progress_callback(self.update_progress)
+            self._result_stream = searcher.result_stream
+            self._last_details = searcher.result_details
+            searcher.result_stream.subscribe(
+                lambda batch: self._run_on_ui_thread(self._on_results_streamed))
+
+            original_log = searcher.log
+            searcher.log = lambda msg: [original_log(msg), self.log_output(msg)]
+
+            if options["mode"] == "duplicates":
+                searcher.find_duplicate_images(options["folder_path"], self._duplicate_radius())
+            else:
+                searcher.search_images(options["folder_path"])
+            self.log_output("\n" + self.lang.get_string("progress.completed"))
+
+            result_paths = list(searcher.output_paths)
+            duplicate_groups = dict(searcher.duplicate_groups)
+
+        except Exception as e:
+            self.log_output("\n" + self.lang.get_string("errors.search_error").format(str(e)))
+        finally:
+            self.search_active = False
+            self._run_on_ui_thread(self._finish_search, result_paths, duplicate_groups)
+
+    # ── Live search ───────────────────────────────────────────────────────
+
+    def _on_query_changed(self):
+        """Debounce edits: cancel the running live search now, start a new one once typing pauses."""
+        self._cancel_live_search()
+        if self.live_search.get() and not self.search_active:
+            self._live_job = self.root.after(300, self._start_live_search)
+
+    def _cancel_live_search(self):
+        if self._live_job is not None:
+            self.root.after_cancel(self._live_job)
+            self._live_job = None
+        self._live.cancel()
+
+    def _start_live_search(self):
+        self._live_job = None
+        folder = self.folder_path.get()
+        if self.search_active or not folder or not os.path.isdir(folder):
+            return
+        generation = self._live.start()
+        stream = SearchResultStream()
+        details = ResultDetails()
+        options = {
+            "folder_path": folder,
+            "recursive": self.recursive.get(),
+            "search_term": self.search_term.get(),
+            "ignore_term": self.ignore_term.get() or None,
+            "search_positive": self.search_positive.get(),
+            "search_negative": self.search_negative.get(),
+            "case_sensitive": self.case_sensitive.get(),
+            "custom_filter": self.custom_filter.get() or None,
+            "where": self.where_filter.get() or None,
+        }
+        if self._browser is not None and self._browser.winfo_exists():
+            self._browser.follow_stream(stream, options["search_term"], details,
+                                        (options["search_positive"], options["search_negative"],
+                                         options["case_sensitive"]))
+        threading.Thread(target=self._run_live_search, args=(generation, stream, details, options),
+                         daemon=True).start()
+
+    def _run_live_search(self, generation, stream, details, options):
+        def on_progress(matches, done, total):
+            if self._live.is_current(generation):
+                self._run_on_ui_thread(self._show_live_progress, generation, matches, done, total)
+
+        paths = None
+        try:
+            self._live.load(options["folder_path"], options["recursive"], self.update_progress)
+            paths = self._live.search(generation, result_stream=stream, on_progress=on_progress, details=details,
+                                      **options)
+        except Exception as e:
+            if self._live.is_current(generation):
+                self.log_output(self.lang.get_string("errors.search_error").format(str(e)))
+        finally:
+            stream.close()
+            if paths is not None:
+                self._run_on_ui_thread(self._finish_live_search, generation, paths, details)
+
+    def _show_live_progress(self, generation, matches, done, total):
+        if not self._live.is_current(generation) or self.search_active:
+            return
+        self.progress_var.set(100.0 * done / total if total else 100.0)
+        self.progress_label.config(text=self.lang.get_string("progress.live").format(matches, done, total))
+
+    def _finish_live_search(self, generation, paths, details):
+        if not self._live.is_current(generation) or self.search_active:
+            return
+        self._last_result_paths = paths
+        self._last_duplicate_groups = {}
+        self._last_details = details
+        total = len(self._live.catalog) if self._live.catalog is not None else 0
+        self._show_live_progress(generation, len(paths), total, total)
+        if paths:
+            self.view_button.state(['!disabled'])
+        else:
+            self.view_button.state(['disabled'])
+
+    def _on_results_streamed(self):
+        if self.search_active:
+            self.view_button.state(['!disabled'])
+
+    def _worker_count(self):
+        try:
+            return max(0, int(self.config.get("Search", "worker_count", "0")))
+        except (ValueError, TypeError):
+            return 0
+
+    def _duplicate_radius(self):
+        try:
+            return max(0, int(self.config.get("Search", "duplicate_radius", "4")))
+        except (ValueError, TypeError):
+            return 4
+
+    def _finish_search(self, result_paths, duplicate_groups=None):
+        self._last_result_paths = result_paths
+        self._last_duplicate_groups = duplicate_groups or {}
+        self._set_search_controls(False)
+        self.progress_label.config(text=self.lang.get_string("progress.ready"))
+
+    # ── Image browser ─────────────────────────────────────────────────────
+
+    def open_image_browser(self):
+        # While a search is running the browser follows its result stream.
+        stream = self._result_stream if self.search_active else None
+        if not self._last_result_paths and stream is None:
+            return
+        browser = self._browser = ImageBrowser(self.root, [] if stream else self._last_result_paths, self.lang,
+                               self.search_term.get(), config=self.config,
+                               dark_mode=self.dark_mode.get(), result_stream=stream,
+                               groups=None if stream else self._last_duplicate_groups,
+                               details=self._last_details,
+                               search_options=(self.search_positive.get(), self.search_negative.get(),
+                                               self.case_sensitive.get()))
+        browser.focus_set()
+
+    # ── Close / tray ──────────────────────────────────────────────────────
+
+    def _on_closing(self):
+        self._closing = True
+        self._cancel_live_search()
+        self.config.set("Interface", "language", self.lang.current_language)
+        self.config.set("Interface", "dark_mode", str(self.dark_mode.get()))
+        self.config.set("Search", "recursive", str(self.recursive.get()))
+        self.config.set("Search", "case_sensitive", str(self.case_sensitive.get()))
+        self.config.set("Search", "use_index", str(self.use_index.get()))
+        self.config.set("Search", "live_search", str(self.live_search.get()))
+        self.config.set("Search", "search_positive", str(self.search_positive.get()))
+        self.config.set("Search", "search_negative", str(self.search_negative.get()))
+        self.config.set("Search", "search_term", self.search_term.get())
+        self.config.set("Search", "ignore_term", self.ignore_term.get())
+        self.config.set("Search", "worker_count", str(self._worker_count()))
+        self.config.set("Search", "duplicate_radius", str(self._duplicate_radius()))
+        self.config.set("Output", "match_folder_structure", str(self.match_folder_structure.get()))
+        self.config.set("Output", "create_or_subfolders", str(self.create_or_subfolders.get()))
+        self.config.set("Output", "enable_logging", str(self.log_enabled.get()))
+        self.config.set("Output", "copy_enabled", str(self.copy_enabled.get()))
+        self.config.set("Output", "move_enabled", str(self.move_enabled.get()))
+        self.config.set("Paths", "default_search_folder", self.folder_path.get())
+        self.config.set("Paths", "default_copy_folder", self.copy_path.get())
+        self.config.set("Paths", "default_move_folder", self.move_path.get())
+        self.config.save_config()
+        if self.search_active and self.search_thread and self.search_thread.is_alive():
+            os._exit(0)
+        self.worker_pool.shutdown(wait=False)
+        self.root.destroy()
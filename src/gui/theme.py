@@ -0,0 +1,125 @@
+import os
+import sys
+import tkinter as tk
+from tkinter import ttk
+
+
+def resource_path(relative_path):
+    """Resolve resource path — works both in development and when bundled by PyInstaller."""
+    try:
+        base = sys._MEIPASS
+    except AttributeError:
+        base = os.path.abspath(".")
+    return os.path.join(base, relative_path)
+
+
+# ---------------------------------------------------------------------------
+# Dark theme
+# ---------------------------------------------------------------------------
+
+_DARK = {
+    'bg':      '#18192a',
+    'bg2':     '#22243a',
+    'bg3':     '#0f1020',
+    'fg':      '#d0d2e8',
+    'fg2':     '#8890b8',
+    'border':  '#3a3b55',
+    'accent':  '#4a6eff',
+    'sel_bg':  '#2a3580',
+    'btn_bg':  '#2a2c48',
+    'btn_act': '#3a3c58',
+    'disabled':'#55577a',
+}
+
+
+def apply_dark_theme(root):
+    style = ttk.Style(root)
+    style.theme_use('clam')
+    d = _DARK
+
+    root.configure(bg=d['bg'])
+
+    style.configure('.',
+        background=d['bg'], foreground=d['fg'],
+        bordercolor=d['border'], darkcolor=d['bg2'], lightcolor=d['bg2'],
+        troughcolor=d['bg2'], selectbackground=d['sel_bg'],
+        selectforeground=d['fg'], fieldbackground=d['bg3'],
+        insertcolor=d['fg'], relief='flat',
+    )
+    style.configure('TFrame', background=d['bg'])
+    style.configure('TLabel', background=d['bg'], foreground=d['fg'])
+    style.configure('TLabelframe', background=d['bg'], foreground=d['fg'],
+                    bordercolor=d['border'])
+    style.configure('TLabelframe.Label', background=d['bg'], foreground=d['fg'])
+
+    style.configure('TButton',
+        background=d['btn_bg'], foreground=d['fg'],
+        bordercolor=d['border'], focusthickness=0, padding=(6, 4))
+    style.map('TButton',
+        background=[('active', d['btn_act']), ('pressed', d['accent']),
+                    ('disabled', d['bg2'])],
+        foreground=[('disabled', d['disabled'])],
+        relief=[('pressed', 'flat'), ('!pressed', 'flat')])
+
+    style.configure('TCheckbutton', background=d['bg'], foreground=d['fg'],
+                    focusthickness=0, indicatorcolor=d['bg3'],
+                    indicatorrelief='flat')
+    style.map('TCheckbutton',
+        background=[('active', d['bg'])],
+        foreground=[('disabled', d['disabled'])],
+        indicatorcolor=[('selected', d['accent']), ('!selected', d['bg3'])])
+
+    style.configure('TEntry',
+        fieldbackground=d['bg3'], foreground=d['fg'],
+        insertcolor=d['fg'], bordercolor=d['border'],
+        selectbackground=d['sel_bg'], selectforeground=d['fg'])
+
+    style.configure('TCombobox',
+        fieldbackground=d['bg3'], foreground=d['fg'],
+        selectbackground=d['sel_bg'], selectforeground=d['fg'],
+        background=d['btn_bg'], bordercolor=d['border'],
+        arrowcolor=d['fg'])
+    style.map('TCombobox',
+        fieldbackground=[('readonly', d['bg3'])],
+        foreground=[('disabled', d['disabled'])],
+        selectbackground=[('readonly', d['sel_bg'])])
+
+    style.configure('TScrollbar',
+        background=d['bg2'], troughcolor=d['bg'],
+        arrowcolor=d['fg'], bordercolor=d['bg'], relief='flat')
+    style.map('TScrollbar', background=[('active', d['btn_act'])])
+
+    style.configure('Horizontal.TProgressbar',
+        background=d['accent'], troughcolor=d['bg2'],
+        bordercolor=d['border'], darkcolor=d['accent'], lightcolor=d['accent'])
+    style.configure('Vertical.TProgressbar',
+        background=d['accent'], troughcolor=d['bg2'])
+
+    style.configure('TSeparator', background=d['border'])
+
+
+def style_menu(menu, dark=True):
+    if not dark:
+        return
+    d = _DARK
+    try:
+        menu.configure(
+            bg=d['bg2'], fg=d['fg'],
+            activebackground=d['accent'], activeforeground='#ffffff',
+            borderwidth=1, relief='flat',
+            disabledforeground=d['disabled'],
+        )
+    except tk.TclError:
+        pass
+
+
+def apply_light_theme(root):
+    style = ttk.Style(root)
+    try:
+        style.theme_use('vista')
+    except tk.TclError:
+        try:
+            style.theme_use('default')
+        except tk.TclError:
+            pass
+    root.configure(bg='SystemButtonFace')
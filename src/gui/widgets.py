@@ -0,0 +1,174 @@
+import tkinter as tk
+from tkinter import ttk
+
+
+# ---------------------------------------------------------------------------
+# Modern Slider widget
+# ---------------------------------------------------------------------------
+
+class ModernSlider(tk.Canvas):
+    """Horizontal slider with a circular knob, filled track, and hover tooltip."""
+
+    TRACK_H = 5
+    KNOB_R = 11
+    TRACK_BG = '#2a2b40'
+    TRACK_FILL = '#4a6eff'
+    KNOB_COLOR = '#dde0f8'
+    KNOB_BORDER = '#6677cc'
+
+    def __init__(self, parent, from_=0, to=100, resolution=1, variable=None, command=None, dark_mode=True, **kwargs):
+        if dark_mode:
+            self.TRACK_BG = '#2a2b40'
+            self.TRACK_FILL = '#4a6eff'
+            self.KNOB_COLOR = '#dde0f8'
+            self.KNOB_BORDER = '#6677cc'
+            kwargs.setdefault('bg', '#18192a')
+        else:
+            self.TRACK_BG = '#c8c8d8'
+            self.TRACK_FILL = '#4a6eff'
+            self.KNOB_COLOR = '#f5f5f8'
+            self.KNOB_BORDER = '#9999bb'
+            kwargs.setdefault('bg', 'SystemButtonFace')
+        h = (self.KNOB_R + 4) * 2
+        super().__init__(parent, height=h, highlightthickness=0, **kwargs)
+        self._from = float(from_)
+        self._to = float(to)
+        self._resolution = float(resolution)
+        self._command = command
+        self._dragging = False
+        self._tooltip_win = None
+        self._tooltip_label = None
+
+        self._var = variable if variable is not None else tk.IntVar(value=int(from_))
+
+        self.bind('<Configure>', lambda e: self.after(0, self._draw))
+        self.bind('<ButtonPress-1>', self._on_press)
+        self.bind('<B1-Motion>', self._on_drag)
+        self.bind('<ButtonRelease-1>', self._on_release)
+        self.bind('<Enter>', self._show_tooltip)
+        self.bind('<Leave>', self._hide_tooltip)
+        self.bind('<Motion>', self._on_motion)
+        self._var.trace_add('write', lambda *a: self.after(0, self._draw))
+
+    def get(self):
+        return self._var.get()
+
+    def set(self, value):
+        stepped = round(float(value) / self._resolution) * self._resolution
+        self._var.set(int(max(self._from, min(self._to, stepped))))
+
+    def _value_to_x(self, value):
+        w = self.winfo_width()
+        pad = self.KNOB_R + 2
+        track_w = max(1.0, w - pad * 2)
+        ratio = (float(value) - self._from) / max(1.0, self._to - self._from)
+        return pad + ratio * track_w
+
+    def _x_to_value(self, x):
+        w = self.winfo_width()
+        pad = self.KNOB_R + 2
+        track_w = max(1.0, w - pad * 2)
+        ratio = max(0.0, min(1.0, (x - pad) / track_w))
+        raw = self._from + ratio * (self._to - self._from)
+        stepped = round(raw / self._resolution) * self._resolution
+        return int(max(self._from, min(self._to, stepped)))
+
+    def _rounded_rect(self, x1, y1, x2, y2, r, **kw):
+        r = min(r, max(1, int((x2 - x1) / 2)), max(1, int((y2 - y1) / 2)))
+        pts = [
+            x1 + r, y1,  x2 - r, y1,
+            x2, y1,      x2, y1 + r,
+            x2, y2 - r,  x2, y2,
+            x2 - r, y2,  x1 + r, y2,
+            x1, y2,      x1, y2 - r,
+            x1, y1 + r,  x1, y1,
+        ]
+        return self.create_polygon(pts, smooth=True, **kw)
+
+    def _draw(self):
+        self.delete('all')
+        w = self.winfo_width()
+        h = self.winfo_height()
+        if w < 8 or h < 8:
+            return
+        cy = h // 2
+        pad = self.KNOB_R + 2
+        ty1 = cy - self.TRACK_H // 2
+        ty2 = cy + self.TRACK_H // 2
+
+        self._rounded_rect(pad, ty1, w - pad, ty2, self.TRACK_H // 2,
+                           fill=self.TRACK_BG, outline='')
+
+        value = self._var.get()
+        kx = self._value_to_x(value)
+        if kx > pad + 1:
+            self._rounded_rect(pad, ty1, kx, ty2, self.TRACK_H // 2,
+                               fill=self.TRACK_FILL, outline='')
+
+        r = self.KNOB_R
+        self.create_oval(kx - r + 1, cy - r + 2, kx + r + 1, cy + r + 2,
+                         fill='#0d0e1a', outline='')
+        self.create_oval(kx - r, cy - r, kx + r, cy + r,
+                         fill=self.KNOB_COLOR, outline=self.KNOB_BORDER, width=1.5)
+        hi_r = max(2, r // 3)
+        self.create_oval(kx - hi_r, cy - hi_r - 2, kx + hi_r, cy - 2,
+                         fill='#ffffff', outline='')
+
+    def _fire(self, value):
+        if self._command:
+            self._command(str(value))
+
+    def _on_press(self, event):
+        self._dragging = True
+        v = self._x_to_value(event.x)
+        self._var.set(v)
+        self._update_tooltip_text(v)
+
+    def _on_drag(self, event):
+        if not self._dragging:
+            return
+        v = self._x_to_value(event.x)
+        self._var.set(v)
+        self._update_tooltip_text(v)
+
+    def _on_release(self, event):
+        if self._dragging:
+            v = self._x_to_value(event.x)
+            self._var.set(v)
+            self._fire(v)
+        self._dragging = False
+
+    def _show_tooltip(self, event=None):
+        if self._tooltip_win:
+            return
+        value = self._var.get()
+        self._tooltip_win = tk.Toplevel(self)
+        self._tooltip_win.wm_overrideredirect(True)
+        x = (event.x_root + 12) if event else (self.winfo_rootx() + 12)
+        y = (event.y_root - 34) if event else (self.winfo_rooty() - 34)
+        self._tooltip_win.wm_geometry(f"+{x}+{y}")
+        self._tooltip_label = ttk.Label(
+            self._tooltip_win, text=f"{value} px",
+            relief='solid', borderwidth=1, padding=(5, 3))
+        self._tooltip_label.pack()
+
+    def _hide_tooltip(self, event=None):
+        if self._tooltip_win:
+            try:
+                self._tooltip_win.destroy()
+            except Exception:
+                pass
+        self._tooltip_win = None
+        self._tooltip_label = None
+
+    def _on_motion(self, event):
+        if self._tooltip_win:
+            self._tooltip_win.wm_geometry(f"+{event.x_root + 12}+{event.y_root - 34}")
+            self._update_tooltip_text(self._var.get())
+
+    def _update_tooltip_text(self, value):
+        if self._tooltip_label:
+            try:
+                self._tooltip_label.config(text=f"{value} px")
+            except Exception:
+                pass
@@ -1,6 +1,101 @@
 import os
+import sys
 import json
-from typing import Dict, Optional
+from typing import Dict, Optional, Tuple
+
+BUNDLE_VERSION = 1
+_ENCODINGS = ['utf-8-sig', 'utf-16', 'utf-16le', 'utf-16be']
+
+
+def _localization_dir() -> str:
+    return os.path.dirname(os.path.abspath(__file__))
+
+
+def bundle_path(base_name: str, localization_dir: Optional[str] = None) -> str:
+    """Path of the generated bundle for a set of language files"""
+    return os.path.join(localization_dir or _localization_dir(), f"{base_name}-bundle.json")
+
+
+def load_language_file(file_path: str) -> Optional[dict]:
+    """Parse a language file, retrying the encodings the translations have been saved in"""
+    for encoding in _ENCODINGS:
+        try:
+            with open(file_path, 'r', encoding=encoding) as f:
+                return json.load(f)
+        except (UnicodeDecodeError, UnicodeError, json.JSONDecodeError):
+            continue
+        except OSError:
+            return None
+    return None
+
+
+def flatten_strings(data: dict, prefix: str = '') -> Dict[str, str]:
+    """Flatten nested strings to dotted keys; a dict with a 'text' entry also maps its own key"""
+    flat = {}
+    for k, v in data.items():
+        key = f"{prefix}.{k}" if prefix else k
+        if isinstance(v, dict):
+            if isinstance(v.get('text'), str):
+                flat[key] = v['text']
+            flat.update(flatten_strings(v, key))
+        elif isinstance(v, str):
+            flat[key] = v
+    return flat
+
+
+def compile_language(data: dict) -> Tuple[Dict[str, str], Dict[str, str]]:
+    """Split a parsed language file into flat string and tooltip tables"""
+    strings = flatten_strings({k: v for k, v in data.items() if k != "tooltips"})
+    tooltips = {}
+    for key, value in data.get("tooltips", {}).items():
+        if isinstance(value, dict):
+            value = value.get("text")
+        if isinstance(value, str) and value:
+            tooltips[key] = value
+    return strings, tooltips
+
+
+def _source_files(base_name: str, localization_dir: str) -> Dict[str, str]:
+    prefix = f"{base_name}-"
+    sources = {}
+    for file in os.listdir(localization_dir):
+        if file.startswith(prefix) and file.endswith(".json") and file != os.path.basename(
+                bundle_path(base_name, localization_dir)):
+            sources[file[len(prefix):-5]] = os.path.join(localization_dir, file)
+    return sources
+
+
+def build_bundle(base_name: str, localization_dir: Optional[str] = None) -> dict:
+    """Compile every language file into one manifest plus per-language payloads.
+
+    Payloads are stored as JSON text so that loading the bundle only parses the
+    manifest; a language is decoded the first time it is selected.
+    """
+    localization_dir = localization_dir or _localization_dir()
+    manifest = {}
+    languages = {}
+    for lang_code, file_path in sorted(_source_files(base_name, localization_dir).items()):
+        data = load_language_file(file_path)
+        if not data or "name" not in data.get("language", {}):
+            continue
+        strings, tooltips = compile_language(data)
+        manifest[data["language"]["name"]] = lang_code
+        languages[lang_code] = json.dumps({"strings": strings, "tooltips": tooltips},
+                                          ensure_ascii=False, separators=(',', ':'))
+    return {"version": BUNDLE_VERSION, "manifest": manifest, "languages": languages}
+
+
+def write_bundle(base_name: str, localization_dir: Optional[str] = None, bundle: Optional[dict] = None) -> str:
+    """Write the bundle next to the language files, building it unless one is given"""
+    path = bundle_path(base_name, localization_dir)
+    if bundle is None:
+        bundle = build_bundle(base_name, localization_dir)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(bundle, f, ensure_ascii=False, separators=(',', ':'))
+    os.replace(tmp_path, path)
+    return path
+
 
 class LanguageManagerMetadataSearch:
     def __init__(self, base_name: str, initial_language: str = "English"):
@@ -8,10 +103,19 @@ class LanguageManagerMetadataSearch:
         self.base_name = base_name
         self.strings = {}
         self.tooltips = {}
+        self.fallback_strings = {}
+        self.fallback_tooltips = {}
         self.current_language = None  # Will be set after loading languages
         self.language_codes = {}
+        self._payloads = {}    # code -> undecoded bundle payload
+        self._compiled = {}    # code -> (strings, tooltips)
         self._load_languages()
-        
+
+        # Keys a translation has not caught up with yet are shown in English
+        english = self._get_compiled(self.language_codes.get("English", "en"))
+        if english is not None:
+            self.fallback_strings, self.fallback_tooltips = english
+
         # Set initial language, defaulting to English if specified language not found
         if initial_language in self.get_languages():
             self.set_language(initial_language)
@@ -19,58 +123,59 @@ class LanguageManagerMetadataSearch:
             self.set_language("English")
 
     def _load_languages(self):
-        """Load available language files and their codes"""
-        localization_dir = os.path.dirname(os.path.abspath(__file__))
-        for file in os.listdir(localization_dir):
-            if file.startswith(f"{self.base_name}-") and file.endswith(".json"):
-                lang_code = file[len(f"{self.base_name}-"):-5]  # Extract language code from filename
-                file_path = os.path.join(localization_dir, file)
-                try:
-                    with open(file_path, 'r', encoding='utf-8-sig') as f:
-                        data = json.load(f)
-                        if "language" in data and "name" in data["language"]:
-                            lang_name = data["language"]["name"]
-                            self.language_codes[lang_name] = lang_code
-                except UnicodeDecodeError:
-                    # Try with different encodings if UTF-8 fails
-                    for encoding in ['utf-8-sig', 'utf-16', 'utf-16le', 'utf-16be']:
-                        try:
-                            with open(file_path, 'r', encoding=encoding) as f:
-                                data = json.load(f)
-                                if "language" in data and "name" in data["language"]:
-                                    lang_name = data["language"]["name"]
-                                    self.language_codes[lang_name] = lang_code
-                                    break
-                        except UnicodeDecodeError:
-                            continue
+        """Load the language manifest from the bundle, or from the language files if it is stale"""
+        if self._load_bundle():
+            return
+        localization_dir = _localization_dir()
+        for lang_code, file_path in _source_files(self.base_name, localization_dir).items():
+            data = load_language_file(file_path)
+            if data and "language" in data and "name" in data["language"]:
+                self.language_codes[data["language"]["name"]] = lang_code
+                self._compiled[lang_code] = compile_language(data)
+        if not getattr(sys, 'frozen', False):
+            try:
+                write_bundle(self.base_name, localization_dir)
+            except OSError:
+                pass
+
+    def _load_bundle(self) -> bool:
+        """Read the manifest from the generated bundle; returns False when it is missing or stale"""
+        localization_dir = _localization_dir()
+        path = bundle_path(self.base_name, localization_dir)
+        try:
+            bundle_mtime = os.path.getmtime(path)
+            # The frozen build ships a freshly generated bundle; only check sources in development
+            if not getattr(sys, 'frozen', False):
+                for file_path in _source_files(self.base_name, localization_dir).values():
+                    if os.path.getmtime(file_path) > bundle_mtime:
+                        return False
+            with open(path, 'r', encoding='utf-8') as f:
+                bundle = json.load(f)
+        except (OSError, ValueError):
+            return False
+        if bundle.get("version") != BUNDLE_VERSION or not bundle.get("manifest"):
+            return False
+        self.language_codes = dict(bundle["manifest"])
+        self._payloads = dict(bundle.get("languages", {}))
+        return True
+
+    def _get_compiled(self, lang_code: str) -> Optional[Tuple[Dict[str, str], Dict[str, str]]]:
+        """Decode a language on first use"""
+        compiled = self._compiled.get(lang_code)
+        if compiled is None and lang_code in self._payloads:
+            payload = json.loads(self._payloads.pop(lang_code))
+            compiled = (payload.get("strings", {}), payload.get("tooltips", {}))
+            self._compiled[lang_code] = compiled
+        return compiled
 
     def set_language(self, language: str):
         """Set the current language and load its strings"""
         if language in self.get_languages():
-            self.current_language = language
-            lang_code = self.language_codes.get(language, language)
-            lang_file = os.path.join(os.path.dirname(os.path.abspath(__file__)),
-                                   f"{self.base_name}-{lang_code}.json")
-            
-            if os.path.exists(lang_file):
-                try:
-                    with open(lang_file, 'r', encoding='utf-8-sig') as f:
-                        data = json.load(f)
-                        # Store all data except tooltips as strings
-                        self.strings = {k: v for k, v in data.items() if k != "tooltips"}
-                        self.tooltips = data.get("tooltips", {})
-                    return True
-                except UnicodeDecodeError:
-                    # Try with different encodings if UTF-8 fails
-                    for encoding in ['utf-8-sig', 'utf-16', 'utf-16le', 'utf-16be']:
-                        try:
-                            with open(lang_file, 'r', encoding=encoding) as f:
-                                data = json.load(f)
-                                self.strings = {k: v for k, v in data.items() if k != "tooltips"}
-                                self.tooltips = data.get("tooltips", {})
-                                return True
-                        except UnicodeDecodeError:
-                            continue
+            compiled = self._get_compiled(self.language_codes.get(language, language))
+            if compiled is not None:
+                self.current_language = language
+                self.strings, self.tooltips = compiled
+                return True
         return False
 
     def get_languages(self) -> list:
@@ -79,50 +184,35 @@ class LanguageManagerMetadataSearch:
 
     def get_string(self, key: str, *args) -> str:
         """Get a localized string by key with optional format arguments"""
-        # Split the key by dots to traverse nested dictionaries
-        keys = key.split('.')
-        value = self.strings
-        
-        # Traverse the nested structure
-        for k in keys:
-            if isinstance(value, dict) and k in value:
-                value = value[k]
-            else:
-                # Key not found, return the key itself as fallback
-                return key
-        
-        # If we found a dict instead of a string, check for 'text' key or return original key
-        if isinstance(value, dict):
-            if 'text' in value:
-                value = value['text']
-            else:
-                return key
-        
+        value = self.strings.get(key)
+        if value is None:
+            value = self.fallback_strings.get(key)
+        if value is None:
+            # Key not found, return the key itself as fallback
+            return key
+
         # Format the string if arguments are provided
         if args:
             try:
                 return value.format(*args)
             except (IndexError, KeyError):
                 return value
-        
-        return value if isinstance(value, str) else key
+
+        return value
 
     def get_tooltip(self, key: str) -> str:
         """Get a localized tooltip by key"""
         # First check in tooltips section
         tooltip = self.tooltips.get(key, "")
         if tooltip:
-            if isinstance(tooltip, dict) and "text" in tooltip:
-                tooltip = tooltip["text"]
-            return tooltip if isinstance(tooltip, str) else ""
-            
+            return tooltip
+
         # Then check if it's a checkbox with a tooltip
-        checkbox_key = f"checkboxes.{key}.tooltip"
-        value = self.get_string(checkbox_key)
-        if value != checkbox_key:  # If we got a real value back
-            return value
-            
-        return ""
+        tooltip = self.strings.get(f"checkboxes.{key}.tooltip", "")
+        if tooltip:
+            return tooltip
+        return (self.fallback_tooltips.get(key, "")
+                or self.fallback_strings.get(f"checkboxes.{key}.tooltip", ""))
 
     def get_language_code(self, language_name: str) -> str:
         """Get the language code for a language name"""
@@ -136,14 +226,5 @@ class LanguageManagerMetadataSearch:
         return language_code
 
     def _get_nested_value(self, key: str) -> Optional[str]:
-        """Get a value from nested dictionaries using dot notation"""
-        keys = key.split('.')
-        value = self.strings
-        
-        for k in keys:
-            if isinstance(value, dict) and k in value:
-                value = value[k]
-            else:
-                return None
-        
-        return value if isinstance(value, str) else None 
\ No newline at end of file
+        """Get a value using dot notation"""
+        return self.strings.get(key)
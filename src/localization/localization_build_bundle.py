@@ -0,0 +1,25 @@
+import os
+import sys
+import time
+
+from language_manager_metadatasearch import bundle_path, build_bundle, write_bundle
+
+
+def main():
+    """Compile the language files into the bundle the app loads at startup"""
+    base_name = sys.argv[1] if len(sys.argv) > 1 else "metadatasearch"
+    script_dir = os.path.dirname(os.path.abspath(__file__))
+
+    start = time.perf_counter()
+    bundle = build_bundle(base_name, script_dir)
+    path = write_bundle(base_name, script_dir, bundle)
+    elapsed = (time.perf_counter() - start) * 1000
+
+    print(f"Wrote {os.path.basename(bundle_path(base_name, script_dir))}: "
+          f"{len(bundle['manifest'])} languages, {os.path.getsize(path)} bytes ({elapsed:.1f} ms)")
+    for name, code in sorted(bundle["manifest"].items(), key=lambda item: item[1]):
+        print(f"  {code:<6} {name}")
+
+
+if __name__ == "__main__":
+    main()
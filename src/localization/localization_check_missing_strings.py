@@ -32,7 +32,7 @@ def main():
     metadatasearch_en = load_json_file(os.path.join(script_dir, 'metadatasearch-en.json'))
     
     # Get all language files
-    lang_files = [f for f in os.listdir(script_dir) if f.endswith('.json') and f != 'everything-en.json' and f != 'metadatasearch-en.json']
+    lang_files = [f for f in os.listdir(script_dir) if f.endswith('.json') and not f.endswith('-bundle.json') and f != 'everything-en.json' and f != 'metadatasearch-en.json']
     
     print("\nLanguage Comparison Report")
     print("=" * 50)
@@ -0,0 +1,74 @@
+import os
+import sys
+
+import pytest
+from PIL import Image
+from PIL.PngImagePlugin import PngInfo
+
+SRC_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'src')
+if SRC_DIR not in sys.path:
+    sys.path.insert(0, SRC_DIR)
+
+# File name -> A1111 ``parameters`` text; None writes a PNG without metadata
+GALLERY = {
+    'red_cat.png': ("a red cat, (masterpiece:1.2), sitting\n"
+                    "Negative prompt: blurry\n"
+                    "Steps: 20, Sampler: Euler a, CFG scale: 7, Seed: 100, Size: 512x512, Model: dreamA"),
+    'blue_dog.png': ("a blue dog, running\n"
+                     "Negative prompt: lowres, red\n"
+                     "Steps: 30, Sampler: DPM++ 2M, CFG scale: 5.5, Seed: 200, Size: 512x768, Model: dreamB, "
+                     'Lora hashes: "styleA: abc123"'),
+    'red_dog.png': ("red dog, (detailed:0.8), (red:1.3)\n"
+                    "Negative prompt: cat\n"
+                    "Steps: 25, Sampler: Euler a, CFG scale: 7, Seed: 300, Size: 512x512, Model: dreamA"),
+    'cafe.png': ("Café au lait, ＦＵＬＬＷＩＤＴＨ cup\n"
+                 "Negative prompt: none\n"
+                 "Steps: 10, Sampler: Euler, CFG scale: 4, Seed: 500, Size: 768x512, Model: dreamB"),
+    'settings_only.png': "Steps: 40, Sampler: Euler a, CFG scale: 9, Seed: 400, Size: 512x512, Model: dreamA",
+    'no_metadata.png': None,
+}
+
+
+def write_png(path, parameters=None, color=(128, 128, 128)):
+    info = PngInfo()
+    if parameters is not None:
+        info.add_text('parameters', parameters)
+    Image.new('RGB', (16, 16), color).save(path, pnginfo=info)
+
+
+@pytest.fixture
+def gallery(tmp_path):
+    """A folder holding the GALLERY images."""
+    folder = tmp_path / 'gallery'
+    folder.mkdir()
+    for number, (name, parameters) in enumerate(GALLERY.items()):
+        write_png(folder / name, parameters, (number * 40, 0, 0))
+    return str(folder)
+
+
+@pytest.fixture(autouse=True)
+def cache_dir(tmp_path, monkeypatch):
+    """Keep metadata catalogs and planner statistics out of the repository's metadata_cache."""
+    import core.cache_paths
+    import core.catalog
+
+    directory = tmp_path / 'metadata_cache'
+    monkeypatch.setattr(core.cache_paths, 'get_cache_dir', lambda: str(directory))
+    monkeypatch.setattr(core.catalog, 'get_cache_dir', lambda: str(directory))
+    return directory
+
+
+@pytest.fixture(scope='session')
+def lang():
+    from localization.language_manager_metadatasearch import LanguageManagerMetadataSearch
+
+    return LanguageManagerMetadataSearch("metadatasearch", "English")
+
+
+@pytest.fixture(scope='session')
+def worker_pool():
+    from core.worker_pool import WorkerPool
+
+    pool = WorkerPool(2)
+    yield pool
+    pool.shutdown()
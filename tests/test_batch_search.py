@@ -0,0 +1,81 @@
+import json
+import os
+
+import pytest
+
+from core.batch_search import BatchSearcher, load_batch_queries
+
+
+def run_batch(gallery, queries, lang, worker_pool, use_index):
+    batch = BatchSearcher(queries, lang=lang, worker_pool=worker_pool, use_index=use_index)
+    batch.search_images(gallery)
+    return {name: searcher for name, searcher in batch.searchers}
+
+
+def listing(folder):
+    return sorted(os.listdir(folder)) if os.path.isdir(folder) else []
+
+
+@pytest.mark.parametrize('use_index', [False, True])
+def test_copy_and_move_of_the_same_file(gallery, tmp_path, lang, worker_pool, use_index):
+    cats, reds = str(tmp_path / 'cats'), str(tmp_path / 'reds')
+    searchers = run_batch(gallery, [('cats', {'search_term': 'cat', 'move_path': cats}),
+                                    ('reds', {'search_term': 'red', 'copy_path': reds})],
+                          lang, worker_pool, use_index)
+
+    assert listing(cats) == ['red_cat.png']
+    assert listing(reds) == ['red_cat.png', 'red_dog.png']
+    assert 'red_cat.png' not in listing(gallery)
+    assert 'red_dog.png' in listing(gallery)
+    assert len(searchers['cats'].found_paths) == 1
+    assert len(searchers['reds'].found_paths) == 2
+
+
+@pytest.mark.parametrize('use_index', [False, True])
+def test_two_moves_of_the_same_file(gallery, tmp_path, lang, worker_pool, use_index):
+    cats, reds = str(tmp_path / 'cats'), str(tmp_path / 'reds')
+    run_batch(gallery, [('cats', {'search_term': 'cat', 'move_path': cats}),
+                        ('reds', {'search_term': 'red', 'move_path': reds})],
+              lang, worker_pool, use_index)
+
+    assert listing(cats) == ['red_cat.png']
+    assert listing(reds) == ['red_cat.png', 'red_dog.png']
+    assert not {'red_cat.png', 'red_dog.png'} & set(listing(gallery))
+
+
+@pytest.mark.parametrize('use_index', [False, True])
+def test_failed_copy_is_logged_and_skipped(gallery, tmp_path, lang, worker_pool, monkeypatch, use_index):
+    import core.searcher
+
+    copy2 = core.searcher.shutil.copy2
+
+    def failing_copy2(source, destination):
+        if os.path.basename(source) == 'red_cat.png':
+            raise PermissionError(13, 'Permission denied', source)
+        return copy2(source, destination)
+
+    monkeypatch.setattr(core.searcher.shutil, 'copy2', failing_copy2)
+    reds = str(tmp_path / 'reds')
+    searchers = run_batch(gallery, [('reds', {'search_term': 'red', 'copy_path': reds})],
+                          lang, worker_pool, use_index)
+
+    assert listing(reds) == ['red_dog.png']
+    assert searchers['reds'].found_paths == [os.path.join(gallery, 'red_dog.png')]
+    assert any(line.startswith('Could not copy or move') and 'red_cat.png' in line
+               for line in searchers['reds'].output_text)
+
+
+def test_load_batch_queries(tmp_path):
+    path = tmp_path / 'queries.json'
+    path.write_text(json.dumps({'reds': {'term': 'red', 'copy_to': 'out'}, 'euler': {'where': 'sampler=euler a'}}))
+    assert load_batch_queries(str(path)) == [('reds', {'search_term': 'red', 'copy_path': 'out'}),
+                                             ('euler', {'where': 'sampler=euler a'})]
+
+
+@pytest.mark.parametrize('content', ['[]', '{}', '{"a": 1}', '{"a": {"colour": "red"}}', '{"a": {"ignore": "x"}}',
+                                     'not json'])
+def test_load_batch_queries_rejects(tmp_path, content):
+    path = tmp_path / 'queries.json'
+    path.write_text(content)
+    with pytest.raises(ValueError):
+        load_batch_queries(str(path))
@@ -0,0 +1,31 @@
+import pytest
+
+from core.facets import facets_match, parse_where
+
+METADATA = {'Steps': '30', 'Sampler': 'DPM++  2M', 'CFG scale': '6.5', 'Size': '512x768'}
+
+
+def test_parse_where():
+    assert parse_where('steps>=30 && Sampler=DPM++ 2M && cfg in 5..7 && seed in 1, 2') == [
+        ('steps', '>=', 30.0), ('sampler', '=', 'dpm++ 2m'), ('cfg', 'range', (5.0, 7.0)),
+        ('seed', 'in', (1.0, 2.0))]
+    assert parse_where('cfg scale in ..7') == [('cfg', 'range', (None, 7.0))]
+    assert parse_where('') == []
+
+
+@pytest.mark.parametrize('text', ['steps>>3', 'colour=red', 'steps=many', 'sampler>2', 'steps='])
+def test_parse_where_rejects(text):
+    with pytest.raises(ValueError):
+        parse_where(text)
+
+
+@pytest.mark.parametrize('text, expected', [
+    ('steps=30 && sampler=dpm++ 2m', True),
+    ('cfg in 6..7 && width=512 && height>700', True),
+    ('sampler in euler, dpm++ 2m', True),
+    ('size=512x768', True),
+    ('steps!=30', False),
+    ('seed>0', False),      # a missing setting never passes
+])
+def test_facets_match(text, expected):
+    assert facets_match(METADATA, parse_where(text)) is expected
@@ -0,0 +1,22 @@
+from core.highlight import highlight_spans
+
+METADATA = {'Positive': 'a Red cat, (red:1.2), cathedral', 'Negative': 'blurry, red', 'Seed': '42'}
+
+
+def test_terms_in_selected_prompts():
+    assert highlight_spans(METADATA, ['red'], True, False, False) == {'Positive': [(2, 5), (12, 15)]}
+    assert highlight_spans(METADATA, ['red'], True, False, True) == {'Positive': [(12, 15)]}
+    assert highlight_spans(METADATA, ['red'], True, True, False) == {
+        'Positive': [(2, 5), (12, 15)], 'Negative': [(8, 11)]}
+
+
+def test_wildcards_or_groups_and_fields():
+    assert highlight_spans(METADATA, ['cathe*l || blurry'], True, True, False) == {
+        'Positive': [(22, 31)], 'Negative': [(0, 6)]}
+    assert highlight_spans(METADATA, ['seed:42 && red:>1.1'], True, False, False) == {
+        'Seed': [(0, 2)], 'Positive': [(2, 5), (12, 15)]}
+    assert highlight_spans(METADATA, ['*', ''], True, False, False) == {}
+
+
+def test_all_fields_without_a_prompt_selected():
+    assert highlight_spans(METADATA, ['42'], False, False, False) == {'Seed': [(0, 2)]}
@@ -0,0 +1,101 @@
+import pytest
+
+tk = pytest.importorskip('tkinter')
+pytest.importorskip('PIL.ImageTk')
+
+from gui.image_browser import JustifiedRowLayout
+
+
+def test_rows_break_at_the_width():
+    layout = JustifiedRowLayout(1, 100)
+    layout.set_items([50, 50, 50, 50, 50], 110, 100)
+    assert layout.row_starts == [0, 2, 4]
+    assert layout.row_tops == [1, 101, 201]
+    assert layout.height == 302
+    assert layout.row_of_index(3) == 1
+    assert list(layout.rows_between(150, 150)) == [1]
+
+
+def test_sections_start_rows_below_a_header():
+    layout = JustifiedRowLayout(1, 100)
+    layout.set_items([50, 50, 50], 1000, 100, sections=[0, 2], header_height=20)
+    assert layout.row_starts == [0, 2]
+    assert layout.row_tops == [21, 141]
+    # Rows ending a section are not stretched
+    assert layout.row_positions(0) == [1, 52]
+
+
+def test_append_and_rescale():
+    layout = JustifiedRowLayout(1, 100)
+    layout.set_items([50, 50], 110, 100)
+    assert layout.append([50, 50, 50]) == 0
+    assert layout.row_starts == [0, 2, 4]
+    layout.set_items([25] * 5, 110, 50)
+    assert layout.row_starts == [0, 4]
+    assert layout.row_tops == [1, 51]
+    assert layout.index_at(30, 10) == 1
+
+
+def followed_browser(details, search_options):
+    """An ImageBrowser without a window that has followed a stream with ``search_options``."""
+    from threading import Lock
+
+    from gui.image_browser import ImageBrowser
+    from core.searcher import SearchResultStream
+
+    # No display is needed: only the state follow_stream and its callers use is set up
+    browser = ImageBrowser.__new__(ImageBrowser)
+    browser._unsubscribe_stream = None
+    browser._load_lock = Lock()
+    browser._pending_paths = []
+    browser._stream_generation = 0
+    browser._build_cells = browser._show_spinner = lambda: None
+    browser._enqueue_paths = browser._on_stream_closed = lambda *args: None
+    browser.search_options = (True, False, False)
+    browser._refine_term = ''
+    browser.follow_stream(SearchResultStream(), 'red', details, search_options)
+    return browser
+
+
+def sample_details():
+    from core.searcher import ResultDetails
+
+    details = ResultDetails()
+    details.add('a.png', (0, 'red'), {'Positive': 'Red cat', 'Negative': 'blurry'})
+    details.add('b.png', (0, 'red'), {'Positive': 'dog', 'Negative': 'red'})
+    return details
+
+
+def test_refine_follows_the_options_of_a_followed_stream():
+    browser = followed_browser(sample_details(), (False, True, True))
+    browser._refine_term = 'red'
+
+    assert browser.search_options == (False, True, True)
+    assert browser._refined(['a.png', 'b.png']) == ['b.png']
+
+
+class FakeText:
+    def __init__(self):
+        self.hits = []
+
+    def delete(self, *args):
+        self.hits = []
+
+    def insert(self, index, text, tag=None):
+        if tag == 'hit':
+            self.hits.append(text)
+
+
+def test_details_highlight_follows_the_options_of_a_followed_stream():
+    browser = followed_browser(sample_details(), (False, True, False))
+    browser._details_panel = browser._details_text = FakeText()
+    browser.details_var = type('Var', (), {'get': lambda self: True})()
+    browser.lang = type('Lang', (), {'get_string': lambda self, key: key})()
+    browser.image_paths = ['a.png', 'b.png']
+
+    browser.selected = {0}
+    browser._show_details()
+    assert browser._details_text.hits == []
+    browser.selected = {1}
+    browser._show_details()
+    assert browser._details_text.hits == ['red']
@@ -0,0 +1,20 @@
+import random
+
+from core.image_hash import BKTree, hamming
+
+
+def test_bktree_matches_a_linear_scan():
+    rng = random.Random(7)
+    values = [rng.getrandbits(64) for _ in range(300)]
+    values += [value ^ (1 << bit) for value, bit in zip(values[:50], range(50))]
+    tree = BKTree(values)
+    for probe in values[:40] + [rng.getrandbits(64) for _ in range(10)]:
+        for radius in (0, 1, 4):
+            expected = {value for value in values if hamming(value, probe) <= radius}
+            assert set(tree.query(probe, radius)) == expected
+
+
+def test_bktree_keeps_one_copy_of_a_value():
+    tree = BKTree([5, 5, 7])
+    assert sorted(tree.query(5, 1)) == [5, 7]
+    assert BKTree().query(5, 3) == []
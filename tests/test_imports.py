@@ -0,0 +1,19 @@
+import subprocess
+import sys
+
+from conftest import SRC_DIR
+
+
+def imported_after(statement, modules):
+    """Which of ``modules`` a fresh interpreter has loaded after running ``statement``."""
+    check = f"import sys; {statement}; print(' '.join(m for m in {modules!r} if m in sys.modules))"
+    result = subprocess.run([sys.executable, '-c', check], cwd=SRC_DIR, capture_output=True, text=True, check=True)
+    return result.stdout.split()
+
+
+def test_cli_import_stays_light():
+    assert imported_after('import metadata_search', ['numpy', 'core.explain', 'core.trigram_index']) == []
+
+
+def test_worker_import_stays_light():
+    assert imported_after('import core.scan_worker', ['numpy', 'core.explain']) == []
@@ -0,0 +1,103 @@
+import os
+
+import pytest
+
+from conftest import write_png
+from core.catalog import MetadataCatalog
+from core.facets import parse_where
+from core.index_search import evaluate_query
+from core.searcher import MetadataSearcher
+
+# (search term, ignore term, where, custom filter, search_positive, search_negative) -> expected matches
+QUERIES = [
+    (('red', None, None, None, True, False), {'red_cat.png', 'red_dog.png'}),
+    (('blu*', None, None, None, True, False), {'blue_dog.png'}),
+    (('d?g', None, None, None, True, False), {'blue_dog.png', 'red_dog.png'}),
+    (('cat || dog', 'blue', None, None, True, False), {'red_cat.png', 'red_dog.png'}),
+    (('red && sitting', None, None, None, True, False), {'red_cat.png'}),
+    (('cat', None, None, None, False, True), {'red_dog.png'}),
+    (('red', None, None, None, False, False), {'red_cat.png', 'red_dog.png', 'blue_dog.png'}),
+    (('café', None, None, None, True, False), {'cafe.png'}),
+    (('fullwidth', None, None, None, True, False), {'cafe.png'}),
+    (('seed:300', None, None, None, True, False), {'red_dog.png'}),
+    (('sampler:euler a', None, None, None, True, False), {'red_cat.png', 'red_dog.png', 'settings_only.png'}),
+    (('lora:styleA', None, None, None, True, False), {'blue_dog.png'}),
+    (('masterpiece:>1.1', None, None, None, True, False), {'red_cat.png'}),
+    (('red:>1.2', None, None, None, True, False), {'red_dog.png'}),
+    (('dog', None, 'cfg>6', None, True, False), {'red_dog.png'}),
+    (('dog', None, None, 'DPM', True, False), {'blue_dog.png'}),
+    ((None, None, 'sampler=euler a', None, True, False), {'red_cat.png', 'red_dog.png', 'settings_only.png'}),
+    ((None, 'cat', 'sampler=euler a', None, True, False), {'red_dog.png', 'settings_only.png'}),
+    ((None, None, 'steps>=25', None, False, False), {'blue_dog.png', 'red_dog.png', 'settings_only.png'}),
+    ((None, None, 'model=dreamB', 'lait', True, False), {'cafe.png'}),
+]
+
+
+def run_search(gallery, lang, worker_pool, query, use_index):
+    search_term, ignore_term, where, custom_filter, search_positive, search_negative = query
+    searcher = MetadataSearcher(search_term, lang=lang, worker_pool=worker_pool, use_index=use_index,
+                                ignore_term=ignore_term, where=where, custom_filter=custom_filter,
+                                search_positive=search_positive, search_negative=search_negative)
+    searcher.search_images(gallery)
+    return {os.path.basename(path): match for path, match in searcher.result_details.matches.items()}
+
+
+@pytest.mark.parametrize('query, expected', QUERIES)
+def test_index_and_scan_agree(gallery, lang, worker_pool, query, expected):
+    scanned = run_search(gallery, lang, worker_pool, query, False)
+    indexed = run_search(gallery, lang, worker_pool, query, True)
+    assert set(scanned) == expected
+    assert indexed == scanned
+
+
+def test_or_groups_are_reported(gallery, lang, worker_pool):
+    matches = run_search(gallery, lang, worker_pool, ('cat || dog', None, None, None, True, False), True)
+    assert matches == {'red_cat.png': (0, 'cat'), 'red_dog.png': (1, 'dog'), 'blue_dog.png': (1, 'dog')}
+
+
+def test_evaluate_query_in_slices(gallery):
+    catalog = MetadataCatalog.open(gallery, False)
+    catalog.refresh()
+    where = parse_where('sampler=euler a')
+    whole = evaluate_query(catalog, 'red || a', None, True, False, False, where=where)
+    masks = {}
+    sliced = []
+    for start in range(0, catalog.size, 2):
+        sliced += evaluate_query(catalog, 'red || a', None, True, False, False, where=where,
+                                 docs=slice(start, start + 2), masks=masks)
+    assert sliced == whole
+    assert {os.path.basename(catalog.paths[doc_id]) for doc_id, _ in whole} == {'red_cat.png', 'red_dog.png'}
+
+
+# Prompts where casefold/NFKC and per-character case folding disagree
+FOLDED = {
+    'strasse.png': "Straße at night",
+    'ligature.png': "ﬁsh soup, ﬂower",
+    'fullwidth.png': "ＭＯＯＮ ｌｉｇｈｔ",
+    'dotless.png': "DIŞ kapı",
+    'plain.png': "fish and strasse",
+}
+
+
+@pytest.mark.parametrize('query', [
+    ('straße', None, None, None, True, False),
+    ('STRASSE', None, None, None, True, False),
+    ('ﬁsh', None, None, None, True, False),
+    ('fish', None, None, None, False, False),
+    ('ﬂow*', None, None, None, True, False),
+    ('moon', None, None, None, True, False),
+    ('ＭＯＯＮ light', None, None, None, True, False),
+    ('kapı', None, None, None, True, False),
+    ('dış', None, None, None, True, False),
+    ('fish', None, None, '(?i)straße', True, False),
+    ('fish', None, None, '(?i)ıng|ISH', True, False),
+    (None, None, 'steps>=1', '(?i)DIŞ', True, False),
+])
+def test_index_and_scan_agree_on_folding(tmp_path, lang, worker_pool, query):
+    folder = tmp_path / 'folded'
+    folder.mkdir()
+    for name, prompt in FOLDED.items():
+        write_png(folder / name, f"{prompt}\nNegative prompt: none\nSteps: 20, Sampler: Euler, Seed: 1")
+    scanned = run_search(str(folder), lang, worker_pool, query, False)
+    indexed = run_search(str(folder), lang, worker_pool, query, True)
+    assert indexed == scanned
@@ -0,0 +1,39 @@
+from core.index_search import evaluate_query
+from core.live_search import LiveSearch
+from core.searcher import ResultDetails, SearchResultStream
+
+
+def test_slices_match_a_whole_evaluation(gallery, worker_pool):
+    live = LiveSearch(worker_pool, chunk_size=2)
+    catalog = live.load(gallery, False)
+    progress = []
+    stream = SearchResultStream()
+    published = []
+    stream.subscribe(published.extend)
+    details = ResultDetails()
+
+    paths = live.search(live.start(), gallery, False, 'red || dog', 'blue', result_stream=stream,
+                        on_progress=lambda *args: progress.append(args), details=details)
+
+    expected = [catalog.paths[doc_id] for doc_id, _ in
+                evaluate_query(catalog, 'red || dog', 'blue', True, False, False)]
+    assert sorted(paths) == sorted(expected) and len(expected) == 2
+    assert published == paths
+    assert set(details.matches) == set(paths)
+    assert progress[-1] == (2, catalog.size, catalog.size)
+    assert len(progress) == (catalog.size + 1) // 2
+
+
+def test_where_only(gallery, worker_pool):
+    live = LiveSearch(worker_pool, chunk_size=4)
+    paths = live.search(live.start(), gallery, False, '', where='steps>=30', search_positive=False)
+    assert sorted(path.rsplit('/', 1)[-1] for path in paths) == ['blue_dog.png', 'settings_only.png']
+    assert live.search(live.start(), gallery, False, '') == []
+
+
+def test_superseded_query_returns_none(gallery, worker_pool):
+    live = LiveSearch(worker_pool, chunk_size=2)
+    generation = live.start()
+    live.start()
+    assert live.search(generation, gallery, False, 'red') is None
+    assert not live.is_current(generation)
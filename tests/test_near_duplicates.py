@@ -0,0 +1,43 @@
+import os
+
+import numpy as np
+
+from conftest import write_png
+from core.minhash import EMPTY, NUM_PERM, cluster_labels, signature
+from core.searcher import MetadataSearcher
+
+TAGS = [f"tag{number}" for number in range(12)]
+
+
+def prompt(tags):
+    return ', '.join(tags) + "\nNegative prompt: blurry\nSteps: 20, Sampler: Euler, Seed: 1"
+
+
+def test_signature():
+    assert signature('a, b, c').shape == (NUM_PERM,)
+    assert np.array_equal(signature('a, b, c'), signature('c, (b:1.2), a'))
+    assert (signature('') == EMPTY).all()
+
+
+def test_cluster_labels():
+    rows = np.array([signature(', '.join(TAGS)), signature(', '.join(TAGS[:-1] + ['other'])),
+                     signature('completely, different, words'), signature(''), signature('')])
+    labels = cluster_labels(rows, 0.5)
+    assert labels[1] == labels[0] == 0
+    assert len(set(labels.tolist())) == 4
+
+
+def test_singletons_are_not_processed(tmp_path, lang, worker_pool):
+    folder, out = tmp_path / 'images', tmp_path / 'out'
+    folder.mkdir()
+    write_png(folder / 'a.png', prompt(TAGS))
+    write_png(folder / 'b.png', prompt(TAGS))
+    write_png(folder / 'c.png', prompt(TAGS[:-1] + ['other']))
+    write_png(folder / 'lonely.png', prompt(['nothing', 'in', 'common']))
+
+    searcher = MetadataSearcher(None, lang=lang, worker_pool=worker_pool, copy_path=str(out))
+    searcher.find_near_duplicates(str(folder), 0.5)
+
+    assert [os.path.basename(path) for path in searcher.found_paths] == ['a.png']
+    assert os.listdir(out) == ['a.png']
+    assert searcher.output_text[-2] == lang.get_string("messages.matches_found").format(1)
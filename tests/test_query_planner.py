@@ -0,0 +1,54 @@
+from core.query_planner import QueryPlanner, load_stats, save_stats
+from core.scan_worker import split_query, term_kind, term_matches
+
+
+def planner():
+    return QueryPlanner(term_matches, split_query, term_kind)
+
+
+def evaluate_all(query_planner, prompts, search_term, ignore_term=None):
+    return [query_planner.evaluate({'Positive': prompt}, search_term, True, False, False, ignore_term)
+            for prompt in prompts]
+
+
+def test_changes_since_snapshot():
+    query_planner = planner()
+    snapshot = query_planner.snapshot([('red && cat', None, True, False, False)])
+    evaluate_all(query_planner, ['red cat', 'red dog', 'blue dog'], 'red && cat')
+    changes = {entry[0]: entry[4:6] for entry in query_planner.changes(snapshot)}
+    assert set(changes) <= {'red', 'cat'} and changes
+    assert all(0 <= passes <= evaluations for evaluations, passes in changes.values())
+    assert query_planner.changes(query_planner.snapshot([('red && cat', None, True, False, False)])) == []
+
+
+def test_saved_stats_round_trip(tmp_path):
+    path = str(tmp_path / 'cache' / 'planner_stats.json')
+    assert load_stats(path) == []
+    first = planner()
+    snapshot = first.snapshot([('red && cat', None, True, False, False)])
+    prompts = ['red cat', 'red dog', 'blue dog', 'green bird'] * 10
+    evaluate_all(first, prompts, 'red && cat')
+    changes = first.changes(snapshot)
+    save_stats(path, changes)
+    save_stats(path, changes)
+    saved = {entry[0]: entry[4] for entry in load_stats(path)}
+    assert saved == {entry[0]: 2 * entry[4] for entry in changes}
+
+    second = planner()
+    second.restore(load_stats(path))
+    for key, stats in first.stats.items():
+        assert second.stats[key].evaluations == 2 * stats.evaluations
+        assert second.stats[key].passes == 2 * stats.passes
+    # Restored statistics plan the same order the first planner learned
+    plan = second.plan('red && cat', None, True, False, False)
+    assert plan.search_groups == first.plan('red && cat', None, True, False, False).search_groups
+    assert evaluate_all(second, prompts, 'red && cat') == evaluate_all(first, prompts, 'red && cat')
+
+
+def test_saved_stats_keep_recent_terms(tmp_path):
+    path = str(tmp_path / 'planner_stats.json')
+    save_stats(path, [['old', True, False, False, 1, 1, 0, 0.0]])
+    save_stats(path, [['new', True, False, False, 1, 0, 0, 0.0]], limit=1)
+    assert load_stats(path) == [['new', True, False, False, 1, 0, 0, 0.0]]
+    (tmp_path / 'broken.json').write_text('{not json')
+    assert load_stats(str(tmp_path / 'broken.json')) == []
@@ -0,0 +1,45 @@
+from core.result_order import order_results
+from core.searcher import ResultDetails
+
+
+def details():
+    details = ResultDetails()
+    entries = [
+        ('a.png', (0, 'cat'), {'Seed': '30', 'Sampler': 'Euler a'}, (3 * 1024 * 1024, 2_000_000_000_000_000_000)),
+        ('b.png', (1, 'dog'), {'Seed': '10', 'Sampler': 'DPM++ 2M'}, (100, 1_000_000_000_000_000_000)),
+        ('c.png', (0, 'cat'), {'Sampler': 'euler  a'}, (200, 1_500_000_000_000_000_000)),
+        ('d.png', (1, 'dog'), {'Seed': '20', 'Sampler': 'Euler a'}, None),
+    ]
+    for path, match, metadata, stat in entries:
+        details.add(path, match, metadata, stat)
+    return details
+
+
+PATHS = ['a.png', 'b.png', 'c.png', 'd.png']
+
+
+def test_search_order():
+    assert order_results(PATHS, 'order', details()) == (PATHS, [])
+    assert order_results(PATHS, 'order', details(), descending=True, group=True) == (PATHS[::-1], [])
+
+
+def test_missing_values_sort_last():
+    assert order_results(PATHS, 'seed', details())[0] == ['b.png', 'd.png', 'a.png', 'c.png']
+    assert order_results(PATHS, 'seed', details(), descending=True)[0] == ['a.png', 'd.png', 'b.png', 'c.png']
+    assert order_results(PATHS, 'size', details())[0] == ['b.png', 'c.png', 'a.png', 'd.png']
+
+
+def test_groups():
+    ordered, sections = order_results(PATHS, 'sampler', details(), group=True)
+    assert ordered == ['b.png', 'a.png', 'c.png', 'd.png']
+    assert sections == [(0, 'DPM++ 2M'), (1, 'Euler a')]
+
+    ordered, sections = order_results(PATHS, 'or_group', details(), group=True)
+    assert ordered == ['a.png', 'c.png', 'b.png', 'd.png']
+    assert sections == [(0, 'cat'), (2, 'dog')]
+
+    ordered, sections = order_results(PATHS, 'seed', details(), group=True)
+    assert sections == [(0, '10'), (1, '20'), (2, '30'), (3, None)]
+
+    ordered, sections = order_results(PATHS, 'size', details(), group=True)
+    assert sections == [(0, '0-1 MB'), (2, '3-4 MB'), (3, None)]
@@ -0,0 +1,45 @@
+import os
+
+from conftest import GALLERY
+from core.scan_worker import (decode_records, encode_records, field_term, fold_text, make_record,
+                              process_image_batch, read_png, split_query)
+
+
+def test_fold_text():
+    assert fold_text('Red CAT') == 'red cat'
+    assert fold_text('ＦＵＬＬ') == 'full'
+    assert fold_text('Café') == fold_text('Café') == 'café'
+    assert fold_text('STRASSE') == fold_text('Straße')
+
+
+def test_field_term():
+    assert field_term('seed:123') == ('seed', '123')
+    assert field_term('Sampler: Euler  A') == ('sampler', 'euler a')
+    assert field_term('lora_hash:ABC') == ('lorahash', 'abc')
+    assert field_term('masterpiece:1.2') is None
+    assert field_term('seed:') is None
+
+
+def test_split_query():
+    assert split_query('a && b || || c') == [(0, 'a && b', ['a', 'b']), (2, 'c', ['c'])]
+
+
+def test_records_round_trip(gallery):
+    size, mtime_ns, metadata = read_png(os.path.join(gallery, 'red_cat.png'))
+    assert size == os.path.getsize(os.path.join(gallery, 'red_cat.png'))
+    assert metadata['Seed'] == '100'
+    assert read_png(os.path.join(gallery, 'no_metadata.png'))[2] is None
+    record = make_record('red_cat.png', size, mtime_ns, metadata, [(0, 0, 'red')])
+    assert decode_records(encode_records([record])) == [
+        ('red_cat.png', size, mtime_ns, tuple(metadata), tuple(metadata.values()), ((0, 0, 'red'),))]
+
+
+def test_process_image_batch(gallery):
+    paths = [os.path.join(gallery, name) for name in GALLERY]
+    queries = (('red', True, False, False, None, None, []),
+               ('dog', True, False, False, None, 'blue', []))
+    blob, hits, misses, profile, planner_changes = process_image_batch(('run', paths, queries, False))
+    found = {os.path.basename(record[0]): record[5] for record in decode_records(blob)}
+    assert found == {'red_cat.png': ((0, 0, 'red'),), 'red_dog.png': ((0, 0, 'red'), (1, 0, 'dog'))}
+    assert profile is None
+    assert {entry[0] for entry in planner_changes} == {'dog', 'blue'}